@@ -1,12 +1,22 @@
-from flask import Blueprint, jsonify, request, session
-from bd.bdConector import BDConector
-from debug.pydebug import DebugLogger
+import hmac
+import json
+import os
+
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 from bd.bdInstance import *
 from debug.logger import logger
+from debug.telemetry import CONTENT_TYPE as METRICS_CONTENT_TYPE, telemetry
+from bd.bdErrors import StockError
+from bd.bdSlowQueries import slow_queries
 from data.validators import ItemValidator, UserValidator, ValidationError
+from data.limits import Limits
+from data.import_jobs import import_jobs
+from services.errors import ServiceError
+from services.inventory import inventory_service
+from services.sales import sales_service
+from serving import READY_OK, readiness
 
 api_bp = Blueprint("api", __name__)
-debugger = DebugLogger()
 
 def require_auth():
     """
@@ -26,14 +36,47 @@ def require_auth():
 @api_bp.route("/health", methods=["GET"])
 def health():
     """
-    Endpoint de verificación de salud del servidor.
+    Endpoint de verificación de salud y disponibilidad del servidor.
     
     Requiere login: False.
     
     Returns:
-        JSON: {"status": "Ok"} con código 200
+        JSON: {"status": "Ok", "ready": true, ...} con código 200 cuando la base
+        está inicializada y el pool precalentado (incluye schema_version,
+        connections, fts y startup_seconds si el arranque los informó)
+        JSON: {"status": "starting"|"failed", "ready": false, "error"?} con
+        código 503 mientras arranca o si el arranque falló
+    """
+    
+    state, detail = readiness.snapshot()
+    if state == READY_OK:
+        return jsonify(dict(detail, status="Ok", ready=True)), 200
+    return jsonify(dict(detail, status=state, ready=False)), 503
+
+def _list_products_response(active_only):
     """
-    return jsonify({"status": "Ok"}), 200
+    Respuesta común de /products y /products_all.
+    
+    Sin `limit` retorna el array completo (compatibilidad). Con `limit`
+    retorna una página con cursor para pedir la siguiente.
+    """
+    
+    try:
+        result = inventory_service.list_products(
+            active_only,
+            request.args.get("search", ""),
+            request.args.get("view_mode", "all"),
+            request.args.get("sort", "id_asc"),
+            request.args.get("limit", type=int),
+            after_id=request.args.get("after_id"),
+            after_value=request.args.get("after_value"),
+            include_total=request.args.get("include_total") == "1",
+            include_summary=request.args.get("include_summary") == "1"
+        )
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
+    
+    return jsonify(result), 200
 
 @api_bp.route("/products_all", methods=["GET"])
 def get_all_products():
@@ -44,10 +87,18 @@ def get_all_products():
     
     Query Parameters:
         search (str, optional): Búsqueda por nombre o código de barras
-        view_mode (str, optional): Filtro por stock ("all", "in_stock", "out_of_stock")
+        view_mode (str, optional): Filtro por stock ("all", "in_stock", "out_of_stock",
+            "low_stock", "above_min")
+        limit (int, optional): Activa la paginación; tamaño de página (máx. Limits.PRODUCTS_PAGE_MAX)
+        sort (str, optional): "<id|name|stock|price>_<asc|desc>" (default: "id_asc")
+        after_id (int, optional): Cursor: `next_cursor.after_id` de la página anterior
+        after_value (str, optional): Cursor: `next_cursor.after_value` de la página anterior
+        include_total (str, optional): "1" para incluir `total` (productos que cumplen los filtros)
+        include_summary (str, optional): "1" para incluir `summary` (total, in_stock, low_stock, out_of_stock)
     
     Returns:
-        JSON: Lista de productos con sus detalles
+        JSON: Sin `limit`, lista de productos con sus detalles.
+        Con `limit`: {"items": [...], "next_cursor": {...}|null, "total"?, "summary"?}
         - id (int): ID del producto
         - barcode (str): Código de barras
         - name (str): Nombre del producto
@@ -59,6 +110,7 @@ def get_all_products():
     
     Status Codes:
         200: Éxito
+        400: Parámetros de orden o cursor inválidos
         401: No autorizado
     """
     
@@ -66,63 +118,24 @@ def get_all_products():
     if auth_error:
         return auth_error
     
-    search = request.args.get("search", "")
-    view_mode = request.args.get("view_mode", "all")
-    
-    query = "SELECT id, barrs_code, name, description, quantity, min_quantity, price, status FROM items WHERE 1=1"
-    params = []
-    
-    if search:
-        query += " AND (name LIKE ? OR barrs_code LIKE ?)"
-        params.extend([f"%{search}%", f"%{search}%"])
-    
-    if view_mode == "in_stock":
-        query += " AND quantity > 0"
-    elif view_mode == "out_of_stock":
-        query += " AND quantity = 0"
-    
-    rows = db.execute_query(query, tuple(params))
-    
-    products = [
-        {
-            "id": row[0],
-            "barcode": row[1],
-            "name": row[2],
-            "description": row[3],
-            "stock": row[4],
-            "min_stock": row[5],
-            "price": row[6],
-            "status": row[7]
-        }
-        for row in rows
-    ]
-    
-    return jsonify(products), 200
+    return _list_products_response(active_only=False)
 
 @api_bp.route("/products", methods=["GET"])
 def get_products():
     """
-    Obtiene todos los productos del inventario con filtros opcionales.
+    Obtiene los productos activos del inventario con filtros opcionales.
     
     Requiere login: True.
     
     Query Parameters:
-        search (str, optional): Búsqueda por nombre o código de barras
-        view_mode (str, optional): Filtro por stock ("all", "in_stock", "out_of_stock")
+        Los mismos que /products_all (incluida la paginación por cursor).
     
     Returns:
-        JSON: Lista de productos con sus detalles
-        - id (int): ID del producto
-        - barcode (str): Código de barras
-        - name (str): Nombre del producto
-        - description (str): Descripción
-        - stock (int): Cantidad disponible
-        - min_stock (int): Stock mínimo
-        - price (float): Precio de venta
-        - status (int): Estado del producto (1=activo, 0=deshabilitado)
+        JSON: Igual que /products_all, solo productos con status = 1
     
     Status Codes:
         200: Éxito
+        400: Parámetros de orden o cursor inválidos
         401: No autorizado
     """
     
@@ -130,38 +143,7 @@ def get_products():
     if auth_error:
         return auth_error
     
-    search = request.args.get("search", "")
-    view_mode = request.args.get("view_mode", "all")
-    
-    query = "SELECT id, barrs_code, name, description, quantity, min_quantity, price, status FROM items WHERE status = 1"
-    params = []
-    
-    if search:
-        query += " AND (name LIKE ? OR barrs_code LIKE ?)"
-        params.extend([f"%{search}%", f"%{search}%"])
-    
-    if view_mode == "in_stock":
-        query += " AND quantity > 0"
-    elif view_mode == "out_of_stock":
-        query += " AND quantity = 0"
-    
-    rows = db.execute_query(query, tuple(params))
-    
-    products = [
-        {
-            "id": row[0],
-            "barcode": row[1],
-            "name": row[2],
-            "description": row[3],
-            "stock": row[4],
-            "min_stock": row[5],
-            "price": row[6],
-            "status": row[7]
-        }
-        for row in rows
-    ]
-    
-    return jsonify(products), 200
+    return _list_products_response(active_only=True)
 
 @api_bp.route("/products/<int:product_id>", methods=["GET"])
 def get_product(product_id):
@@ -193,24 +175,10 @@ def get_product(product_id):
     if auth_error:
         return auth_error
     
-    rows = db.execute_query(
-        "SELECT id, barrs_code, name, description, quantity, min_quantity, price FROM items WHERE id = ?",
-        (product_id,)
-    )
-    
-    if not rows:
-        return jsonify({"error": "Producto no encontrado"}), 404
-    
-    row = rows[0]
-    product = {
-        "id": row[0],
-        "barcode": row[1],
-        "name": row[2],
-        "description": row[3],
-        "stock": row[4],
-        "min_stock": row[5],
-        "price": row[6]
-    }
+    try:
+        product = inventory_service.get_product(product_id)
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     
     return jsonify(product), 200
 
@@ -248,32 +216,16 @@ def create_product():
     if session.get("role") != "admin":
         return jsonify({"error": "Permiso denegado"}), 403
     
-    data = request.get_json()
-    
-    required_fields = ["barcode", "name", "quantity", "min_quantity", "price"]
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Faltan campos requeridos"}), 400
-    
     try:
-        data = ItemValidator.validate(data.get("barcode", ""), data.get("description", ""), data.get("name", ""), 
-                                    data.get("quantity"), data.get("min_quantity"), 
-                                    data.get("price"), 1)
+        inventory_service.create_product(request.get_json())
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     except ValidationError as e:
         return jsonify({"error": e.field + ": " + e.message}), 400
-    
-    try:
-        db.add_item(
-            data.get("barrs_code", ""),
-            data.get("description", ""),
-            data["name"],
-            data["quantity"],
-            data["min_quantity"],
-            data["price"]
-        )
-        return jsonify({"message": "Producto creado exitosamente"}), 201
-    
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    
+    return jsonify({"message": "Producto creado exitosamente"}), 201
 
 @api_bp.route("/products/<int:product_id>", methods=["PUT"])
 def update_product(product_id):
@@ -311,38 +263,13 @@ def update_product(product_id):
     if session.get("role") != "admin":
         return jsonify({"error": "Permiso denegado"}), 403
     
-    data = request.get_json()
-    
-    updates = []
-    params = []
-    
-    field_mapping = {
-        "name": "name",
-        "description": "description",
-        "quantity": "quantity",
-        "min_quantity": "min_quantity",
-        "price": "price",
-        "status": "status"
-    }
     try:
-        data = ItemValidator.validate("0", data.get("description", ""), data.get("name", ""), 
-                                    data.get("quantity"), data.get("min_quantity"), 
-                                    data.get("price"), data.get("status"))
+        inventory_service.update_product(product_id, request.get_json())
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     except ValidationError as e:
         return jsonify({"error": e.field + ": " + e.message}), 400
     
-    for key, db_field in field_mapping.items():
-        if key in data:
-            updates.append(f"{db_field} = ?")
-            params.append(data[key])
-    
-    if not updates:
-        return jsonify({"error": "No hay datos para actualizar"}), 400
-    
-    params.append(product_id)
-    query = f"UPDATE items SET {', '.join(updates)} WHERE id = ?"
-    
-    db.execute_query(query, tuple(params), fetch=False)
     return jsonify({"message": "Producto actualizado"}), 200
 
 @api_bp.route("/products/<int:product_id>", methods=["DELETE"])
@@ -367,14 +294,14 @@ def delete_product(product_id):
     
     auth_error = require_auth()
     if auth_error:
-        logger.error(f"Unauthorized delete attempt for product ID {product_id}")
+        logger.error("Unauthorized delete attempt for product ID %s", product_id)
         return auth_error
     
     if session.get("role") != "admin":
-        logger.warning(f"Forbidden delete attempt for product ID {product_id} by user ID {session.get('user_id')}")
+        logger.warning("Forbidden delete attempt for product ID %s by user ID %s", product_id, session.get('user_id'))
         return jsonify({"error": "Permiso denegado"}), 403
     
-    db.disable_item(product_id)
+    inventory_service.disable_product(product_id)
     return jsonify({"message": "Producto eliminado"}), 200
 
 @api_bp.route("/stats", methods=["GET"])
@@ -404,36 +331,7 @@ def get_stats():
     if auth_error:
         return auth_error
     
-    total_products = db.execute_query("SELECT COUNT(*) FROM items")[0][0]
-    
-    low_stock = db.execute_query(
-        "SELECT COUNT(*) FROM items WHERE quantity <= min_quantity AND quantity > 0"
-    )[0][0]
-    
-    sales_today = db.execute_query(
-        "SELECT COUNT(*) FROM sells WHERE DATE(date) = DATE('now')"
-    )[0][0]
-    
-    low_stock_items = db.execute_query(
-        "SELECT id, name, barrs_code, quantity FROM items WHERE quantity <= min_quantity ORDER BY quantity ASC LIMIT 10"
-    )
-    
-    low_stock_list = [
-        {
-            "id": row[0],
-            "name": row[1],
-            "sku": row[2],
-            "stock": row[3]
-        }
-        for row in low_stock_items
-    ]
-    
-    return jsonify({
-        "products": total_products,
-        "low_stock": low_stock,
-        "sales_today": sales_today,
-        "low_stock_list": low_stock_list
-    }), 200
+    return jsonify(inventory_service.dashboard_stats()), 200
 
 @api_bp.route("/sales", methods=["POST"])
 def create_sale():
@@ -469,24 +367,16 @@ def create_sale():
     if "barcode" not in data or "quantity" not in data:
         return jsonify({"error": "Faltan campos requeridos"}), 400
     
-    item = db.get_item_by_barcode(data["barcode"])
-    
-    if not item:
-        return jsonify({"error": "Producto no encontrado"}), 404
-    
-    item_id, _, name, _, stock, price = item
-    qty = int(data["quantity"])
-    
-    if stock < qty:
-        return jsonify({"error": "Stock insuficiente"}), 400
-    
-    db.record_product_sale(item_id, qty)
+    try:
+        sale = sales_service.record_sale(data["barcode"], data["quantity"])
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     
     return jsonify({
-        "message": f"Venta registrada: {name} x{qty}",
-        "product": name,
-        "quantity": qty,
-        "total": price * qty
+        "message": f"Venta registrada: {sale['product']} x{sale['quantity']}",
+        "product": sale["product"],
+        "quantity": sale["quantity"],
+        "total": sale["total"]
     }), 201
 
 @api_bp.route("/sales/bulk", methods=["POST"])
@@ -519,55 +409,26 @@ def create_sales_bulk():
         return auth_error
 
     data = request.get_json(silent=True) or {}
-    items = data.get("items", [])
-    if not isinstance(items, list) or not items:
-        return jsonify({"error": "Formato inválido: items[] requerido"}), 400
-
-    validated_items = []
-    resultados = []
-    total = 0
-    
-    for idx, it in enumerate(items):
-        try:
-            item_id = int(it.get("item_id"))
-            qty = int(it.get("quantity"))
-        except (TypeError, ValueError):
-            return jsonify({"error": f"item_id/cantidad inválidos en índice {idx}"}), 400
-
-        row = db.execute_query("SELECT name, quantity, price FROM items WHERE id = ?", (item_id,))
-        if not row:
-            return jsonify({"error": f"Producto con ID {item_id} no encontrado"}), 400
-
-        name, stock, price = row[0]
-        if stock < qty:
-            return jsonify({
-                "error": "Stock insuficiente",
-                "product": name,
-                "requested": qty,
-                "available": stock
-            }), 400
-
-        validated_items.append({"item_id": item_id, "quantity": qty})
-        subtotal = round(price * qty, 2)
-        resultados.append({
-            "item_id": item_id,
-            "name": name,
-            "quantity": qty,
-            "unit_price": price,
-            "subtotal": subtotal
-        })
-        total += subtotal
 
     try:
-        sale_id = db.record_bulk_sale(validated_items)
+        result = sales_service.record_bulk_sale(data.get("items", []))
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
+    except StockError as e:
+        return jsonify({
+            "error": "Stock insuficiente",
+            "product": e.product,
+            "requested": e.requested,
+            "available": e.available
+        }), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
     return jsonify({
         "ok": True,
-        "sale_id": sale_id,
-        "items": resultados,
-        "total": round(total, 2)
+        "sale_id": result["sale_id"],
+        "items": result["items"],
+        "total": result["total"]
     }), 201
 
 @api_bp.route("/sales", methods=["GET"])
@@ -580,9 +441,14 @@ def list_sales():
     Query Parameters:
         from (str, optional): Fecha inicial (formato: YYYY-MM-DD)
         to (str, optional): Fecha final (formato: YYYY-MM-DD)
+        limit (int, optional): Ventas por página (activa la paginación por cursor)
+        after_id (int, optional): Cursor: ID de la última venta recibida
+        after_date (str, optional): Cursor: fecha de la última venta recibida
+        format (str, optional): "ndjson" para recibir una venta por línea en streaming
     
     Returns:
-        JSON: Lista de ventas agrupadas por ID
+        JSON: Lista de ventas agrupadas por ID (sin `limit`), o
+        {"items": [...], "next_cursor": {"after_id", "after_date"} | null} (con `limit`)
         - id (int): ID de la venta
         - date (str): Fecha y hora de la venta
         - items (array): Productos vendidos
@@ -590,9 +456,11 @@ def list_sales():
           - quantity (int): Cantidad vendida
           - price (float): Precio unitario
         - total (float): Total de la venta
+        Con format=ndjson cada línea es una venta con ese mismo formato.
     
     Status Codes:
         200: Ventas obtenidas exitosamente
+        400: Formato de fecha o cursor inválido
         401: No autorizado
     """
     
@@ -602,50 +470,47 @@ def list_sales():
     
     date_from = request.args.get("from")
     date_to = request.args.get("to")
+    limit = request.args.get("limit", type=int)
+    after_id = request.args.get("after_id", type=int)
+    after_date = request.args.get("after_date")
     
-    query = """
-        SELECT s.id, s.date, d.item_id, i.name, d.quantity, d.price
-        FROM sells s
-        JOIN details d ON s.id = d.sell_id
-        JOIN items i ON d.item_id = i.id
-        WHERE 1=1
-    """
-    params = []
-    
-    if date_from:
-        query += " AND DATE(s.date) >= ?"
-        params.append(date_from)
-    
-    if date_to:
-        query += " AND DATE(s.date) <= ?"
-        params.append(date_to)
-    
-    query += " ORDER BY s.date DESC, s.id DESC"
-    
-    rows = db.execute_query(query, tuple(params))
-    
-    sales_dict = {}
-    for row in rows:
-        sale_id, date, item_id, name, quantity, price = row
+    try:
+        if request.args.get("format") == "ndjson":
+            # Los parámetros se validan al crear el generador: en streaming un
+            # error llegaría con el 200 ya enviado
+            sales = sales_service.iter_sales(date_from, date_to, limit, after_id, after_date)
+            lines = (json.dumps(_sale_to_dict(sale)) + "\n" for sale in sales)
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson")
         
-        if sale_id not in sales_dict:
-            sales_dict[sale_id] = {
-                "id": sale_id,
-                "date": date,
-                "items": [],
-                "total": 0
-            }
+        if limit is None:
+            sales = sales_service.iter_sales(date_from, date_to, None, after_id, after_date)
+            return jsonify([_sale_to_dict(sale) for sale in sales]), 200
         
-        sales_dict[sale_id]["items"].append({
-            "product_name": name,
-            "quantity": quantity,
-            "price": price
-        })
-        sales_dict[sale_id]["total"] += quantity * price
+        page = sales_service.history_page(date_from, date_to, limit, after_id, after_date)
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     
-    sales = list(sales_dict.values())
-    
-    return jsonify(sales), 200
+    return jsonify({
+        "items": [_sale_to_dict(sale) for sale in page["sales"]],
+        "next_cursor": page["next_cursor"]
+    }), 200
+
+def _sale_to_dict(sale):
+    """Convierte una venta de BDConector.iter_sales al JSON de /api/sales."""
+    
+    return {
+        "id": sale["id"],
+        "date": sale["date"],
+        "items": [
+            {
+                "product_name": item["name"],
+                "quantity": item["quantity"],
+                "price": item["price"]
+            }
+            for item in sale["items"]
+        ],
+        "total": sale["total"]
+    }
     
 @api_bp.route("/items", methods=["GET"])
 def search_items():
@@ -655,10 +520,11 @@ def search_items():
     Requiere login: True.
     
     Query Parameters:
-        q (str): Término de búsqueda (nombre o código de barras)
+        q (str): Término de búsqueda (nombre, descripción o código de barras)
     
     Returns:
-        JSON: Lista de hasta 10 productos coincidentes
+        JSON: Lista de hasta 10 productos coincidentes, ordenados por relevancia
+        (un código de barras exacto va primero)
         - id (int): ID del producto
         - barcode (str): Código de barras
         - name (str): Nombre
@@ -675,28 +541,7 @@ def search_items():
     if auth_error:
         return auth_error
     
-    query_param = request.args.get("q", "").strip()
-    if not query_param:
-        return jsonify([]), 200
-    
-    rows = db.execute_query(
-        "SELECT id, barrs_code, name, description, quantity, price FROM items WHERE barrs_code LIKE ? OR name LIKE ? LIMIT 10",
-        (f"%{query_param}%", f"%{query_param}%")
-    )
-    
-    items = [
-        {
-            "id": row[0],
-            "barcode": row[1],
-            "name": row[2],
-            "description": row[3],
-            "stock": row[4],
-            "price": row[5]
-        }
-        for row in rows
-    ]
-    
-    return jsonify(items), 200
+    return jsonify(inventory_service.search(request.args.get("q", ""), limit=10)), 200
 
 @api_bp.route("/sales/<int:sale_id>", methods=["GET"])
 def get_sale_detail(sale_id):
@@ -727,35 +572,10 @@ def get_sale_detail(sale_id):
     if not session.get("user_id"):
         return jsonify({"error": "Unauthorized"}), 401
     
-    sale_data = db.execute_query(
-        """
-        SELECT s.id, s.date, i.name, d.quantity, d.price 
-        FROM sells s 
-        JOIN details d ON s.id = d.sell_id 
-        JOIN items i ON d.item_id = i.id 
-        WHERE s.id = ?
-        """,
-        (sale_id,)
-    )
-    
-    if not sale_data:
-        return jsonify({"error": "Sale not found"}), 404
-    
-    sale = {
-        "id": sale_data[0][0],
-        "date": sale_data[0][1],
-        "products": [],
-        "total": 0.0
-    }
-    
-    for row in sale_data:
-        product = {
-            "name": row[2],
-            "quantity": row[3],
-            "price": float(row[4])
-        }
-        sale["products"].append(product)
-        sale["total"] += product["quantity"] * product["price"]
+    try:
+        sale = sales_service.get_sale(sale_id)
+    except ServiceError as e:
+        return jsonify({"error": str(e)}), e.status
     
     return jsonify(sale), 200, {'Content-Type': 'application/json'}
 
@@ -799,33 +619,26 @@ def get_metrics():
     prev_end_date = (start_dt - timedelta(days=1)).strftime('%Y-%m-%d')
     prev_start_date = (start_dt - timedelta(days=period_days)).strftime('%Y-%m-%d')
     
+    # Una transacción de lectura: un recorrido de ventas para ambos períodos,
+    # ranking de productos y alertas de inventario (ver bd/bdMetrics.py)
+    metrics = db.get_sales_metrics(start_date, end_date, prev_start_date, prev_end_date)
+    
     # ============================================
     # KPIs DEL PERIODO ACTUAL
     # ============================================
     
-    kpi_query = """
-        SELECT 
-            COALESCE(SUM(d.quantity * d.price), 0) as revenue,
-            COUNT(DISTINCT s.id) as total_sales,
-            COALESCE(SUM(d.quantity), 0) as units_sold
-        FROM sells s
-        JOIN details d ON s.id = d.sell_id
-        WHERE DATE(s.date) BETWEEN ? AND ?
-    """
-    kpi_result = db.execute_query(kpi_query, (start_date, end_date))
-    revenue = float(kpi_result[0][0]) if kpi_result else 0
-    total_sales = int(kpi_result[0][1]) if kpi_result else 0
-    units_sold = int(kpi_result[0][2]) if kpi_result else 0
+    revenue = float(metrics["current"]["revenue"])
+    total_sales = int(metrics["current"]["sales"])
+    units_sold = int(metrics["current"]["units"])
     avg_ticket = round(revenue / total_sales, 2) if total_sales > 0 else 0
     
     # ============================================
     # KPIs DEL PERÍODO ANTERIOR (para comparación)
     # ============================================
     
-    prev_kpi_result = db.execute_query(kpi_query, (prev_start_date, prev_end_date))
-    prev_revenue = float(prev_kpi_result[0][0]) if prev_kpi_result else 0
-    prev_total_sales = int(prev_kpi_result[0][1]) if prev_kpi_result else 0
-    prev_units_sold = int(prev_kpi_result[0][2]) if prev_kpi_result else 0
+    prev_revenue = float(metrics["previous"]["revenue"])
+    prev_total_sales = int(metrics["previous"]["sales"])
+    prev_units_sold = int(metrics["previous"]["units"])
     prev_avg_ticket = round(prev_revenue / prev_total_sales, 2) if prev_total_sales > 0 else 0
     
     # Calcula cambios porcentuales
@@ -843,19 +656,6 @@ def get_metrics():
     # VENTAS EN EL TIEMPO (xdia)
     # ============================================
     
-    sales_over_time_query = """
-        SELECT 
-            DATE(s.date) as sale_date,
-            COALESCE(SUM(d.quantity * d.price), 0) as daily_revenue,
-            COUNT(DISTINCT s.id) as daily_sales
-        FROM sells s
-        JOIN details d ON s.id = d.sell_id
-        WHERE DATE(s.date) BETWEEN ? AND ?
-        GROUP BY DATE(s.date)
-        ORDER BY sale_date ASC
-    """
-    sales_over_time = db.execute_query(sales_over_time_query, (start_date, end_date))
-    
     date_range = {}
     current_dt = datetime.strptime(start_date, '%Y-%m-%d')
     end_dt = datetime.strptime(end_date, '%Y-%m-%d')
@@ -864,11 +664,10 @@ def get_metrics():
         date_range[date_str] = {"revenue": 0, "sales": 0}
         current_dt += timedelta(days=1)
     
-    for row in sales_over_time:
-        date_str = row[0] if isinstance(row[0], str) else row[0].strftime('%Y-%m-%d')
+    for date_str, day_totals in metrics["daily"].items():
         if date_str in date_range:
-            date_range[date_str]["revenue"] = float(row[1])
-            date_range[date_str]["sales"] = int(row[2])
+            date_range[date_str]["revenue"] = float(day_totals["revenue"])
+            date_range[date_str]["sales"] = int(day_totals["sales"])
     
     labels = []
     revenues = []
@@ -889,22 +688,6 @@ def get_metrics():
     # TOP PRODUCTOS
     # ============================================
     
-    top_products_query = """
-        SELECT 
-            i.id,
-            i.name,
-            i.barrs_code,
-            SUM(d.quantity) as units,
-            SUM(d.quantity * d.price) as revenue
-        FROM details d
-        JOIN items i ON d.item_id = i.id
-        JOIN sells s ON d.sell_id = s.id
-        WHERE DATE(s.date) BETWEEN ? AND ?
-        GROUP BY i.id, i.name, i.barrs_code
-        ORDER BY units DESC
-        LIMIT 10
-    """
-    top_products_result = db.execute_query(top_products_query, (start_date, end_date))
     top_products = [
         {
             "id": row[0],
@@ -913,50 +696,16 @@ def get_metrics():
             "units": int(row[3]),
             "revenue": float(row[4])
         }
-        for row in top_products_result
+        for row in metrics["top_products"]
     ]
     
     # ============================================
-    # VENTAS POR DIA DE LA SEMANA
-    # ============================================
-    
-    weekday_query = """
-        SELECT 
-            CAST(strftime('%w', s.date) AS INTEGER) as weekday,
-            COUNT(DISTINCT s.id) as sales_count
-        FROM sells s
-        WHERE DATE(s.date) BETWEEN ? AND ?
-        GROUP BY weekday
-    """
-    weekday_result = db.execute_query(weekday_query, (start_date, end_date))
-    
-    # SQLite: 0=Domingo, 1=Lunes, etc
-    # Convierte en el sig formato: 0=Lunes, 1=Martes, ... 6=Domingo
-    sales_by_weekday = [0, 0, 0, 0, 0, 0, 0]  # lun, mar, mie, jue, vie, sab, dom
-    for row in weekday_result:
-        sqlite_weekday = int(row[0])  # 0=Dom, 1=Lun, ...
-        # Convierte en el sig formato: Dom(0)->6, Lun(1)->0, Mar(2)->1, ...
-        adjusted_weekday = (sqlite_weekday - 1) if sqlite_weekday > 0 else 6
-        sales_by_weekday[adjusted_weekday] = int(row[1])
-    
-    # ============================================
-    # VENTAS POR HORA
+    # VENTAS POR DIA DE LA SEMANA Y POR HORA
     # ============================================
     
-    hourly_query = """
-        SELECT 
-            CAST(strftime('%H', s.date) AS INTEGER) as hour,
-            COUNT(DISTINCT s.id) as sales_count
-        FROM sells s
-        WHERE DATE(s.date) BETWEEN ? AND ?
-        GROUP BY hour
-    """
-    hourly_result = db.execute_query(hourly_query, (start_date, end_date))
-    
-    sales_by_hour = [0] * 24
-    for row in hourly_result:
-        hour = int(row[0])
-        sales_by_hour[hour] = int(row[1])
+    # Formato: 0=Lunes, 1=Martes, ... 6=Domingo
+    sales_by_weekday = metrics["sales_by_weekday"]
+    sales_by_hour = metrics["sales_by_hour"]
     
     # ============================================
     # COMPARATIVA (período actual vs anterior)
@@ -971,28 +720,9 @@ def get_metrics():
     # ALERTAS DE INVENTARIO
     # ============================================
     
-    # Productos agotados
-    out_of_stock = db.execute_query(
-        "SELECT COUNT(*) FROM items WHERE quantity = 0 AND status = 1"
-    )[0][0]
-    
-    # Productos con stock bajo
-    low_stock = db.execute_query(
-        "SELECT COUNT(*) FROM items WHERE quantity > 0 AND quantity <= min_quantity AND status = 1"
-    )[0][0]
-    
-    # Productos sin movimientos
-    no_movement_query = """
-        SELECT COUNT(*) FROM items i
-        WHERE i.status = 1
-        AND i.id NOT IN (
-            SELECT DISTINCT d.item_id 
-            FROM details d
-            JOIN sells s ON d.sell_id = s.id
-            WHERE DATE(s.date) >= DATE('now', '-30 days')
-        )
-    """
-    no_movement = db.execute_query(no_movement_query)[0][0]
+    out_of_stock = metrics["alerts"]["out_of_stock"]
+    low_stock = metrics["alerts"]["low_stock"]
+    no_movement = metrics["alerts"]["no_movement"]
     
     # ============================================
     # INSIGHTS
@@ -1002,19 +732,7 @@ def get_metrics():
     if sales_by_weekday:
         days_names = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
         max_idx = sales_by_weekday.index(max(sales_by_weekday))
-        
-        best_day_revenue_query = """
-            SELECT COALESCE(SUM(d.quantity * d.price), 0)
-            FROM sells s
-            JOIN details d ON s.id = d.sell_id
-            WHERE DATE(s.date) BETWEEN ? AND ?
-            AND CAST(strftime('%w', s.date) AS INTEGER) = ?
-        """
-        sqlite_day = (max_idx + 1) % 7  # Lun(0)->1, Dom(6)->0
-        best_day_revenue = db.execute_query(
-            best_day_revenue_query, 
-            (start_date, end_date, sqlite_day)
-        )[0][0]
+        best_day_revenue = metrics["revenue_by_weekday"][max_idx]
         
         best_day = {
             "name": days_names[max_idx],
@@ -1083,4 +801,174 @@ def get_metrics():
             "end": end_date,
             "days": period_days
         }
-    }), 200
\ No newline at end of file
+    }), 200
+
+@api_bp.route("/import/jobs/<job_id>", methods=["GET"])
+def get_import_job(job_id):
+    """
+    Consulta el progreso de una importación CSV en segundo plano.
+    
+    Requiere login: True.
+    Requiere rol: admin.
+    
+    Args:
+        job_id (str): ID devuelto por /import/confirm
+    
+    Returns:
+        JSON: Estado de la importación
+        - id (str): ID del job
+        - status (str): queued, running, done o failed
+        - rows_processed (int): Filas leídas hasta ahora
+        - total_rows (int|null): Filas totales si se conocen
+        - rows_per_second (float): Velocidad promedio
+        - inserted (int), updated (int), failed (int): Resultado parcial
+        - errors (array): {"row", "error"} de las filas con error
+        - errors_truncated (bool): Si hay más errores que los listados
+        - elapsed (float): Segundos transcurridos
+        - error (str|null): Motivo si status es failed
+    
+    Status Codes:
+        200: Job encontrado
+        401: No autorizado
+        403: Permiso denegado (no es admin)
+        404: Job inexistente o expirado
+    """
+    
+    auth_error = require_auth()
+    if auth_error:
+        return auth_error
+    
+    if session.get("role") != "admin":
+        return jsonify({"error": "Permiso denegado"}), 403
+    
+    job = import_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Importación no encontrada"}), 404
+    
+    return jsonify(job.to_dict()), 200
+
+@api_bp.route("/log_level", methods=["GET", "PUT"])
+def log_level():
+    """
+    Consulta o cambia el nivel de log del servidor sin reiniciarlo.
+    
+    Requiere login: True.
+    Requiere rol: admin.
+    
+    Request Body (JSON, PUT):
+        level (str): DEBUG, INFO, WARNING, ERROR o CRITICAL
+    
+    Returns:
+        JSON: {"level": "INFO"} con el nivel vigente
+    
+    Status Codes:
+        200: OK
+        400: Nivel inválido
+        401: No autorizado
+        403: Permiso denegado (no es admin)
+    
+    Note:
+        El cambio dura hasta reiniciar; el nivel inicial sale de LOG_LEVEL.
+    """
+    
+    auth_error = require_auth()
+    if auth_error:
+        return auth_error
+    
+    if session.get("role") != "admin":
+        return jsonify({"error": "Permiso denegado"}), 403
+    
+    if request.method == "PUT":
+        data = request.get_json(silent=True) or {}
+        try:
+            logger.set_level(data.get("level", ""))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        logger.warning("Nivel de log cambiado a %s", logger.get_level())
+    
+    return jsonify({"level": logger.get_level()}), 200
+
+@api_bp.route("/slow_queries", methods=["GET", "DELETE"])
+def list_slow_queries():
+    """
+    Consultas SQL más lentas registradas, con su EXPLAIN QUERY PLAN.
+    
+    Requiere login: True.
+    Requiere rol: admin.
+    
+    Query Params:
+        limit (int): Cantidad de consultas (default: 20, máx: 200)
+        sort (str): total (default), max, count o recent
+    
+    Returns:
+        JSON (GET): {"enabled", "threshold_ms", "queries": [{sql, params_shape,
+        count, total_ms, avg_ms, max_ms, last_rows, plan, first_seen, last_seen}]}
+        JSON (DELETE): {"deleted": int}
+    
+    Status Codes:
+        200: OK
+        400: Orden inválido
+        401: No autorizado
+        403: Permiso denegado (no es admin)
+    """
+    
+    auth_error = require_auth()
+    if auth_error:
+        return auth_error
+    
+    if session.get("role") != "admin":
+        return jsonify({"error": "Permiso denegado"}), 403
+    
+    if request.method == "DELETE":
+        return jsonify({"deleted": db.clear_slow_queries()}), 200
+    
+    limit = max(1, min(request.args.get("limit", 20, type=int), 200))
+    if slow_queries.enabled:
+        # Incluye lo acumulado en memoria que el thread todavía no guardó
+        slow_queries.flush()
+    try:
+        queries = db.list_slow_queries(limit, request.args.get("sort", "total"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "enabled": slow_queries.enabled,
+        "threshold_ms": slow_queries.threshold_ms,
+        "queries": queries
+    }), 200
+
+@api_bp.route("/internal/metrics", methods=["GET"])
+def internal_metrics():
+    """
+    Métricas operativas en formato de texto de Prometheus (0.0.4).
+    
+    Requiere login: False.
+    Requiere: header "Authorization: Bearer <METRICS_TOKEN>" si la variable
+    METRICS_TOKEN está definida; si no, solo se atienden pedidos desde
+    localhost.
+    
+    Returns:
+        text/plain: Requests y latencia por ruta de la API, latencia de las
+        consultas por tipo de sentencia, estado del pool y del cache de
+        productos, ventas (totales y por minuto), importaciones pendientes y
+        tamaño de la base
+    
+    Status Codes:
+        200: OK
+        401: Token inválido o ausente
+        403: Pedido remoto sin METRICS_TOKEN configurado
+    
+    Note:
+        Con TELEMETRY=0 no se instrumentan requests ni consultas; el resto
+        de las métricas se sigue informando.
+    """
+    
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return jsonify({"error": "No autorizado"}), 401
+    elif request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({"error": "Permiso denegado"}), 403
+    
+    return Response(telemetry.render(), content_type=METRICS_CONTENT_TYPE)
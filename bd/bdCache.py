@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+
+class ItemCache:
+    """
+    Cache LRU en memoria de productos, indexado por id y por código de barras.
+
+    Características:
+    - Tamaño acotado con expulsión LRU
+    - Índice secundario barrs_code -> id (una sola copia de cada fila)
+    - Invalidación explícita desde las escrituras de BDConector
+    - Contador de generación: una lectura que empezó antes de una
+      invalidación no puede volver a cargar el valor viejo
+    - Contadores de hits/misses para medir la efectividad
+
+    Guarda filas con la forma de get_item_by_barcode:
+    (id, barrs_code, name, description, quantity, price)
+
+    Attributes:
+        max_size (int): Máximo de productos cacheados (0 = cache deshabilitado)
+    """
+
+    def __init__(self, max_size=2048):
+        """
+        Inicializa el cache vacío.
+
+        Args:
+            max_size (int): Máximo de productos cacheados (default: 2048, 0 = deshabilitado)
+        """
+
+        self.max_size = max_size
+        self._items = OrderedDict()  # id -> fila, la más reciente al final
+        self._barcodes = {}          # barrs_code -> id
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted": 0,
+            "invalidations": 0
+        }
+
+    def generation(self):
+        """
+        Obtiene la generación actual (tomarla antes de leer de la base).
+
+        Returns:
+            int: Número de invalidaciones realizadas hasta ahora
+        """
+
+        with self._lock:
+            return self._generation
+
+    def get_by_barcode(self, barcode):
+        """
+        Busca un producto por código de barras.
+
+        Thread-safe: Sí.
+
+        Returns:
+            tuple|None: Fila cacheada o None si no está
+        """
+
+        with self._lock:
+            item_id = self._barcodes.get(barcode)
+            if item_id is None:
+                self._stats["misses"] += 1
+                return None
+            self._items.move_to_end(item_id)
+            self._stats["hits"] += 1
+            return self._items[item_id]
+
+    def put(self, row, generation):
+        """
+        Guarda una fila leída de la base.
+
+        Thread-safe: Sí.
+
+        Args:
+            row (tuple): (id, barrs_code, name, description, quantity, price)
+            generation (int): Valor de generation() tomado antes de la lectura;
+                si hubo invalidaciones desde entonces la fila se descarta
+        """
+
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            item_id, barcode = row[0], row[1]
+            self._remove(item_id)
+            self._items[item_id] = row
+            if barcode:
+                self._barcodes[barcode] = item_id
+
+            while len(self._items) > self.max_size:
+                old_id, old_row = self._items.popitem(last=False)
+                if old_row[1]:
+                    self._barcodes.pop(old_row[1], None)
+                self._stats["evicted"] += 1
+
+    def invalidate(self, item_ids=(), barcodes=()):
+        """
+        Quita productos del cache (llamar después del commit de la escritura).
+
+        Thread-safe: Sí.
+
+        Args:
+            item_ids (iterable): IDs modificados
+            barcodes (iterable): Códigos de barras modificados
+        """
+
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            for barcode in barcodes:
+                item_id = self._barcodes.get(barcode)
+                if item_id is not None:
+                    self._remove(item_id)
+            for item_id in item_ids:
+                self._remove(item_id)
+
+    def clear(self):
+        """Vacía el cache (por ejemplo después de escrituras masivas)."""
+
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            self._items.clear()
+            self._barcodes.clear()
+
+    def stats(self):
+        """
+        Obtiene los contadores del cache.
+
+        Thread-safe: Sí.
+
+        Returns:
+            dict: hits, misses, evicted, invalidations, hit_ratio, size, max_size
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._items)
+            stats["max_size"] = self.max_size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _remove(self, item_id):
+        """Quita un producto y su código de barras. Requiere el lock tomado."""
+
+        row = self._items.pop(item_id, None)
+        if row is not None and row[1]:
+            self._barcodes.pop(row[1], None)
@@ -1,53 +1,121 @@
 import sqlite3
 import contextlib
+import threading
 
-from flask import jsonify
 from bd.bdErrors import *
+from bd.bdPool import ConnectionPool
+from bd.bdCache import ItemCache
+from bd.bdObserver import ObservedCursor
+from bd.bdPragmas import get_pragma_profile
+from bd.bdMigrations import LATEST_VERSION, MIGRATIONS, SCHEMA_VERSION_TABLE
+from bd.bdMetrics import compute_sales_metrics
+from bd.bdRollup import apply_sale_to_rollups, rebuild_rollups
+from bd.bdSearch import FTS_RANK, build_match_query, detect_fts_mode
+from bd.bdSlowQueries import SORT_COLUMNS, explain_plan, save_entries
+from bd.bdQueries import date_range_clause, day_range
 from debug.logger import logger
 from data.validators import ItemValidator, UserValidator, ValidationError
 
+# Columnas de orden permitidas para list_products: (expresión SQL, conversor del cursor)
+PRODUCT_SORT_FIELDS = {
+    "id": ("id", int),
+    "name": ("name COLLATE NOCASE", str),
+    "stock": ("quantity", int),
+    "price": ("price", float),
+}
+
+PRODUCT_VIEW_MODES = {
+    "all": None,
+    "in_stock": "quantity > 0",
+    "out_of_stock": "quantity = 0",
+    "low_stock": "quantity > 0 AND quantity <= min_quantity",
+    "above_min": "quantity > min_quantity",
+}
+
+# Columnas que update_item permite modificar
+ITEM_UPDATE_FIELDS = ("name", "description", "quantity", "min_quantity", "price", "status")
+
+ITEM_COLUMNS = "id, barrs_code, name, description, quantity, price"
+
+# Máximo de parámetros por cláusula IN (SQLite < 3.32 admite 999 variables)
+SQL_IN_CHUNK = 500
+
 class BDConector:
     """
     Conector de base de datos SQLite con gestión automática de transacciones.
     
     Características:
     - Context managers para conexiones seguras
+    - Pool de conexiones reutilizables (PRAGMAs aplicados una sola vez por conexión)
+    - Perfil de PRAGMAs configurable (WAL por defecto, ver bd/bdPragmas.py)
     - Commit/rollback automático
     - Foreign keys habilitadas por defecto
     - Manejo centralizado de errores
+    - Cache LRU de productos por id/código de barras (ver bd/bdCache.py)
     
     Attributes:
         db_path (str): Ruta al archivo de base de datos SQLite
+        pragma_profile (str): Nombre del perfil de PRAGMAs aplicado
     """
     
-    def __init__(self, db_path):
+    def __init__(self, db_path, pool_size=8, pool_timeout=5.0, pool_idle_timeout=300.0,
+                 pragma_profile="production", item_cache_size=2048):
         """
         Inicializa el conector de base de datos.
         
         Args:
             db_path (str): Ruta al archivo SQLite (ej: './data/stock.db')
+            pool_size (int): Máximo de conexiones abiertas en el pool (default: 8)
+            pool_timeout (float): Segundos de espera por una conexión libre (default: 5.0)
+            pool_idle_timeout (float): Segundos de inactividad antes de cerrar una conexión (default: 300.0)
+            pragma_profile (str): Perfil de PRAGMAs ("production", "durable", "legacy")
+            item_cache_size (int): Máximo de productos en el cache de lecturas (default: 2048, 0 = sin cache)
         
         Example:
-            db = BDConector('./data/stock.db')
+            db = BDConector('./data/stock.db', pool_size=4, pragma_profile='durable')
         """
         
         self.db_path = db_path
+        self.pragma_profile, self._pragmas = get_pragma_profile(pragma_profile)
+        self._pool = ConnectionPool(
+            self._connect,
+            max_size=pool_size,
+            timeout=pool_timeout,
+            idle_timeout=pool_idle_timeout
+        )
+        self._item_cache = ItemCache(item_cache_size)
+        # Modo de búsqueda FTS ("trigram", "prefix" o None); se detecta al primer uso
+        self._fts_mode = None
+        self._fts_checked = False
+        # Esquema: se verifica al primer uso (ver ensure_schema), no al construir
+        self._schema_lock = threading.RLock()
+        self._schema_ready = False
+        self._schema_initializing = False
+        # Funciones observer(sql, params, seconds, rows); ver add_query_observer
+        self._query_observers = ()
 
     def _connect(self):
         """
         Crea una conexión a la base de datos con configuración segura.
         
-        Thread-safe: No (crear una instancia por thread).
+        Usado por el pool como factory; no llamar directamente.
         
         Returns:
             sqlite3.Connection: Conexión activa con foreign keys habilitadas
+                y el perfil de PRAGMAs aplicado
         
         Note:
-            PRAGMA foreign_keys = ON asegura integridad referencial
+            - PRAGMA foreign_keys = ON asegura integridad referencial
+            - Los PRAGMAs del perfil (journal_mode, synchronous, busy_timeout,
+              cache_size, mmap_size, temp_store) se aplican una vez por conexión
+            - check_same_thread=False porque la conexión puede pasar entre
+              threads, aunque el pool garantiza que la use uno solo a la vez
         """
         
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.execute("PRAGMA foreign_keys = ON")
+        for pragma, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
         return conn
 
     @contextlib.contextmanager
@@ -55,7 +123,7 @@ class BDConector:
         """
         Context manager para ejecutar consultas con transacciones automáticas.
         
-        Thread-safe: No (crear una instancia por thread).
+        Thread-safe: Sí (cada bloque usa una conexión prestada del pool).
         Transaccional: Sí (auto commit/rollback).
         
         Yields:
@@ -70,32 +138,165 @@ class BDConector:
         
         Note:
             - Hace commit automático al salir del bloque
-            - Hace rollback en caso de excepción
-            - Cierra la conexión siempre
+            - Hace rollback en caso de cualquier excepción
+            - Devuelve la conexión al pool siempre
+            - El primer uso crea o migra el esquema si hace falta (ensure_schema)
+            - Con observadores registrados cada sentencia y el commit se
+              informan a add_query_observer()
         """
         
-        conn = self._connect()
+        if not self._schema_ready:
+            self.ensure_schema()
+        
+        conn = self._pool.acquire()
+        observers = self._query_observers
         try:
-            cur = conn.cursor()
-            yield cur
-            conn.commit()
+            if observers:
+                cur = conn.cursor(ObservedCursor)
+                cur.observers = observers
+                yield cur
+                cur.commit()
+            else:
+                cur = conn.cursor()
+                yield cur
+                conn.commit()
             logger.debug(
-                f"Transacción completa | "
-                f"Filas afectadas: {cur.rowcount} | "
-                f"Último ID: {cur.lastrowid}"
+                "Transacción completa | Filas afectadas: %s | Último ID: %s",
+                cur.rowcount, cur.lastrowid
             )
         
         except sqlite3.Error as e:
             conn.rollback()
-            logger.error(f"Database error: {e}", exc_info=True)
+            logger.error("Database error: %s", e, exc_info=True)
             raise DatabaseError(f"Database error: {e}")    
+        
+        except Exception:
+            # Errores de negocio (StockError, ValueError) también revierten:
+            # la conexión vuelve al pool sin transacción abierta
+            conn.rollback()
+            raise
             
         finally:
-            conn.close()
+            self._pool.release(conn)
+    
+    def add_query_observer(self, observer):
+        """
+        Registra una función que se llama después de cada sentencia SQL.
+        
+        Thread-safe: Sí (registrar al inicio, antes de atender requests).
+        
+        Args:
+            observer (callable): observer(sql, params, seconds, rows), llamada
+                en el thread que ejecutó la sentencia. `seconds` es el tiempo
+                dentro de SQLite, `rows` las filas leídas (o afectadas en
+                escrituras) y `params` None en executemany. El commit se
+                informa con sql "COMMIT".
+        
+        Example:
+            db.add_query_observer(lambda sql, params, seconds, rows: print(sql, seconds))
+        
+        Note:
+            Sin observadores las consultas usan el cursor normal de sqlite3,
+            sin costo de medición. El observer no debe lanzar excepciones.
+        """
+        
+        self._query_observers = self._query_observers + (observer,)
+    
+    def pool_stats(self):
+        """
+        Obtiene los contadores del pool de conexiones.
+        
+        Thread-safe: Sí.
+        
+        Returns:
+            dict: Ver ConnectionPool.stats() (size, idle, in_use, hits, misses, waits, wait_time, ...)
+        
+        Example:
+            stats = db.pool_stats()
+            print(f"Hits: {stats['hits']} | Esperas: {stats['waits']}")
+        """
+        
+        return self._pool.stats()
+    
+    def item_cache_stats(self):
+        """
+        Obtiene los contadores del cache de productos.
+        
+        Thread-safe: Sí.
+        
+        Returns:
+            dict: Ver ItemCache.stats() (hits, misses, hit_ratio, size, evicted, ...)
+        """
+        
+        return self._item_cache.stats()
+    
+    def invalidate_item_cache(self, item_ids=None):
+        """
+        Invalida el cache de productos.
+        
+        Los métodos de escritura de BDConector ya lo hacen solos; llamar a
+        este método solo después de modificar items con execute_query o SQL
+        externo.
+        
+        Thread-safe: Sí.
+        
+        Args:
+            item_ids (iterable|None): IDs modificados (None = vaciar todo)
+        """
+        
+        if item_ids is None:
+            self._item_cache.clear()
+        else:
+            self._item_cache.invalidate(item_ids=item_ids)
+    
+    def close(self):
+        """
+        Cierra todas las conexiones del pool.
+        
+        Thread-safe: Sí.
+        
+        Note:
+            Después de llamar a close() el conector ya no puede ejecutar consultas.
+        """
+        
+        self._pool.close()
+    
+    def warm_up(self, connections=2):
+        """
+        Prepara el conector para atender requests sin demoras iniciales.
+        
+        Thread-safe: Sí.
+        
+        Args:
+            connections (int): Conexiones del pool a abrir por adelantado (default: 2)
+        
+        Returns:
+            dict: schema_version, connections (abiertas) y fts (modo de búsqueda)
+        
+        Raises:
+            DatabaseError: Si no se puede abrir la base
+        
+        Note:
+            Crea o migra el esquema si hace falta (ensure_schema). Además de
+            abrir conexiones deja resuelto el modo de búsqueda y lee las
+            páginas del índice de productos, que el primer request usaría de
+            todas formas.
+        """
+        
+        self.ensure_schema()
+        opened = self._pool.warm(connections)
+        fts = self.fts_mode()
+        self.execute_query("SELECT COUNT(*) FROM items")
+        return {
+            "schema_version": self.schema_version(),
+            "connections": opened,
+            "fts": fts
+        }
     
     def init_db(self):
         """
-        Inicializa la base de datos creando todas las tablas necesarias.
+        Inicializa la base de datos creando todas las tablas necesarias
+        y aplicando las migraciones pendientes.
         
         Thread-safe: Sí (con locking de SQLite).
         Transaccional: Sí.
@@ -106,6 +307,8 @@ class BDConector:
             - items: Productos del inventario
             - sells: Registro de transacciones de venta
             - details: Detalles de productos vendidos por transacción
+            - schema_version: Migraciones aplicadas (ver migrate())
+            - daily_item_sales, hourly_sales: Rollups de ventas (vía migraciones)
         
         Raises:
             DatabaseError: Si falla la creación de alguna tabla
@@ -157,11 +360,154 @@ class BDConector:
             FOREIGN KEY (item_id) REFERENCES items (id)
         )
         """
-        with self._cursor() as cur:
-            cur.execute(users_table_query)  
-            cur.execute(items_table_query)
-            cur.execute(sells_table_query)
-            cur.execute(sells_details_table_query)
+        with self._schema_lock:
+            # _cursor() no debe volver a llamar a ensure_schema() mientras tanto
+            initializing = self._schema_initializing
+            self._schema_initializing = True
+            try:
+                with self._cursor() as cur:
+                    cur.execute(users_table_query)  
+                    cur.execute(items_table_query)
+                    cur.execute(sells_table_query)
+                    cur.execute(sells_details_table_query)
+                    cur.execute(SCHEMA_VERSION_TABLE)
+                
+                self.migrate()
+            finally:
+                self._schema_initializing = initializing
+            self._schema_ready = True
+    
+    def ensure_schema(self):
+        """
+        Crea el esquema y aplica migraciones, una sola vez por proceso.
+        
+        Thread-safe: Sí (los demás threads esperan a que termine).
+        Idempotente: Sí.
+        
+        Returns:
+            bool: True si se ejecutó init_db(), False si el esquema ya estaba al día
+        
+        Raises:
+            DatabaseError: Si falla la creación del esquema o una migración
+        
+        Note:
+            _cursor() lo llama antes del primer uso, así importar
+            bd/bdInstance.py no abre la base. Si schema_version ya registra la
+            última migración se omite todo el DDL de init_db() con una sola
+            consulta.
+        """
+        
+        if self._schema_ready:
+            return False
+        
+        with self._schema_lock:
+            if self._schema_ready or self._schema_initializing:
+                # Ya lista, o llamada desde el propio init_db() (mismo thread)
+                return False
+            
+            if self._stored_schema_version() >= LATEST_VERSION:
+                self._schema_ready = True
+                return False
+            
+            logger.info("Inicializando esquema de la base de datos")
+            self.init_db()
+            return True
+    
+    def _stored_schema_version(self):
+        """
+        Lee la versión de esquema sin pasar por _cursor() (ver ensure_schema).
+        
+        Returns:
+            int: Última versión aplicada (0 si la base es nueva)
+        """
+        
+        conn = self._pool.acquire()
+        try:
+            row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+            return row[0]
+        except sqlite3.OperationalError:
+            # Base nueva: todavía no existe schema_version
+            return 0
+        finally:
+            self._pool.release(conn)
+    
+    def schema_version(self):
+        """
+        Obtiene la versión de esquema aplicada.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Returns:
+            int: Última versión de migración aplicada (0 si no hay ninguna)
+        """
+        
+        rows = self.execute_query("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return rows[0][0]
+    
+    def migrate(self):
+        """
+        Aplica en orden las migraciones pendientes de bd/bdMigrations.py.
+        
+        Thread-safe: Sí (BEGIN IMMEDIATE serializa procesos que migren a la vez).
+        Transaccional: Sí (una transacción por migración).
+        Idempotente: Sí (las versiones aplicadas se registran en schema_version).
+        
+        Returns:
+            list[int]: Versiones aplicadas en esta llamada
+        
+        Raises:
+            DatabaseError: Si falla una migración (se revierte solo esa migración)
+        
+        Example:
+            applied = db.migrate()
+            if applied:
+                print(f"Migraciones aplicadas: {applied}")
+        """
+        
+        done = {row[0] for row in self.execute_query("SELECT version FROM schema_version")}
+        applied = []
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            if migration.version in done:
+                continue
+            
+            with self._cursor() as cur:
+                # Lock de escritura antes de releer la versión: otro proceso
+                # puede haber aplicado la migración mientras esperábamos
+                cur.execute("BEGIN IMMEDIATE")
+                cur.execute("SELECT 1 FROM schema_version WHERE version = ?", (migration.version,))
+                if cur.fetchone():
+                    continue
+                
+                migration.apply(cur)
+                cur.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (migration.version, migration.description)
+                )
+            
+            logger.info("Migración %s aplicada: %s", migration.version, migration.description)
+            applied.append(migration.version)
+        
+        if applied:
+            self._fts_checked = False
+        return applied
+    
+    def fts_mode(self):
+        """
+        Indica si la búsqueda de texto completo (items_fts) está disponible.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura, resultado cacheado).
+        
+        Returns:
+            str|None: "trigram", "prefix" o None si se usa LIKE (SQLite sin FTS5)
+        """
+        
+        if not self._fts_checked:
+            with self._cursor() as cur:
+                self._fts_mode = detect_fts_mode(cur)
+            self._fts_checked = True
+        return self._fts_mode
     
     def create_table(self, table_name, columns):
         """
@@ -228,9 +574,9 @@ class BDConector:
         with self._cursor() as cur:
             cur.execute(query, params)
             if fetch:
-                logger.debug(f"Executed query: {query} with params: {params}")
+                logger.debug("Executed query: %s with params: %s", query, params)
                 return cur.fetchall()
-            logger.debug(f"Rows affected: {cur.rowcount} for query: {query} with params: {params}")
+            logger.debug("Rows affected: %s for query: %s with params: %s", cur.rowcount, query, params)
             return cur.rowcount
     
     def user_exists(self, username, email):
@@ -317,7 +663,84 @@ class BDConector:
             "INSERT INTO items (barrs_code, description, name, quantity, min_quantity, price) VALUES (?, ?, ?, ?, ?, ?)",
             (barrs_code, description, name, quantity, min_quantity, price)
         )
+        if barrs_code:
+            self._item_cache.invalidate(barcodes=[barrs_code])
+        
+    def import_items(self, items, upsert=False):
+        """
+        Inserta un lote de productos en una sola transacción.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí (BEGIN IMMEDIATE, un executemany por lote).
+        
+        Args:
+            items (list[dict]): Productos ya validados con barrs_code (str|None),
+                description, name, quantity, min_quantity, price
+            upsert (bool): Si True un código de barras existente se actualiza
+                (nombre, descripción, stock, mínimo y precio); si False esa
+                fila se rechaza
+        
+        Returns:
+            tuple[int, int, list]: (insertados, actualizados, rechazados) donde
+                rechazados es una lista de (índice en items, mensaje)
+        
+        Raises:
+            DatabaseError: Si hay un error SQL (se revierte todo el lote)
         
+        Example:
+            inserted, updated, rejected = db.import_items(batch, upsert=True)
+        
+        Note:
+            Usado por data/importer.py. Un código repetido dentro del mismo
+            lote cuenta como existente (en upsert gana la última fila).
+        """
+        
+        barcodes = list({item["barrs_code"] for item in items if item["barrs_code"]})
+        rejected = []
+        rows = []
+        updated = 0
+        
+        with self._cursor() as cur:
+            cur.execute("BEGIN IMMEDIATE")
+            
+            existing = set()
+            for start in range(0, len(barcodes), SQL_IN_CHUNK):
+                chunk = barcodes[start:start + SQL_IN_CHUNK]
+                cur.execute(
+                    f"SELECT barrs_code FROM items WHERE barrs_code IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                existing.update(row[0] for row in cur.fetchall())
+            
+            for index, item in enumerate(items):
+                code = item["barrs_code"]
+                if code and code in existing:
+                    if not upsert:
+                        rejected.append((index, f"Código de barras duplicado: {code}"))
+                        continue
+                    updated += 1
+                elif code:
+                    existing.add(code)
+                
+                rows.append((code, item["description"], item["name"], item["quantity"],
+                             item["min_quantity"], item["price"]))
+            
+            query = "INSERT INTO items (barrs_code, description, name, quantity, min_quantity, price) VALUES (?, ?, ?, ?, ?, ?)"
+            if upsert:
+                query += """
+                    ON CONFLICT (barrs_code) DO UPDATE SET
+                        description = excluded.description,
+                        name = excluded.name,
+                        quantity = excluded.quantity,
+                        min_quantity = excluded.min_quantity,
+                        price = excluded.price
+                """
+            cur.executemany(query, rows)
+        
+        if updated:
+            self._item_cache.invalidate(barcodes=barcodes)
+        return len(rows) - updated, updated, rejected
+    
     def get_item_by_barcode(self, barcode):
         """
         Busca un producto por su código de barras.
@@ -336,13 +759,56 @@ class BDConector:
             if item:
                 item_id, barcode, name, desc, stock, price = item
                 print(f"{name}: ${price} ({stock} unidades)")
+        
+        Note:
+            Se resuelve desde el cache de productos si está; solo los
+            códigos inexistentes van siempre a la base.
         """
         
+        item = self._item_cache.get_by_barcode(barcode)
+        if item is not None:
+            return item
+        
+        generation = self._item_cache.generation()
         rows = self.execute_query(
-            "SELECT id, barrs_code, name, description, quantity, price FROM items WHERE barrs_code = ?",
+            f"SELECT {ITEM_COLUMNS} FROM items WHERE barrs_code = ?",
             (barcode,)
         )
-        return rows[0] if rows else None
+        if not rows:
+            return None
+        self._item_cache.put(rows[0], generation)
+        return rows[0]
+    
+    def update_item(self, item_id, fields):
+        """
+        Actualiza campos de un producto.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí.
+        
+        Args:
+            item_id (int): ID del producto
+            fields (dict): {columna: valor}; solo se usan las de ITEM_UPDATE_FIELDS
+        
+        Returns:
+            int: Filas afectadas (0 si no hay campos válidos o el producto no existe)
+        
+        Raises:
+            DatabaseError: Si hay un error SQL
+        
+        Example:
+            db.update_item(5, {"price": 27.0, "quantity": 40})
+        """
+        
+        columns = [column for column in ITEM_UPDATE_FIELDS if column in fields]
+        if not columns:
+            return 0
+        
+        query = f"UPDATE items SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+        params = tuple(fields[column] for column in columns) + (item_id,)
+        affected = self.execute_query(query, params, fetch=False)
+        self._item_cache.invalidate(item_ids=[item_id])
+        return affected
     
     def get_item_stock(self, item_id):
         """
@@ -369,6 +835,218 @@ class BDConector:
         )
         return rows[0][0] if rows else None
     
+    def search_items(self, term, limit=10):
+        """
+        Busca productos para autocompletado por nombre, descripción o código de barras.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            term (str): Texto buscado o código de barras escaneado
+            limit (int): Máximo de resultados (default: 10)
+        
+        Returns:
+            list[tuple]: (id, barrs_code, name, description, quantity, price)
+        
+        Example:
+            for item_id, barcode, name, desc, stock, price in db.search_items('coca'):
+                print(name)
+        
+        Note:
+            Un código de barras exacto se resuelve primero por el índice único
+            y va primero en los resultados. El resto se ordena por relevancia
+            (bm25 sobre items_fts, pesando más name y barrs_code). Sin FTS5, o
+            con términos de menos de 3 caracteres en modo trigram, se usa LIKE.
+        """
+        
+        term = (term or "").strip()
+        if not term:
+            return []
+        
+        columns = "i.id, i.barrs_code, i.name, i.description, i.quantity, i.price"
+        match = build_match_query(term, self.fts_mode())
+        
+        with self._cursor() as cur:
+            cur.execute(f"SELECT {columns} FROM items i WHERE i.barrs_code = ?", (term,))
+            exact = cur.fetchone()
+        
+            if match:
+                cur.execute(
+                    f"""
+                    SELECT {columns}
+                    FROM items_fts
+                    JOIN items i ON i.id = items_fts.rowid
+                    WHERE items_fts MATCH ?
+                    ORDER BY {FTS_RANK}
+                    LIMIT ?
+                    """,
+                    (match, limit + 1)
+                )
+            else:
+                cur.execute(
+                    f"SELECT {columns} FROM items i WHERE i.barrs_code LIKE ? OR i.name LIKE ? LIMIT ?",
+                    (f"%{term}%", f"%{term}%", limit + 1)
+                )
+            rows = cur.fetchall()
+        
+        if exact:
+            rows = [exact] + [row for row in rows if row[0] != exact[0]]
+        return rows[:limit]
+    
+    def _product_filters(self, active_only=False, search="", view_mode="all"):
+        """
+        Construye las condiciones WHERE comunes a los listados de productos.
+        
+        Args:
+            active_only (bool): Si True solo productos con status = 1
+            search (str): Búsqueda por nombre, descripción o código de barras
+                (items_fts si está disponible, LIKE si no)
+            view_mode (str): Filtro de stock (ver PRODUCT_VIEW_MODES; valores
+                desconocidos se ignoran, igual que antes)
+        
+        Returns:
+            tuple[list[str], list]: (condiciones, parámetros)
+        """
+        
+        conditions = []
+        params = []
+        
+        if active_only:
+            conditions.append("status = 1")
+        
+        if search:
+            match = build_match_query(search, self.fts_mode())
+            if match:
+                conditions.append("id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+                params.append(match)
+            else:
+                conditions.append("(name LIKE ? OR barrs_code LIKE ?)")
+                params.extend([f"%{search}%", f"%{search}%"])
+        
+        if PRODUCT_VIEW_MODES.get(view_mode):
+            conditions.append(PRODUCT_VIEW_MODES[view_mode])
+        
+        return conditions, params
+    
+    def list_products(self, active_only=False, search="", view_mode="all", sort="id_asc",
+                      limit=None, after_id=None, after_value=None):
+        """
+        Lista productos con filtros y paginación por cursor (keyset).
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            active_only (bool): Si True solo productos activos (status = 1)
+            search (str): Búsqueda por nombre, descripción o código de barras
+            view_mode (str): "all", "in_stock", "out_of_stock", "low_stock", "above_min"
+            sort (str): "<campo>_<asc|desc>" con campo en id, name, stock, price
+            limit (int|None): Máximo de filas (None = sin límite)
+            after_id (int|None): ID de la última fila de la página anterior
+            after_value (str|None): Valor de la columna de orden de esa fila
+                (no requerido si se ordena por id)
+        
+        Returns:
+            list[tuple]: (id, barrs_code, name, description, quantity, min_quantity, price, status)
+        
+        Raises:
+            ValueError: Si sort o el cursor no son válidos
+        
+        Example:
+            page = db.list_products(sort="name_asc", limit=100)
+            last = page[-1]
+            next_page = db.list_products(sort="name_asc", limit=100,
+                                         after_id=last[0], after_value=last[2])
+        
+        Note:
+            El cursor compara (columna, id) contra la última fila vista, así
+            cada página es un range scan sobre el índice de la columna y no
+            se degrada con el número de página como OFFSET.
+        """
+        
+        field, _, direction = sort.partition("_")
+        if field not in PRODUCT_SORT_FIELDS or direction not in ("asc", "desc"):
+            raise ValueError(f"sort inválido: {sort}")
+        column, convert = PRODUCT_SORT_FIELDS[field]
+        op = ">" if direction == "asc" else "<"
+        
+        conditions, params = self._product_filters(active_only, search, view_mode)
+        
+        if after_id is not None:
+            after_id = int(after_id)
+            if field == "id":
+                conditions.append(f"id {op} ?")
+                params.append(after_id)
+            else:
+                if after_value is None:
+                    raise ValueError("after_value es requerido para paginar por " + field)
+                after_value = convert(after_value)
+                conditions.append(f"({column} {op} ? OR ({column} = ? AND id {op} ?))")
+                params.extend([after_value, after_value, after_id])
+        
+        query = "SELECT id, barrs_code, name, description, quantity, min_quantity, price, status FROM items"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        direction = direction.upper()
+        query += f" ORDER BY {column} {direction}" if field == "id" else f" ORDER BY {column} {direction}, id {direction}"
+        
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        
+        return self.execute_query(query, tuple(params))
+    
+    def count_products(self, active_only=False, search="", view_mode="all"):
+        """
+        Cuenta los productos que cumplen los mismos filtros que list_products.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Returns:
+            int: Cantidad de productos
+        """
+        
+        conditions, params = self._product_filters(active_only, search, view_mode)
+        query = "SELECT COUNT(*) FROM items"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return self.execute_query(query, tuple(params))[0][0]
+    
+    def product_stock_summary(self, active_only=False):
+        """
+        Resume el estado de stock de todo el inventario en una sola consulta.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            active_only (bool): Si True solo productos activos
+        
+        Returns:
+            dict: total, in_stock (stock > mínimo), low_stock, out_of_stock
+        """
+        
+        query = """
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(CASE WHEN quantity > min_quantity THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN quantity > 0 AND quantity <= min_quantity THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN quantity = 0 THEN 1 ELSE 0 END), 0)
+            FROM items
+        """
+        if active_only:
+            query += " WHERE status = 1"
+        total, in_stock, low_stock, out_of_stock = self.execute_query(query)[0]
+        return {
+            "total": total,
+            "in_stock": in_stock,
+            "low_stock": low_stock,
+            "out_of_stock": out_of_stock
+        }
+    
     def total_items(self):
         """
         Obtiene el total de productos activos en el inventario.
@@ -420,7 +1098,7 @@ class BDConector:
         )[0][0]
         
         sales_today = self.execute_query(
-            "SELECT COUNT(*) FROM sells WHERE DATE(date) = DATE('now')"
+            "SELECT COUNT(*) FROM sells WHERE date >= DATE('now') AND date < DATE('now', '+1 day')"
         )[0][0]
         
         low_stock_items = self.execute_query(
@@ -444,6 +1122,266 @@ class BDConector:
             "low_stock_list": low_stock_list
         }
 
+    def iter_sales(self, date_from=None, date_to=None, limit=None, after_id=None, after_date=None,
+                   fetch_size=500):
+        """
+        Recorre el historial de ventas (más recientes primero) agrupado por venta.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            date_from (str|None): Primer día incluido (YYYY-MM-DD)
+            date_to (str|None): Último día incluido (YYYY-MM-DD)
+            limit (int|None): Máximo de ventas (None = todas)
+            after_id (int|None): ID de la última venta de la página anterior
+            after_date (str|None): Fecha de esa venta (requerida con after_id)
+            fetch_size (int): Filas leídas del cursor por vez
+        
+        Yields:
+            dict: Venta con id, date, items (item_id, name, quantity, price),
+                total y total_quantity
+        
+        Raises:
+            ValueError: Si una fecha o el cursor no son válidos
+        
+        Example:
+            for sale in db.iter_sales(date_from='2024-01-01', limit=50):
+                print(sale["id"], sale["total"])
+        
+        Note:
+            Es un generador: la conexión queda prestada mientras se consume, y
+            en memoria solo hay una venta y un bloque de fetch_size filas. El
+            cursor (date, id) hace que cada página sea un range scan sobre
+            idx_sells_date en lugar de un OFFSET.
+        """
+        
+        date_filter, params = date_range_clause("s.date", date_from, date_to)
+        conditions = [date_filter, "EXISTS (SELECT 1 FROM details x WHERE x.sell_id = s.id)"]
+        
+        if after_id is not None:
+            if after_date is None:
+                raise ValueError("after_date es requerido junto con after_id")
+            conditions.append("(s.date < ? OR (s.date = ? AND s.id < ?))")
+            params.extend([after_date, after_date, int(after_id)])
+        
+        params.append(-1 if limit is None else int(limit))
+        query = f"""
+            SELECT p.id, p.date, d.item_id, i.name, d.quantity, d.price
+            FROM (
+                SELECT s.id, s.date
+                FROM sells s
+                WHERE {" AND ".join(conditions)}
+                ORDER BY s.date DESC, s.id DESC
+                LIMIT ?
+            ) p
+            JOIN details d ON d.sell_id = p.id
+            JOIN items i ON i.id = d.item_id
+            ORDER BY p.date DESC, p.id DESC, d.id ASC
+        """
+        
+        with self._cursor() as cur:
+            cur.execute(query, tuple(params))
+            sale = None
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for sale_id, date, item_id, name, quantity, price in rows:
+                    if sale is None or sale["id"] != sale_id:
+                        if sale is not None:
+                            yield sale
+                        sale = {"id": sale_id, "date": date, "items": [], "total": 0.0, "total_quantity": 0}
+                    sale["items"].append({
+                        "item_id": item_id,
+                        "name": name,
+                        "quantity": quantity,
+                        "price": price
+                    })
+                    sale["total"] += quantity * price
+                    sale["total_quantity"] += quantity
+            if sale is not None:
+                yield sale
+    
+    def list_sales(self, date_from=None, date_to=None, limit=None, after_id=None, after_date=None):
+        """
+        Igual que iter_sales() pero retorna una lista (para páginas acotadas).
+        
+        Returns:
+            list[dict]: Ventas de la página
+        """
+        
+        return list(self.iter_sales(date_from, date_to, limit, after_id, after_date))
+    
+    def sales_summary(self, date_from=None, date_to=None):
+        """
+        Totales de ventas de un rango de días, desde los rollups.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            date_from (str|None): Primer día incluido (YYYY-MM-DD)
+            date_to (str|None): Último día incluido (YYYY-MM-DD)
+        
+        Returns:
+            dict: revenue (float), sales (int), units (int)
+        
+        Raises:
+            ValueError: Si alguna fecha tiene formato inválido
+        """
+        
+        lower, upper = day_range(date_from, date_to)
+        conditions = ["1=1"]
+        params = []
+        if lower:
+            conditions.append("day >= ?")
+            params.append(lower)
+        if upper:
+            conditions.append("day < ?")
+            params.append(upper)
+        
+        rows = self.execute_query(
+            f"""
+            SELECT COALESCE(SUM(sale_count), 0), COALESCE(SUM(units), 0), COALESCE(SUM(revenue), 0)
+            FROM hourly_sales
+            WHERE {" AND ".join(conditions)}
+            """,
+            tuple(params)
+        )
+        sales, units, revenue = rows[0]
+        return {"revenue": revenue, "sales": sales, "units": units}
+    
+    def get_sales_metrics(self, start_date, end_date, prev_start_date, prev_end_date):
+        """
+        Obtiene las métricas de ventas del período actual y del anterior.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí (una transacción de lectura: todas las métricas
+            salen de la misma foto de la base).
+        
+        Args:
+            start_date (str): Primer día del período actual (YYYY-MM-DD)
+            end_date (str): Último día del período actual (YYYY-MM-DD)
+            prev_start_date (str): Primer día del período anterior (YYYY-MM-DD)
+            prev_end_date (str): Último día del período anterior (YYYY-MM-DD)
+        
+        Returns:
+            dict: Ver bd.bdMetrics.compute_sales_metrics
+        
+        Example:
+            m = db.get_sales_metrics('2024-01-08', '2024-01-14', '2024-01-01', '2024-01-07')
+            print(m['current']['revenue'], m['previous']['revenue'])
+        """
+        
+        with self._cursor() as cur:
+            cur.execute("BEGIN")
+            return compute_sales_metrics(cur, start_date, end_date, prev_start_date, prev_end_date)
+    
+    def rebuild_sales_rollups(self):
+        """
+        Recalcula los rollups de ventas (daily_item_sales, hourly_sales) desde cero.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí (las métricas nunca ven los rollups a medio reconstruir).
+        
+        Note:
+            Solo es necesario si se insertaron ventas sin pasar por
+            record_product_sale/record_bulk_sale. CLI: flask --app main rebuild-rollups
+        
+        Example:
+            db.rebuild_sales_rollups()
+        """
+        
+        with self._cursor() as cur:
+            cur.execute("BEGIN IMMEDIATE")
+            rebuild_rollups(cur)
+    
+    def save_slow_queries(self, entries):
+        """
+        Guarda acumulados de consultas lentas (ver bd/bdSlowQueries.py).
+        
+        Thread-safe: Sí.
+        Transaccional: Sí.
+        
+        Args:
+            entries (list[dict]): sql, params_shape, count, total_ms, max_ms,
+                last_rows y explain: (sql original, params) para guardar su
+                EXPLAIN QUERY PLAN, o None para conservar el plan guardado
+        """
+        
+        with self._cursor() as cur:
+            for entry in entries:
+                original = entry.pop("explain", None)
+                if original is not None:
+                    entry["plan"] = explain_plan(cur, *original)
+            cur.execute("BEGIN IMMEDIATE")
+            save_entries(cur, entries)
+    
+    def list_slow_queries(self, limit=20, sort="total"):
+        """
+        Lista las consultas lentas registradas.
+        
+        Thread-safe: Sí.
+        Transaccional: No requiere (solo lectura).
+        
+        Args:
+            limit (int): Máximo de sentencias (default: 20)
+            sort (str): "total" (tiempo acumulado), "max", "count" o "recent"
+        
+        Returns:
+            list[dict]: sql, params_shape, count, total_ms, avg_ms, max_ms,
+                last_rows, plan, first_seen, last_seen
+        
+        Raises:
+            ValueError: Si sort no es válido
+        
+        Example:
+            for q in db.list_slow_queries(5, sort="max"):
+                print(q["max_ms"], q["sql"])
+        """
+        
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Orden inválido: {sort}")
+        
+        rows = self.execute_query(
+            f"""
+            SELECT sql, params_shape, count, total_ms, max_ms, last_rows, plan, first_seen, last_seen
+            FROM slow_queries
+            ORDER BY {SORT_COLUMNS[sort]} DESC
+            LIMIT ?
+            """,
+            (limit,)
+        )
+        return [
+            {
+                "sql": row[0],
+                "params_shape": row[1],
+                "count": row[2],
+                "total_ms": round(row[3], 1),
+                "avg_ms": round(row[3] / row[2], 1) if row[2] else 0.0,
+                "max_ms": round(row[4], 1),
+                "last_rows": row[5],
+                "plan": row[6],
+                "first_seen": row[7],
+                "last_seen": row[8]
+            }
+            for row in rows
+        ]
+    
+    def clear_slow_queries(self):
+        """
+        Borra el registro de consultas lentas.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí.
+        
+        Returns:
+            int: Sentencias borradas
+        """
+        
+        return self.execute_query("DELETE FROM slow_queries", fetch=False)
+    
     def record_product_sale(self, item_id, quantity):
         """
         Registra una venta y actualiza el inventario de forma atómica.
@@ -472,6 +1410,7 @@ class BDConector:
             - Captura el precio actual del producto
             - Crea registro en 'sells' y 'details'
             - Actualiza stock en 'items'
+            - Suma la venta a los rollups (daily_item_sales, hourly_sales)
             - Todo en una sola transacción (commit/rollback automático)
         """
         
@@ -496,6 +1435,10 @@ class BDConector:
                 "UPDATE items SET quantity = ? WHERE id = ?",
                 (current_qty - quantity, item_id)
             )
+            
+            apply_sale_to_rollups(cur, sell_id)
+        
+        self._item_cache.invalidate(item_ids=[item_id])
     
     def record_bulk_sale(self, items):
         """
@@ -514,7 +1457,8 @@ class BDConector:
             int: ID de la venta creada
         
         Raises:
-            ValueError: Si no hay stock suficiente para algún producto
+            ValueError: Si la lista está vacía o alguna cantidad no es positiva
+            StockError: Si no hay stock suficiente para algún producto
             DatabaseError: Si algún producto no existe o hay error SQL
         
         Example:
@@ -524,48 +1468,131 @@ class BDConector:
                     {"item_id": 8, "quantity": 2}
                 ])
                 print(f"Venta #{sale_id} registrada exitosamente")
-            except ValueError as e:
-                print(f"Error: {e}")
+            except StockError as e:
+                print(f"Error: {e.product} ({e.available} disponibles)")
         
         Note:
-            - Valida stock disponible para todos los productos antes de procesar
-            - Captura el precio actual de cada producto
-            - Crea un solo registro en 'sells' con múltiples 'details'
-            - Actualiza stock de todos los productos
-            - Todo en una sola transacción (commit/rollback automático)
+            Ver record_bulk_sale_detailed(), que además retorna nombres y precios.
+        """
+        
+        return self.record_bulk_sale_detailed(items)["sale_id"]
+    
+    def record_bulk_sale_detailed(self, items):
+        """
+        Registra una venta con múltiples productos y retorna el detalle cobrado.
+        
+        Thread-safe: Sí.
+        Transaccional: Sí (BEGIN IMMEDIATE: lectura de stock y escritura en la misma transacción).
+        Atómica: Sí.
+        
+        Args:
+            items (list): Lista de diccionarios con item_id y quantity. Un
+                mismo item_id puede repetirse: se suma para validar el stock
+                y se guarda como un solo detalle
+        
+        Returns:
+            dict: Resultado de la venta
+                - sale_id (int): ID de la venta creada
+                - items (list[dict]): Una entrada por línea recibida, en el mismo
+                  orden: item_id, name, quantity, unit_price, subtotal
+                - total (float): Suma de subtotales (redondeada a 2 decimales)
+        
+        Raises:
+            ValueError: Si la lista está vacía o alguna cantidad no es positiva
+            StockError: Si no hay stock suficiente (con product, requested, available)
+            DatabaseError: Si algún producto no existe o hay error SQL
+        
+        Example:
+            result = db.record_bulk_sale_detailed([{"item_id": 5, "quantity": 3}])
+            print(f"Venta #{result['sale_id']}: ${result['total']}")
+        
+        Note:
+            Costo fijo en sentencias sin importar la cantidad de líneas: un
+            SELECT ... WHERE id IN (...), un INSERT en sells, un executemany
+            de details y un executemany de UPDATE con guarda
+            (quantity >= ?), que además impide dejar stock negativo.
         """
         
         if not items:
             raise ValueError("La lista de items no puede estar vacía")
         
+        # Cantidades por producto, conservando el orden de primera aparición
+        totals = {}
+        for item in items:
+            quantity = int(item["quantity"])
+            if quantity <= 0:
+                raise ValueError(f"Cantidad inválida para producto ID {item['item_id']}")
+            item_id = int(item["item_id"])
+            totals[item_id] = totals.get(item_id, 0) + quantity
+        
+        item_ids = list(totals)
+        
         with self._cursor() as cur:
-            cur.execute("INSERT INTO sells (item_id) VALUES (?)", (items[0]["item_id"],))
-            sell_id = cur.lastrowid
+            cur.execute("BEGIN IMMEDIATE")
             
-            for item in items:
-                item_id = item["item_id"]
-                quantity = item["quantity"]
-                
-                cur.execute("SELECT price, quantity FROM items WHERE id = ?", (item_id,))
-                row = cur.fetchone()
-                if not row:
-                    raise DatabaseError(f"Producto con ID {item_id} no encontrado")
-                
-                price, current_qty = row
-                if current_qty < quantity:
-                    raise ValueError(f"Stock insuficiente para producto ID {item_id}")
-                
-                cur.execute(
-                    "INSERT INTO details (sell_id, item_id, quantity, price) VALUES (?, ?, ?, ?)",
-                    (sell_id, item_id, quantity, price)
-                )
-                
+            products = {}
+            for start in range(0, len(item_ids), SQL_IN_CHUNK):
+                chunk = item_ids[start:start + SQL_IN_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
                 cur.execute(
-                    "UPDATE items SET quantity = ? WHERE id = ?",
-                    (current_qty - quantity, item_id)
+                    f"SELECT id, name, quantity, price FROM items WHERE id IN ({placeholders})",
+                    chunk
                 )
+                for item_id, name, stock, price in cur.fetchall():
+                    products[item_id] = (name, stock, price)
             
-            return sell_id
+            for item_id, quantity in totals.items():
+                if item_id not in products:
+                    raise DatabaseError(f"Producto con ID {item_id} no encontrado")
+                name, stock, _ = products[item_id]
+                if stock < quantity:
+                    raise StockError(
+                        f"Stock insuficiente para producto ID {item_id}",
+                        product=name,
+                        requested=quantity,
+                        available=stock
+                    )
+            
+            cur.execute("INSERT INTO sells (item_id) VALUES (?)", (item_ids[0],))
+            sell_id = cur.lastrowid
+            
+            cur.executemany(
+                "INSERT INTO details (sell_id, item_id, quantity, price) VALUES (?, ?, ?, ?)",
+                [(sell_id, item_id, quantity, products[item_id][2]) for item_id, quantity in totals.items()]
+            )
+            
+            cur.executemany(
+                "UPDATE items SET quantity = quantity - ? WHERE id = ? AND quantity >= ?",
+                [(quantity, item_id, quantity) for item_id, quantity in totals.items()]
+            )
+            if cur.rowcount != len(totals):
+                raise StockError("Stock insuficiente: el inventario cambió durante la venta")
+            
+            apply_sale_to_rollups(cur, sell_id)
+        
+        self._item_cache.invalidate(item_ids=item_ids)
+        
+        lines = []
+        total = 0
+        for item in items:
+            item_id = int(item["item_id"])
+            quantity = int(item["quantity"])
+            name, _, price = products[item_id]
+            subtotal = round(price * quantity, 2)
+            lines.append({
+                "item_id": item_id,
+                "name": name,
+                "quantity": quantity,
+                "unit_price": price,
+                "subtotal": subtotal
+            })
+            total += subtotal
+        
+        return {
+            "sale_id": sell_id,
+            "items": lines,
+            "total": round(total, 2)
+        }
             
     def disable_item(self, item_id):
         """
@@ -589,6 +1616,7 @@ class BDConector:
             (item_id,),
             fetch=False
         )
+        self._item_cache.invalidate(item_ids=[item_id])
         
     def enable_item(self, item_id):
         """
@@ -607,6 +1635,7 @@ class BDConector:
             (item_id,),
             fetch=False
         )
+        self._item_cache.invalidate(item_ids=[item_id])
         
     def get_item_status(self, item_id):
         """
@@ -2,4 +2,17 @@ class DatabaseError(Exception):
     pass
 
 class StockError(DatabaseError):
-    pass
\ No newline at end of file
+    """
+    Stock insuficiente para completar una venta.
+
+    Attributes:
+        product (str|None): Nombre del producto
+        requested (int|None): Cantidad pedida
+        available (int|None): Stock disponible
+    """
+
+    def __init__(self, message="Stock insuficiente", product=None, requested=None, available=None):
+        super().__init__(message)
+        self.product = product
+        self.requested = requested
+        self.available = available
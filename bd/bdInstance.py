@@ -21,5 +21,12 @@ def get_db_path():
     else:
         return os.getenv("DB_PATH", "./bd/database.db")
 
-db = BDConector(db_path=get_db_path())
-db.init_db()
\ No newline at end of file
+db = BDConector(
+    db_path=get_db_path(),
+    pool_size=int(os.getenv("DB_POOL_SIZE", "8")),
+    pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    pool_idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+    pragma_profile=os.getenv("DB_PRAGMA_PROFILE", "production"),
+    item_cache_size=int(os.getenv("DB_ITEM_CACHE_SIZE", "2048"))
+)
+# El esquema se crea o migra al primer uso de la base (BDConector.ensure_schema)
\ No newline at end of file
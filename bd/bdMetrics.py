@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from bd.bdQueries import DATE_FORMAT, day_range
+
+# Motor de métricas de ventas para /api/metrics.
+#
+# Lee los rollups (ver bd/bdRollup.py) en lugar de sells/details, así que el
+# costo depende de los días del rango y no de la cantidad de ventas. Un solo
+# recorrido de hourly_sales sobre la unión [inicio período anterior, fin
+# período actual] alimenta KPIs de ambos períodos, serie diaria,
+# histogramas por día de semana y hora, y la recaudación por día de semana.
+# Cada (día, hora) cae completo en uno de los dos períodos.
+
+SALES_BUCKETS_QUERY = """
+    SELECT day, hour, sale_count, revenue, units
+    FROM hourly_sales
+    WHERE day >= ? AND day < ?
+"""
+
+TOP_PRODUCTS_QUERY = """
+    SELECT
+        i.id,
+        i.name,
+        i.barrs_code,
+        SUM(r.units) AS units,
+        SUM(r.revenue) AS revenue
+    FROM daily_item_sales r
+    JOIN items i ON r.item_id = i.id
+    WHERE r.day >= ? AND r.day < ?
+    GROUP BY i.id, i.name, i.barrs_code
+    ORDER BY units DESC
+    LIMIT ?
+"""
+
+# Alertas de inventario en un solo recorrido de items activos.
+# NOT EXISTS usa idx_daily_item_sales_item por producto en vez de materializar
+# todos los item_id vendidos como hacía NOT IN.
+INVENTORY_ALERTS_QUERY = """
+    SELECT
+        COALESCE(SUM(CASE WHEN i.quantity = 0 THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN i.quantity > 0 AND i.quantity <= i.min_quantity THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN NOT EXISTS (
+            SELECT 1
+            FROM daily_item_sales r
+            WHERE r.item_id = i.id
+            AND r.day >= DATE('now', ?)
+        ) THEN 1 ELSE 0 END), 0)
+    FROM items i
+    WHERE i.status = 1
+"""
+
+def _empty_totals():
+    return {"revenue": 0.0, "sales": 0, "units": 0}
+
+def compute_sales_metrics(cur, start_date, end_date, prev_start_date, prev_end_date,
+                          top_limit=10, no_movement_days=30):
+    """
+    Calcula todas las métricas de ventas desde los rollups.
+
+    Transaccional: Se ejecuta en la transacción del cursor recibido.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor activo (ver BDConector.get_sales_metrics)
+        start_date (str): Primer día del período actual (YYYY-MM-DD)
+        end_date (str): Último día del período actual (YYYY-MM-DD)
+        prev_start_date (str): Primer día del período anterior (YYYY-MM-DD)
+        prev_end_date (str): Último día del período anterior (YYYY-MM-DD)
+        top_limit (int): Cantidad de productos en el ranking (default: 10)
+        no_movement_days (int): Días sin ventas para considerar un producto sin movimiento
+
+    Returns:
+        dict: Métricas agregadas con las siguientes claves:
+            - current (dict): revenue, sales, units del período actual
+            - previous (dict): revenue, sales, units del período anterior
+            - daily (dict): {YYYY-MM-DD: {"revenue", "sales"}} solo días con ventas del período actual
+            - sales_by_weekday (list[int]): Ventas por día (0=Lunes ... 6=Domingo)
+            - revenue_by_weekday (list[float]): Recaudación por día (0=Lunes ... 6=Domingo)
+            - sales_by_hour (list[int]): Ventas por hora (0-23)
+            - top_products (list[tuple]): (id, name, barrs_code, units, revenue)
+            - alerts (dict): out_of_stock, low_stock, no_movement
+    """
+
+    current_lower, current_upper = day_range(start_date, end_date)
+    previous_lower, previous_upper = day_range(prev_start_date, prev_end_date)
+    # Un solo recorrido que cubre ambos períodos (contiguos o no)
+    scan_lower = min(current_lower, previous_lower)
+    scan_upper = max(current_upper, previous_upper)
+
+    current = _empty_totals()
+    previous = _empty_totals()
+    daily = {}
+    sales_by_weekday = [0] * 7
+    revenue_by_weekday = [0.0] * 7
+    sales_by_hour = [0] * 24
+
+    cur.execute(SALES_BUCKETS_QUERY, (scan_lower, scan_upper))
+    for day, hour, sales, revenue, units in cur.fetchall():
+        if current_lower <= day < current_upper:
+            totals = current
+            bucket = daily.setdefault(day, {"revenue": 0.0, "sales": 0})
+            bucket["revenue"] += revenue
+            bucket["sales"] += sales
+
+            weekday = datetime.strptime(day, DATE_FORMAT).weekday()
+            sales_by_weekday[weekday] += sales
+            revenue_by_weekday[weekday] += revenue
+            sales_by_hour[hour] += sales
+        elif previous_lower <= day < previous_upper:
+            totals = previous
+        else:
+            continue
+
+        totals["revenue"] += revenue
+        totals["sales"] += sales
+        totals["units"] += units
+
+    cur.execute(TOP_PRODUCTS_QUERY, (current_lower, current_upper, top_limit))
+    top_products = cur.fetchall()
+
+    cur.execute(INVENTORY_ALERTS_QUERY, (f"-{int(no_movement_days)} days",))
+    out_of_stock, low_stock, no_movement = cur.fetchone()
+
+    return {
+        "current": current,
+        "previous": previous,
+        "daily": daily,
+        "sales_by_weekday": sales_by_weekday,
+        "revenue_by_weekday": revenue_by_weekday,
+        "sales_by_hour": sales_by_hour,
+        "top_products": top_products,
+        "alerts": {
+            "out_of_stock": out_of_stock,
+            "low_stock": low_stock,
+            "no_movement": no_movement
+        }
+    }
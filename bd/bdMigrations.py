@@ -0,0 +1,79 @@
+# Migraciones versionadas del esquema.
+#
+# Cada migración tiene un número de versión único y creciente, una
+# descripción y una lista de pasos. Un paso es una sentencia SQL (str) o una
+# función que recibe el cursor de la transacción (para migraciones que
+# necesitan lógica, como rellenar datos).
+#
+# Reglas para agregar migraciones:
+# - Nunca modificar ni reordenar una migración ya publicada: agregar una nueva.
+# - Los pasos deben ser idempotentes (IF NOT EXISTS, INSERT OR IGNORE, ...)
+#   para que una instalación a medio migrar pueda reintentar sin errores.
+
+from bd.bdRollup import create_rollup_tables, rebuild_rollups
+from bd.bdSearch import create_items_fts
+from bd.bdSlowQueries import SLOW_QUERIES_TABLE
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+class Migration:
+    """
+    Cambio de esquema versionado.
+
+    Attributes:
+        version (int): Número de versión (único y creciente)
+        description (str): Descripción corta (se guarda en schema_version)
+        steps (list): Sentencias SQL (str) o funciones fn(cursor)
+    """
+
+    def __init__(self, version, description, steps):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+    def apply(self, cur):
+        """Ejecuta los pasos de la migración con el cursor dado."""
+        for step in self.steps:
+            if callable(step):
+                step(cur)
+            else:
+                cur.execute(step)
+
+MIGRATIONS = [
+    Migration(1, "Índices secundarios para ventas, detalles e inventario", [
+        # Líneas de una venta (JOIN sells -> details): cubre item_id, quantity y price
+        "CREATE INDEX IF NOT EXISTS idx_details_sell_id ON details (sell_id, item_id, quantity, price)",
+        # Ventas por producto (top productos, productos sin movimiento)
+        "CREATE INDEX IF NOT EXISTS idx_details_item_sell ON details (item_id, sell_id)",
+        # Filtros por rango de fechas e historial ordenado por fecha
+        "CREATE INDEX IF NOT EXISTS idx_sells_date ON sells (date)",
+        # Alertas de stock (agotados / stock bajo) sobre productos activos
+        "CREATE INDEX IF NOT EXISTS idx_items_status_quantity ON items (status, quantity)",
+    ]),
+    Migration(2, "Rollups de ventas por día/producto y por día/hora", [
+        create_rollup_tables,
+        # Rellena con el historial existente
+        rebuild_rollups,
+    ]),
+    Migration(3, "Índices para paginación por cursor de productos", [
+        # ORDER BY <columna>, id con condición de cursor (columna, id) > (?, ?)
+        "CREATE INDEX IF NOT EXISTS idx_items_name_id ON items (name COLLATE NOCASE, id)",
+        "CREATE INDEX IF NOT EXISTS idx_items_quantity_id ON items (quantity, id)",
+        "CREATE INDEX IF NOT EXISTS idx_items_price_id ON items (price, id)",
+    ]),
+    Migration(4, "Búsqueda de texto completo de productos (FTS5)", [
+        # Sin FTS5 compilado no crea nada y la búsqueda sigue con LIKE
+        create_items_fts,
+    ]),
+    Migration(5, "Registro de consultas lentas", [
+        SLOW_QUERIES_TABLE,
+    ]),
+]
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
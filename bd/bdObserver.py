@@ -0,0 +1,101 @@
+import sqlite3
+import time
+
+# Observadores de consultas.
+#
+# Con al menos un observador registrado (BDConector.add_query_observer),
+# _cursor() usa ObservedCursor: cada sentencia se informa al terminar con
+# observer(sql, params, seconds, rows). `seconds` suma solo el tiempo dentro
+# de SQLite (execute y fetch*), no lo que hace el código entre un fetch y el
+# siguiente. El commit de la transacción se informa como la sentencia
+# "COMMIT". Sin observadores se usa el cursor normal y no hay costo extra.
+
+COMMIT_SQL = "COMMIT"
+
+class ObservedCursor(sqlite3.Cursor):
+    """
+    Cursor de sqlite3 que mide cada sentencia y cuenta las filas leídas.
+
+    Thread-safe: No (como cualquier cursor, lo usa un solo thread).
+
+    Attributes:
+        observers (tuple): Funciones observer(sql, params, seconds, rows)
+    """
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.observers = ()
+        self._sql = None
+        self._params = None
+        self._seconds = 0.0
+        self._rows = 0
+
+    def execute(self, sql, params=()):
+        self.finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._begin(sql, params, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_params):
+        self.finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            # Los parámetros de executemany pueden ser un generador ya consumido
+            self._begin(sql, None, time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - start, len(rows))
+        return rows
+
+    def commit(self):
+        """Hace commit de la conexión e informa su duración como COMMIT."""
+
+        self.finish()
+        start = time.perf_counter()
+        self.connection.commit()
+        self._notify(COMMIT_SQL, None, time.perf_counter() - start, 0)
+
+    def finish(self):
+        """Informa la sentencia en curso (si hay una) a los observadores."""
+
+        if self._sql is None:
+            return
+        sql, params, seconds, rows = self._sql, self._params, self._seconds, self._rows
+        self._sql = None
+        if not rows and self.rowcount > 0:
+            # INSERT/UPDATE/DELETE: filas afectadas
+            rows = self.rowcount
+        self._notify(sql, params, seconds, rows)
+
+    def _begin(self, sql, params, seconds):
+        self._sql = sql
+        self._params = params
+        self._seconds = seconds
+        self._rows = 0
+
+    def _add(self, seconds, rows):
+        if self._sql is not None:
+            self._seconds += seconds
+            self._rows += rows
+
+    def _notify(self, sql, params, seconds, rows):
+        for observer in self.observers:
+            observer(sql, params, seconds, rows)
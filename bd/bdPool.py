@@ -0,0 +1,283 @@
+import sqlite3
+import threading
+import time
+
+from bd.bdErrors import DatabaseError
+from debug.logger import logger
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones SQLite reutilizables entre threads.
+
+    Características:
+    - Checkout/checkin explícito (acquire/release)
+    - Tamaño máximo: si no hay conexiones libres se espera hasta `timeout`
+    - Health check (SELECT 1) de conexiones que estuvieron inactivas
+    - Expulsión de conexiones inactivas más de `idle_timeout` segundos
+    - Contadores de hits/misses/esperas para medir la presión del pool
+
+    Cada conexión la usa un único thread a la vez (mientras está prestada),
+    por eso se crean con check_same_thread=False.
+
+    Attributes:
+        max_size (int): Máximo de conexiones abiertas simultáneamente
+        timeout (float): Segundos máximos de espera por una conexión libre
+        idle_timeout (float): Segundos de inactividad antes de cerrar una conexión
+        health_check_interval (float): Inactividad a partir de la cual se verifica la conexión
+    """
+
+    def __init__(self, factory, max_size=8, timeout=5.0, idle_timeout=300.0, health_check_interval=30.0):
+        """
+        Inicializa el pool (las conexiones se crean bajo demanda).
+
+        Args:
+            factory (callable): Función sin argumentos que retorna una sqlite3.Connection configurada
+            max_size (int): Máximo de conexiones abiertas (default: 8)
+            timeout (float): Espera máxima en segundos por una conexión (default: 5.0)
+            idle_timeout (float): Segundos de inactividad antes de expulsar (default: 300.0)
+            health_check_interval (float): Segundos de inactividad antes de verificar (default: 30.0)
+
+        Example:
+            pool = ConnectionPool(lambda: sqlite3.connect('./data/stock.db'), max_size=4)
+        """
+
+        if max_size < 1:
+            raise ValueError("max_size debe ser mayor o igual a 1")
+
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = []  # [(conn, last_used)] - LIFO: la más reciente al final
+        self._size = 0   # conexiones abiertas (libres + prestadas)
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "evicted": 0,
+            "discarded": 0
+        }
+
+    def acquire(self):
+        """
+        Presta una conexión del pool (checkout).
+
+        Thread-safe: Sí.
+
+        Returns:
+            sqlite3.Connection: Conexión lista para usar
+
+        Raises:
+            DatabaseError: Si el pool está cerrado o se agota el tiempo de espera
+
+        Note:
+            Toda conexión obtenida debe devolverse con release().
+        """
+
+        conn = None
+        last_used = None
+        wait_start = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DatabaseError("El pool de conexiones está cerrado")
+
+                self._evict_idle_locked()
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._stats["hits"] += 1
+                    break
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._stats["misses"] += 1
+                    break
+
+                now = time.monotonic()
+                if wait_start is None:
+                    wait_start = now
+                    self._stats["waits"] += 1
+
+                remaining = self.timeout - (now - wait_start)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    self._stats["wait_time"] += now - wait_start
+                    raise DatabaseError(
+                        f"Tiempo de espera agotado ({self.timeout}s) esperando una conexión libre"
+                    )
+                self._cond.wait(remaining)
+
+            if wait_start is not None:
+                self._stats["wait_time"] += time.monotonic() - wait_start
+
+        if conn is None:
+            return self._open()
+
+        if time.monotonic() - last_used >= self.health_check_interval and not self._is_healthy(conn):
+            logger.warning("Conexión del pool no responde, se reemplaza")
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats["discarded"] += 1
+            return self._open()
+
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Devuelve una conexión al pool (checkin).
+
+        Thread-safe: Sí.
+
+        Args:
+            conn (sqlite3.Connection): Conexión obtenida con acquire()
+            discard (bool): Si True se cierra en lugar de reutilizarse
+
+        Note:
+            Si la conexión tiene una transacción abierta se hace rollback.
+        """
+
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._stats["discarded"] += 1
+                to_close = conn
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close = None
+            self._cond.notify()
+
+        if to_close is not None:
+            self._close_quietly(to_close)
+
+    def warm(self, count):
+        """
+        Abre conexiones por adelantado para que los primeros requests no paguen
+        el costo de conectar y aplicar los PRAGMAs.
+
+        Thread-safe: Sí.
+
+        Args:
+            count (int): Conexiones a dejar abiertas (se limita a max_size)
+
+        Returns:
+            int: Conexiones abiertas en el pool al terminar
+        """
+
+        conns = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+        return self.stats()["size"]
+
+    def close(self):
+        """
+        Cierra todas las conexiones libres y rechaza nuevos checkouts.
+
+        Thread-safe: Sí.
+
+        Note:
+            Las conexiones prestadas se cierran al devolverse.
+        """
+
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """
+        Retorna una copia de los contadores del pool.
+
+        Thread-safe: Sí.
+
+        Returns:
+            dict: Contadores con las siguientes claves:
+                - size (int): Conexiones abiertas
+                - idle (int): Conexiones libres
+                - in_use (int): Conexiones prestadas
+                - max_size (int): Tamaño máximo del pool
+                - hits (int): Checkouts servidos con una conexión reutilizada
+                - misses (int): Checkouts que abrieron una conexión nueva
+                - waits (int): Checkouts que tuvieron que esperar
+                - wait_time (float): Segundos totales de espera
+                - timeouts (int): Checkouts que agotaron el tiempo de espera
+                - evicted (int): Conexiones cerradas por inactividad
+                - discarded (int): Conexiones descartadas por error
+        """
+
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["max_size"] = self.max_size
+        stats["wait_time"] = round(stats["wait_time"], 6)
+        return stats
+
+    def _open(self):
+        """Crea una conexión para un slot ya reservado (lo libera si falla)."""
+        try:
+            return self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _evict_idle_locked(self):
+        """Cierra las conexiones libres inactivas más de idle_timeout. Requiere el lock."""
+        if not self._idle:
+            return
+
+        deadline = time.monotonic() - self.idle_timeout
+        expired = 0
+        # La lista es LIFO: las más antiguas están al principio
+        while expired < len(self._idle) and self._idle[expired][1] < deadline:
+            expired += 1
+
+        if not expired:
+            return
+
+        for conn, _ in self._idle[:expired]:
+            self._close_quietly(conn)
+        del self._idle[:expired]
+        self._size -= expired
+        self._stats["evicted"] += expired
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
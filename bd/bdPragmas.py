@@ -0,0 +1,63 @@
+from debug.logger import logger
+
+DEFAULT_PRAGMA_PROFILE = "production"
+
+# Se aplican en orden al abrir cada conexión del pool.
+# busy_timeout va primero para que el cambio de journal_mode espere locks.
+PRAGMA_PROFILES = {
+    # Terminales POS concurrentes: lectores no bloquean al escritor (WAL).
+    # synchronous=NORMAL en WAL puede perder la última transacción ante un
+    # corte de luz, pero nunca corrompe la base.
+    "production": {
+        "busy_timeout": 5000,          # ms
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,          # negativo = KiB (16 MB)
+        "mmap_size": 134217728,        # 128 MB
+        "temp_store": "MEMORY",
+    },
+    # Igual de concurrente, pero cada commit se sincroniza a disco (fsync).
+    # Recomendado si el equipo no tiene UPS o se apaga sin cerrar la app.
+    "durable": {
+        "busy_timeout": 10000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # Journal de rollback clásico (comportamiento previo de SQLite).
+    # Necesario si la base vive en una carpeta de red, donde WAL no funciona.
+    "legacy": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+
+def get_pragma_profile(name):
+    """
+    Obtiene el perfil de PRAGMAs por nombre.
+
+    Args:
+        name (str|None): Nombre del perfil ("production", "durable", "legacy")
+
+    Returns:
+        tuple[str, dict]: (nombre efectivo, {pragma: valor})
+
+    Note:
+        Si el nombre no existe se registra una advertencia y se usa
+        DEFAULT_PRAGMA_PROFILE, para que un error en el .env no impida arrancar.
+
+    Example:
+        name, pragmas = get_pragma_profile("durable")
+    """
+
+    key = (name or DEFAULT_PRAGMA_PROFILE).strip().lower()
+    if key not in PRAGMA_PROFILES:
+        logger.warning(
+            f"Perfil de PRAGMA desconocido '{name}', se usa '{DEFAULT_PRAGMA_PROFILE}'. "
+            f"Opciones: {', '.join(PRAGMA_PROFILES)}"
+        )
+        key = DEFAULT_PRAGMA_PROFILE
+    return key, dict(PRAGMA_PROFILES[key])
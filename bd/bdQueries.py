@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+# Helpers para construir filtros SQL que aprovechen los índices.
+#
+# sells.date se guarda como texto 'YYYY-MM-DD HH:MM:SS' (CURRENT_TIMESTAMP),
+# así que el orden lexicográfico coincide con el cronológico y un rango
+# semiabierto sobre la columna cruda puede usar idx_sells_date. Envolver la
+# columna en DATE(...) obliga a SQLite a evaluar la función fila por fila.
+
+DATE_FORMAT = '%Y-%m-%d'
+
+def parse_day(value):
+    """
+    Valida y normaliza una fecha de día.
+
+    Args:
+        value (str): Fecha en formato YYYY-MM-DD
+
+    Returns:
+        datetime: Fecha a las 00:00:00
+
+    Raises:
+        ValueError: Si el formato es inválido
+    """
+
+    return datetime.strptime(value.strip(), DATE_FORMAT)
+
+def day_range(date_from=None, date_to=None):
+    """
+    Convierte un rango de días inclusivo en límites de timestamp semiabiertos.
+
+    Args:
+        date_from (str|None): Primer día incluido (YYYY-MM-DD)
+        date_to (str|None): Último día incluido (YYYY-MM-DD)
+
+    Returns:
+        tuple[str|None, str|None]: (inicio inclusivo, fin exclusivo)
+
+    Raises:
+        ValueError: Si alguna fecha tiene formato inválido
+
+    Example:
+        day_range('2024-01-01', '2024-01-31')
+        # ('2024-01-01', '2024-02-01') -> date >= '2024-01-01' AND date < '2024-02-01'
+    """
+
+    lower = parse_day(date_from).strftime(DATE_FORMAT) if date_from else None
+    upper = (parse_day(date_to) + timedelta(days=1)).strftime(DATE_FORMAT) if date_to else None
+    return lower, upper
+
+def date_range_clause(column, date_from=None, date_to=None):
+    """
+    Construye un filtro SQL index-friendly para un rango de días.
+
+    Equivale a `DATE(column) BETWEEN date_from AND date_to` pero sin aplicar
+    funciones sobre la columna, por lo que SQLite puede hacer un range scan.
+
+    Args:
+        column (str): Columna de timestamp (ej: 's.date'). No se escapa: usar
+            solo nombres fijos del código, nunca entrada del usuario
+        date_from (str|None): Primer día incluido (YYYY-MM-DD)
+        date_to (str|None): Último día incluido (YYYY-MM-DD)
+
+    Returns:
+        tuple[str, list]: (fragmento SQL, parámetros). Si no hay límites el
+            fragmento es '1=1'
+
+    Raises:
+        ValueError: Si alguna fecha tiene formato inválido
+
+    Example:
+        clause, params = date_range_clause('s.date', '2024-01-01', '2024-01-31')
+        rows = db.execute_query(f"SELECT COUNT(*) FROM sells s WHERE {clause}", params)
+    """
+
+    lower, upper = day_range(date_from, date_to)
+    conditions = []
+    params = []
+
+    if lower:
+        conditions.append(f"{column} >= ?")
+        params.append(lower)
+
+    if upper:
+        conditions.append(f"{column} < ?")
+        params.append(upper)
+
+    return (" AND ".join(conditions) or "1=1"), params
@@ -0,0 +1,115 @@
+# Tablas de pre-agregación de ventas (rollups).
+#
+# daily_item_sales: unidades, recaudación y cantidad de ventas por (día, producto)
+# hourly_sales:     ventas, unidades y recaudación por (día, hora)
+#
+# Se actualizan dentro de la misma transacción que registra la venta, así que
+# nunca quedan desincronizadas con sells/details. Las métricas leen de acá y
+# su costo depende de los días del rango, no de la cantidad de ventas.
+# Si se insertan ventas por fuera de BDConector (importaciones manuales,
+# generadores de datos), reconstruir con BDConector.rebuild_sales_rollups().
+
+ROLLUP_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_item_sales (
+        day TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        units INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        sale_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, item_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_daily_item_sales_item ON daily_item_sales (item_id, day)",
+    """
+    CREATE TABLE IF NOT EXISTS hourly_sales (
+        day TEXT NOT NULL,
+        hour INTEGER NOT NULL,
+        sale_count INTEGER NOT NULL DEFAULT 0,
+        units INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, hour)
+    ) WITHOUT ROWID
+    """,
+]
+
+_APPLY_ITEM_SALE = """
+    INSERT INTO daily_item_sales (day, item_id, units, revenue, sale_count)
+    SELECT DATE(s.date), d.item_id, SUM(d.quantity), SUM(d.quantity * d.price), 1
+    FROM sells s
+    JOIN details d ON d.sell_id = s.id
+    WHERE s.id = ?
+    GROUP BY d.item_id
+    ON CONFLICT (day, item_id) DO UPDATE SET
+        units = units + excluded.units,
+        revenue = revenue + excluded.revenue,
+        sale_count = sale_count + excluded.sale_count
+"""
+
+_APPLY_HOURLY_SALE = """
+    INSERT INTO hourly_sales (day, hour, sale_count, units, revenue)
+    SELECT DATE(s.date), CAST(strftime('%H', s.date) AS INTEGER), 1,
+           SUM(d.quantity), SUM(d.quantity * d.price)
+    FROM sells s
+    JOIN details d ON d.sell_id = s.id
+    WHERE s.id = ?
+    GROUP BY s.id
+    ON CONFLICT (day, hour) DO UPDATE SET
+        sale_count = sale_count + excluded.sale_count,
+        units = units + excluded.units,
+        revenue = revenue + excluded.revenue
+"""
+
+_REBUILD_ITEM_SALES = """
+    INSERT INTO daily_item_sales (day, item_id, units, revenue, sale_count)
+    SELECT DATE(s.date), d.item_id, SUM(d.quantity), SUM(d.quantity * d.price), COUNT(DISTINCT s.id)
+    FROM sells s
+    JOIN details d ON d.sell_id = s.id
+    GROUP BY DATE(s.date), d.item_id
+"""
+
+_REBUILD_HOURLY_SALES = """
+    INSERT INTO hourly_sales (day, hour, sale_count, units, revenue)
+    SELECT DATE(date), CAST(strftime('%H', date) AS INTEGER), COUNT(*), SUM(units), SUM(revenue)
+    FROM (
+        SELECT s.date AS date, SUM(d.quantity) AS units, SUM(d.quantity * d.price) AS revenue
+        FROM sells s
+        JOIN details d ON d.sell_id = s.id
+        GROUP BY s.id
+    )
+    GROUP BY DATE(date), CAST(strftime('%H', date) AS INTEGER)
+"""
+
+def create_rollup_tables(cur):
+    """Crea las tablas de rollup si no existen."""
+    for statement in ROLLUP_TABLES:
+        cur.execute(statement)
+
+def apply_sale_to_rollups(cur, sell_id):
+    """
+    Suma una venta ya insertada (sells + details) a los rollups.
+
+    Transaccional: Usar el mismo cursor que registró la venta.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor de la transacción de la venta
+        sell_id (int): ID de la venta en sells
+    """
+
+    cur.execute(_APPLY_ITEM_SALE, (sell_id,))
+    cur.execute(_APPLY_HOURLY_SALE, (sell_id,))
+
+def rebuild_rollups(cur):
+    """
+    Recalcula los rollups completos desde sells/details.
+
+    Transaccional: Usar dentro de una transacción (se vacían y rellenan ambas tablas).
+
+    Args:
+        cur (sqlite3.Cursor): Cursor activo
+    """
+
+    cur.execute("DELETE FROM daily_item_sales")
+    cur.execute("DELETE FROM hourly_sales")
+    cur.execute(_REBUILD_ITEM_SALES)
+    cur.execute(_REBUILD_HOURLY_SALES)
@@ -0,0 +1,122 @@
+import sqlite3
+
+from debug.logger import logger
+
+# Búsqueda de texto completo sobre items (name, description, barrs_code).
+#
+# items_fts es una tabla FTS5 de contenido externo (content='items'): no
+# duplica los textos, solo el índice. Los triggers la mantienen sincronizada.
+# Tokenizer preferido: trigram (SQLite >= 3.34), que permite buscar cualquier
+# subcadena de 3+ caracteres como el LIKE '%q%' anterior. Si no existe se usa
+# unicode61 con índices de prefijo (búsqueda por comienzo de palabra).
+# Si SQLite no tiene FTS5 compilado no se crea nada y se sigue usando LIKE.
+
+FTS_TABLE = "items_fts"
+
+# Mínimo de caracteres para que trigram encuentre algo
+TRIGRAM_MIN_LENGTH = 3
+
+_FTS_TOKENIZERS = [
+    ("trigram", "tokenize='trigram'"),
+    ("prefix", "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"),
+]
+
+_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name, description, barrs_code)
+        VALUES (new.id, new.name, new.description, new.barrs_code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description, barrs_code)
+        VALUES ('delete', old.id, old.name, old.description, old.barrs_code);
+    END
+    """,
+    # Solo columnas indexadas: los cambios de stock de cada venta no tocan el índice
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name, description, barrs_code ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description, barrs_code)
+        VALUES ('delete', old.id, old.name, old.description, old.barrs_code);
+        INSERT INTO items_fts (rowid, name, description, barrs_code)
+        VALUES (new.id, new.name, new.description, new.barrs_code);
+    END
+    """,
+]
+
+# Pesos bm25 por columna (name, description, barrs_code)
+FTS_RANK = "bm25(items_fts, 10.0, 1.0, 5.0)"
+
+def create_items_fts(cur):
+    """
+    Crea items_fts, sus triggers y lo llena con los productos existentes.
+
+    Paso de migración: si FTS5 no está disponible solo registra una advertencia.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor de la transacción de la migración
+    """
+
+    for mode, options in _FTS_TOKENIZERS:
+        try:
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"name, description, barrs_code, content='items', content_rowid='id', {options})"
+            )
+            break
+        except sqlite3.OperationalError as e:
+            logger.warning(f"No se pudo crear {FTS_TABLE} con tokenizer {mode}: {e}")
+    else:
+        logger.warning("FTS5 no disponible: la búsqueda de productos usará LIKE")
+        return
+
+    for trigger in _FTS_TRIGGERS:
+        cur.execute(trigger)
+    cur.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+def detect_fts_mode(cur):
+    """
+    Detecta si items_fts existe y con qué tokenizer.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor activo
+
+    Returns:
+        str|None: "trigram", "prefix" o None si no hay FTS
+    """
+
+    cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return "trigram" if "trigram" in row[0] else "prefix"
+
+def build_match_query(term, mode):
+    """
+    Convierte el texto del usuario en una expresión MATCH segura.
+
+    Args:
+        term (str): Texto buscado (se escapan las comillas)
+        mode (str|None): Resultado de detect_fts_mode
+
+    Returns:
+        str|None: Expresión para `items_fts MATCH ?`, o None si FTS no sirve
+            para este término (sin FTS, o menos de 3 caracteres con trigram)
+
+    Example:
+        build_match_query('coca cola', 'trigram')  # '"coca cola"' (subcadena)
+        build_match_query('coca co', 'prefix')     # '"coca"* "co"*' (prefijos)
+    """
+
+    term = (term or "").strip()
+    if not term or mode is None:
+        return None
+
+    if mode == "trigram":
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return None
+        return '"' + term.replace('"', '""') + '"'
+
+    tokens = [t.replace('"', '""') for t in term.split()]
+    return " ".join(f'"{t}"*' for t in tokens if t) or None
@@ -0,0 +1,247 @@
+import re
+import threading
+import time
+
+from bd.bdObserver import COMMIT_SQL
+from debug.logger import logger
+
+# Registro de consultas lentas.
+#
+# SlowQueryLog se registra como observador de BDConector y anota las
+# sentencias que tardan más de `threshold_ms`. En el thread del request solo
+# se acumula en memoria (contador, tiempo total y máximo por sentencia); un
+# thread aparte guarda los acumulados en la tabla slow_queries y, la primera
+# vez que ve cada sentencia en el proceso, guarda su EXPLAIN QUERY PLAN.
+# Escribir desde el observer no es posible: corre dentro de la transacción
+# del request y SQLite admite un solo escritor.
+#
+# Las sentencias se agrupan por SQL normalizado (espacios colapsados y listas
+# "?, ?, ?" reducidas a "?, ..."). Solo se guarda el tipo de cada parámetro,
+# nunca su valor.
+
+SLOW_QUERY_MS = 100
+MAX_ENTRIES = 200
+FLUSH_DELAY = 2.0   # segundos que se esperan para agrupar escrituras
+SORT_COLUMNS = {
+    "total": "total_ms",
+    "max": "max_ms",
+    "count": "count",
+    "recent": "last_seen"
+}
+
+SLOW_QUERIES_TABLE = """
+CREATE TABLE IF NOT EXISTS slow_queries (
+    sql TEXT PRIMARY KEY,
+    params_shape TEXT,
+    count INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    max_ms REAL NOT NULL DEFAULT 0,
+    last_rows INTEGER,
+    plan TEXT,
+    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_NAMED_PARAM = re.compile(r"[:@$](\w+)")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+def normalize_sql(sql):
+    """Colapsa espacios y listas de placeholders para agrupar sentencias iguales."""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+def params_shape(params):
+    """
+    Describe los parámetros sin sus valores.
+
+    Returns:
+        str: ej. "int, str, NoneType", "executemany" o "" sin parámetros
+    """
+
+    if params is None:
+        return "executemany"
+    if isinstance(params, dict):
+        return ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items())
+    return ", ".join(type(value).__name__ for value in params)
+
+def explain_plan(cur, sql, params):
+    """
+    Ejecuta EXPLAIN QUERY PLAN y lo arma como texto indentado.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor a usar
+        sql (str): Sentencia original (sin normalizar)
+        params (tuple|dict|None): Parámetros originales; None en executemany,
+            donde se usan NULL para cada placeholder
+
+    Returns:
+        str|None: Plan (una línea por paso) o None si la sentencia no se explica
+    """
+
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    if params is None:
+        names = _NAMED_PARAM.findall(sql)
+        params = dict.fromkeys(names) if names else (None,) * sql.count("?")
+
+    try:
+        cur.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        steps = cur.fetchall()
+    except Exception as e:
+        return f"(no se pudo obtener el plan: {e})"
+
+    depth = {0: -1}
+    lines = []
+    for step_id, parent, _unused, detail in steps:
+        depth[step_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[step_id] + detail)
+    return "\n".join(lines)
+
+def save_entries(cur, entries, max_entries=MAX_ENTRIES):
+    """
+    Suma los acumulados a slow_queries y descarta las de menor tiempo total
+    si se supera `max_entries`.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor dentro de una transacción
+        entries (list[dict]): sql, params_shape, count, total_ms, max_ms,
+            last_rows, plan (None conserva el plan guardado)
+    """
+
+    cur.executemany(
+        """
+        INSERT INTO slow_queries (sql, params_shape, count, total_ms, max_ms, last_rows, plan)
+        VALUES (:sql, :params_shape, :count, :total_ms, :max_ms, :last_rows, :plan)
+        ON CONFLICT (sql) DO UPDATE SET
+            params_shape = excluded.params_shape,
+            count = count + excluded.count,
+            total_ms = total_ms + excluded.total_ms,
+            max_ms = MAX(max_ms, excluded.max_ms),
+            last_rows = excluded.last_rows,
+            plan = COALESCE(excluded.plan, plan),
+            last_seen = CURRENT_TIMESTAMP
+        """,
+        entries
+    )
+    cur.execute(
+        """
+        DELETE FROM slow_queries WHERE sql NOT IN (
+            SELECT sql FROM slow_queries ORDER BY total_ms DESC LIMIT ?
+        )
+        """,
+        (max_entries,)
+    )
+
+class SlowQueryLog:
+    """
+    Observador de consultas que registra las lentas.
+
+    Thread-safe: Sí.
+
+    Attributes:
+        threshold_ms (float): Duración mínima para registrar una sentencia
+        enabled (bool): True una vez llamado attach()
+    """
+
+    def __init__(self):
+        self.threshold_ms = SLOW_QUERY_MS
+        self.enabled = False
+        self._threshold = SLOW_QUERY_MS / 1000
+        self._db = None
+        self._pending = {}
+        self._explained = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+
+    def attach(self, db, threshold_ms=SLOW_QUERY_MS):
+        """
+        Empieza a observar las consultas de `db`.
+
+        Args:
+            db (BDConector): Conector a observar (y donde se guarda el registro)
+            threshold_ms (float): Duración mínima en milisegundos
+        """
+
+        self._db = db
+        self.threshold_ms = threshold_ms
+        self._threshold = threshold_ms / 1000
+        self.enabled = True
+        db.add_query_observer(self._observe)
+
+    def _observe(self, sql, params, seconds, rows):
+        if seconds < self._threshold or sql == COMMIT_SQL:
+            return
+        if self._worker is not None and threading.current_thread() is self._worker:
+            # Las escrituras del propio registro
+            return
+
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = {
+                    "sql": key,
+                    "params_shape": params_shape(params),
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_rows": rows,
+                    "plan": None,
+                    # Sentencia tal cual se ejecutó, para el EXPLAIN
+                    "explain": (sql, params)
+                }
+            ms = seconds * 1000
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_rows"] = rows
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="slow-query-log", daemon=True)
+                self._worker.start()
+        self._wake.set()
+
+    def flush(self):
+        """
+        Guarda lo acumulado en slow_queries (con el plan de las sentencias nuevas).
+
+        Returns:
+            int: Sentencias guardadas
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        entries = list(pending.values())
+        for entry in entries:
+            # El plan se pide una sola vez por sentencia en cada proceso
+            if entry["sql"] in self._explained:
+                entry["explain"] = None
+            else:
+                self._explained.add(entry["sql"])
+        self._db.save_slow_queries(entries)
+
+        for entry in entries:
+            if entry["plan"] is not None:
+                logger.warning(
+                    "Consulta lenta (%.1f ms, %d filas): %s\n%s",
+                    entry["max_ms"], entry["last_rows"], entry["sql"], entry["plan"]
+                )
+        return len(entries)
+
+    def _work(self):
+        while True:
+            self._wake.wait()
+            # Agrupa las sentencias lentas de un mismo request en una escritura
+            time.sleep(FLUSH_DELAY)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("No se pudo guardar el registro de consultas lentas")
+
+slow_queries = SlowQueryLog()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import sys
+
+# Compara dos resultados de benchmarks/run.py caso por caso.
+#
+# Uso:
+#     python benchmarks/compare.py benchmarks/results/antes.json benchmarks/results/despues.json
+#
+# Sale con código 1 si algún caso empeoró más que --threshold (por ciento)
+# en alguna de las métricas comparadas, para poder usarlo en CI.
+
+METRICS = ("p50_ms", "p95_ms")
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return report["meta"], {result["name"]: result for result in report["results"]}
+
+def compare(base, new, metrics=METRICS, threshold=10.0, min_delta_ms=0.05):
+    """
+    Compara los casos presentes en ambos resultados.
+
+    Args:
+        base (dict): {nombre: resultado} de referencia
+        new (dict): {nombre: resultado} a evaluar
+        metrics (tuple): Métricas de latencia a comparar
+        threshold (float): Empeoramiento (%) a partir del cual es regresión
+        min_delta_ms (float): Diferencias menores a esto se ignoran (ruido)
+
+    Returns:
+        list[dict]: name, metric, base, new, change_pct, regression
+    """
+
+    rows = []
+    for name in base:
+        if name not in new:
+            continue
+        for metric in metrics:
+            before, after = base[name][metric], new[name][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append({
+                "name": name,
+                "metric": metric,
+                "base": before,
+                "new": after,
+                "change_pct": round(change, 1),
+                "regression": change > threshold and after - before > min_delta_ms
+            })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks/run.py")
+    parser.add_argument("base", help="Resultado de referencia (JSON)")
+    parser.add_argument("new", help="Resultado a evaluar (JSON)")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Empeoramiento en %% considerado regresión (default: 10)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Diferencia mínima en ms para marcar regresión (default: 0.05)")
+    parser.add_argument("--metric", action="append", help="Métrica a comparar (repetible; default: p50_ms y p95_ms)")
+    args = parser.parse_args(argv)
+
+    base_meta, base = load(args.base)
+    new_meta, new = load(args.new)
+    print(f"Base:  {base_meta.get('revision')} ({base_meta.get('created_at')})")
+    print(f"Nuevo: {new_meta.get('revision')} ({new_meta.get('created_at')})")
+    if base_meta.get("dataset", {}).get("lines") != new_meta.get("dataset", {}).get("lines"):
+        print("Atención: los datasets son distintos")
+
+    rows = compare(base, new, tuple(args.metric or METRICS), args.threshold, args.min_delta_ms)
+    for row in rows:
+        flag = "  REGRESIÓN" if row["regression"] else ""
+        print(f"{row['name']:<28} {row['metric']:<7} {row['base']:>10.3f} -> {row['new']:>10.3f} ms "
+              f"{row['change_pct']:>+7.1f}%{flag}")
+
+    missing = sorted(set(base) ^ set(new))
+    if missing:
+        print(f"Casos en un solo resultado: {', '.join(missing)}")
+
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} regresiones (umbral {args.threshold}%)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
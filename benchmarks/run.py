@@ -0,0 +1,297 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Benchmarks de los endpoints y métodos de BDConector más usados.
+#
+# Corre en el mismo proceso con el cliente de pruebas de Flask (sin red ni
+# servidor HTTP), sobre una copia de un dataset de tools/gen_dataset.py: las
+# ventas que registran los benchmarks no modifican el dataset original. Por
+# cada caso mide la latencia de cada llamada (percentiles p50/p90/p95/p99) y
+# el throughput, y guarda todo en un JSON con el commit y el entorno para
+# comparar entre versiones con benchmarks/compare.py.
+#
+# Uso (desde la raíz del repo):
+#     python benchmarks/run.py                      # genera/reutiliza el dataset por defecto
+#     python benchmarks/run.py --db /tmp/bench.db --iterations 500 --only api.metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+# Dataset por defecto: fecha fija para que sea el mismo en cualquier día
+DATASET = {"items": 5000, "sales": 350_000, "days": 365, "end": date(2025, 12, 31), "seed": 42}
+WINDOWS = (7, 30, 365)
+PERCENTILES = (50, 90, 95, 99)
+# Variables que cambian el comportamiento medido; se guardan con el resultado
+RECORDED_ENV = ("DB_PRAGMA_PROFILE", "DB_POOL_SIZE", "DB_ITEM_CACHE_SIZE", "LOG_LEVEL",
+                "REQUEST_TIMING", "SLOW_QUERY_LOG", "TELEMETRY")
+SEARCH_TERMS = ("lec", "yerba", "arcor", "dulce de leche", "779000000", "shampoo sancor", "x12")
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano de una lista ordenada."""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def measure(fn, iterations, warmup):
+    """
+    Ejecuta `fn` `warmup` veces sin medir y `iterations` veces midiendo.
+
+    Args:
+        fn (callable): Función sin argumentos; retorna True si la llamada fue correcta
+
+    Returns:
+        dict: iterations, errors, mean_ms, p50_ms... p99_ms, min_ms, max_ms, ops_per_sec
+    """
+
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        ok = fn()
+        timings.append(time.perf_counter() - call_started)
+        if not ok:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    result = {
+        "iterations": iterations,
+        "errors": errors,
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4)
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile(timings, pct) * 1000, 4)
+    result["min_ms"] = round(timings[0] * 1000, 4)
+    result["max_ms"] = round(timings[-1] * 1000, 4)
+    result["ops_per_sec"] = round(iterations / elapsed, 2) if elapsed else None
+    return result
+
+def git_revision():
+    """Commit actual ("abc1234" o "abc1234-dirty"), o None fuera de git."""
+
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{sha}-dirty" if dirty else sha
+
+def default_dataset():
+    """Genera (una sola vez) el dataset por defecto en benchmarks/data/."""
+
+    name = "dataset-{items}-{sales}-{days}-{seed}-{end}.db".format(**DATASET)
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        from tools.gen_dataset import generate_dataset
+
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generando {path}...")
+        generate_dataset(path, log=lambda message: None, **DATASET)
+    return path
+
+def dataset_info(path):
+    """Tamaño del dataset y rango de fechas de sus ventas."""
+
+    conn = sqlite3.connect(path)
+    try:
+        items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        sales, first, last = conn.execute("SELECT COUNT(*), MIN(date), MAX(date) FROM sells").fetchone()
+        lines = conn.execute("SELECT COUNT(*) FROM details").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "items": items,
+        "sales": sales,
+        "lines": lines,
+        "first_sale": first,
+        "last_sale": last
+    }
+
+def build_cases(db, client, last_day, rng):
+    """
+    Arma los casos a medir.
+
+    Args:
+        db (BDConector): Conector de la app (apuntando a la copia del dataset)
+        client (FlaskClient): Cliente de pruebas con sesión de admin
+        last_day (date): Último día con ventas; las ventanas terminan ahí
+        rng (random.Random): Generador para elegir productos y términos
+
+    Returns:
+        list[tuple]: (nombre, fn, divisor de iteraciones). Los casos pesados
+        usan iterations // divisor
+    """
+
+    barcodes = [row[0] for row in db.execute_query("SELECT barrs_code FROM items WHERE barrs_code IS NOT NULL")]
+
+    # Productos para las ventas, con stock de sobra (la copia se descarta)
+    sale_items = [row[0] for row in db.execute_query("SELECT id FROM items WHERE status = 1 ORDER BY id")]
+    sale_items = rng.sample(sale_items, min(50, len(sale_items)))
+    placeholders = ", ".join("?" * len(sale_items))
+    db.execute_query(f"UPDATE items SET quantity = 1000000000 WHERE id IN ({placeholders})", sale_items, fetch=False)
+    db.invalidate_item_cache()
+
+    def get(url):
+        return lambda: client.get(url).status_code == 200
+
+    def rotating_get(urls):
+        urls = list(urls)
+        def call():
+            return client.get(rng.choice(urls)).status_code == 200
+        return call
+
+    def get_item_by_barcode():
+        return db.get_item_by_barcode(rng.choice(barcodes)) is not None
+
+    def record_bulk_sale():
+        lines = [{"item_id": item_id, "quantity": 1} for item_id in rng.sample(sale_items, 3)]
+        return db.record_bulk_sale(lines) > 0
+
+    def drain(url):
+        # El export ndjson se genera mientras se lee el cuerpo
+        def call():
+            response = client.get(url)
+            response.get_data()
+            return response.status_code == 200
+        return call
+
+    cases = [
+        ("db.get_item_by_barcode", get_item_by_barcode, 1),
+        ("db.get_dashboard_stats", lambda: db.get_dashboard_stats() is not None, 1),
+        ("api.items.search", rotating_get(f"/api/items?q={term}" for term in SEARCH_TERMS), 1),
+        ("api.products.page", get("/api/products?limit=50"), 1),
+        ("api.products.page_search", get("/api/products?limit=50&search=leche&include_total=1"), 1),
+        ("api.products.all", get("/api/products"), 10),
+    ]
+    for days in WINDOWS:
+        start = (last_day - timedelta(days=days - 1)).isoformat()
+        window = f"from={start}&to={last_day.isoformat()}"
+        cases.append((f"api.sales.page.{days}d", get(f"/api/sales?{window}&limit=100"), 1))
+        cases.append((f"api.sales.export.{days}d", drain(f"/api/sales?{window}&format=ndjson"), days))
+        cases.append((f"api.metrics.{days}d", get(f"/api/metrics?{window}"), 1))
+    # Al final: escribe ventas nuevas, que cambiarían las lecturas de arriba
+    cases.append(("db.record_bulk_sale", record_bulk_sale, 1))
+    return cases
+
+def run(dataset_path, iterations=200, warmup=20, only=None, seed=1234):
+    """
+    Corre los benchmarks sobre una copia de `dataset_path`.
+
+    Args:
+        dataset_path (str): Base generada con tools/gen_dataset.py
+        iterations (int): Llamadas medidas por caso
+        warmup (int): Llamadas previas sin medir por caso
+        only (list[str]|None): Prefijos de nombre de caso a correr
+        seed (int): Semilla para elegir productos y términos de búsqueda
+
+    Returns:
+        dict: {"meta": {...}, "results": [{name, iterations, errors, mean_ms, ...}]}
+    """
+
+    info = dataset_info(dataset_path)
+    workdir = tempfile.mkdtemp(prefix="stockmanager-bench-")
+    db_copy = os.path.join(workdir, "bench.db")
+    # backup() copia también lo que esté en el WAL
+    source, target = sqlite3.connect(dataset_path), sqlite3.connect(db_copy)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+    # bd/bdInstance lee DB_PATH al importarse; el resto son defaults que el
+    # entorno puede pisar (sin logs de depuración ni el registro de
+    # consultas lentas escribiendo en segundo plano)
+    os.environ["DB_PATH"] = db_copy
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("SLOW_QUERY_LOG", "0")
+
+    try:
+        from main import app
+        from bd.bdInstance import db
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["user_id"] = 1
+            session["role"] = "admin"
+
+        rng = random.Random(seed)
+        last_day = datetime.strptime(info["last_sale"][:10], "%Y-%m-%d").date()
+        results = []
+        for name, fn, divisor in build_cases(db, client, last_day, rng):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            result = measure(fn, max(3, iterations // divisor), max(1, warmup // divisor))
+            result = dict(name=name, **result)
+            results.append(result)
+            print(f"{name:<28} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+                  f"{result['ops_per_sec']:>9.1f} ops/s" + (f"  {result['errors']} errores" if result["errors"] else ""))
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "warmup": warmup,
+            "seed": seed,
+            "env": {key: os.environ[key] for key in RECORDED_ENV if key in os.environ},
+            "dataset": info
+        },
+        "results": results
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de StockManager (cliente de pruebas de Flask)")
+    parser.add_argument("--db", help="Dataset de tools/gen_dataset.py (default: se genera en benchmarks/data/)")
+    parser.add_argument("--iterations", type=int, default=200, help="Llamadas medidas por caso (default: 200)")
+    parser.add_argument("--warmup", type=int, default=20, help="Llamadas sin medir por caso (default: 20)")
+    parser.add_argument("--only", action="append", help="Prefijo de caso a correr (repetible), ej. api.metrics")
+    parser.add_argument("--seed", type=int, default=1234, help="Semilla de los casos (default: 1234)")
+    parser.add_argument("--output", help="Archivo JSON de salida (default: benchmarks/results/<fecha>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    if args.iterations < 1 or args.warmup < 0:
+        parser.error("--iterations debe ser mayor a 0 y --warmup no puede ser negativo")
+    if args.db and not os.path.exists(args.db):
+        parser.error(f"{args.db} no existe (generarlo con tools/gen_dataset.py)")
+
+    report = run(args.db or default_dataset(), args.iterations, args.warmup, args.only, args.seed)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['revision'] or 'local'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ datas_list = [
     ('static', 'static'),
     ('bd', 'bd'),
     ('api', 'api'),
+    ('services', 'services'),
 ]
 
 # Agrega .env si existe
@@ -29,12 +30,14 @@ a = Analysis(
         ('static', 'static'),
         ('bd', 'bd'),
         ('api', 'api'),
+        ('services', 'services'),
     ],
     hiddenimports=[
         'flask',
         'werkzeug.security',
         'werkzeug.serving',
         'werkzeug.routing',
+        'waitress',
         'jinja2',
         'sqlite3',
         'csv',
@@ -42,13 +45,12 @@ a = Analysis(
         'uuid',
         'datetime',
         'decimal',
-        'requests',
         'python-dotenv',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=['tkinter', 'matplotlib', 'numpy', 'pandas', 'scipy'],
+    excludes=['tkinter', 'matplotlib', 'numpy', 'pandas', 'scipy', 'requests'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -68,7 +70,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # Sin UPX: el binario se descomprime en cada arranque y eso retrasa el inicio
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -0,0 +1,167 @@
+import queue
+import threading
+import time
+
+from debug.logger import logger
+
+# Importaciones CSV en segundo plano.
+#
+# /import/confirm encola un ImportJob y responde enseguida; un único thread
+# trabajador las ejecuta de a una (SQLite admite un solo escritor, así que
+# paralelizar importaciones no acelera nada). Entre lote y lote se liberan el
+# lock de escritura y el GIL, por lo que las ventas se siguen atendiendo.
+# El progreso se consulta en /api/import/jobs/<id>.
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+class ImportJob:
+    """
+    Importación encolada.
+
+    Attributes:
+        id (str): Identificador (hex de uuid4)
+        status (str): queued, running, done o failed
+        report (ImportReport): Progreso y resultado (se actualiza mientras corre)
+        total_rows (int|None): Filas a importar si se conocen de antemano
+        error (str|None): Motivo si status es failed
+        created_at (float): time.time() al encolar
+        owner_id (int|None): Usuario que la inició
+    """
+
+    def __init__(self, importer, rows, mapping, first_row_number=1, total_rows=None,
+                 owner_id=None, on_finish=None):
+        # Importados acá: el registro se crea al arrancar, los jobs solo al importar
+        import uuid
+        from data.importer import ImportReport
+
+        self.id = uuid.uuid4().hex
+        self.status = JOB_QUEUED
+        self.report = ImportReport()
+        self.total_rows = total_rows
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.owner_id = owner_id
+        self._importer = importer
+        self._rows = rows
+        self._mapping = mapping
+        self._first_row_number = first_row_number
+        self._on_finish = on_finish
+
+    def run(self):
+        """Ejecuta la importación (llamado por el thread trabajador)."""
+
+        from data.importer import ImportReport
+
+        self.status = JOB_RUNNING
+        self.report = ImportReport()
+        try:
+            rows = self._rows() if callable(self._rows) else self._rows
+            self._importer.run(rows, self._mapping, self._first_row_number, report=self.report)
+            self.status = JOB_DONE
+        except Exception as e:
+            logger.exception(f"Importación {self.id} fallida")
+            self.error = str(e)
+            self.status = JOB_FAILED
+        finally:
+            self.report.finished_at = self.report.finished_at or time.time()
+            self.finished_at = time.time()
+            self._rows = None
+            if self._on_finish:
+                try:
+                    self._on_finish(self)
+                except Exception:
+                    logger.exception(f"Error al finalizar la importación {self.id}")
+
+    def to_dict(self):
+        data = self.report.to_dict()
+        data.update({
+            "id": self.id,
+            "status": self.status,
+            "total_rows": self.total_rows,
+            "error": self.error
+        })
+        if self.status == JOB_QUEUED:
+            data["rows_per_second"] = 0.0
+            data["elapsed"] = 0.0
+        return data
+
+class ImportJobRegistry:
+    """
+    Registro en memoria de importaciones y thread trabajador.
+
+    Thread-safe: Sí.
+
+    Attributes:
+        retention (float): Segundos que se conserva un job terminado
+        max_jobs (int): Máximo de jobs terminados que se conservan
+    """
+
+    def __init__(self, retention=3600.0, max_jobs=50):
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, job):
+        """
+        Encola un job y arranca el trabajador si hace falta.
+
+        Returns:
+            ImportJob: El mismo job (para leer su id)
+        """
+
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name="import-worker", daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        logger.info(f"Importación {job.id} encolada")
+        return job
+
+    def get(self, job_id):
+        """
+        Busca un job por id.
+
+        Returns:
+            ImportJob|None: El job o None si no existe o ya expiró
+        """
+
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_count(self):
+        """Cantidad de jobs encolados o en ejecución."""
+
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status in (JOB_QUEUED, JOB_RUNNING))
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.run()
+                logger.info(f"Importación {job.id} {job.status}: {job.report.to_dict()['rows_processed']} filas")
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        """Descarta jobs terminados viejos. Requiere el lock tomado."""
+
+        now = time.time()
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        for index, job in enumerate(finished):
+            if now - job.finished_at > self.retention or len(finished) - index > self.max_jobs:
+                del self._jobs[job.id]
+
+import_jobs = ImportJobRegistry()
@@ -0,0 +1,313 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+
+from data.limits import Limits
+from debug.logger import logger
+
+# Archivos CSV pendientes de confirmar (entre /import y /import/confirm).
+#
+# El archivo subido se copia a disco por bloques y se recorre una sola vez
+# para contar filas y anotar su posición (un offset cada OFFSET_STRIDE
+# filas). En memoria solo quedan los encabezados, las primeras filas de la
+# vista previa y esos offsets; la confirmación vuelve a leer desde disco.
+# Las entradas vencen a los `ttl` segundos y el total en disco está acotado
+# por `max_total_bytes`.
+#
+# csv y uuid se importan dentro de las funciones que los usan: este módulo se
+# carga al arrancar el servidor y solo se necesitan al subir un archivo.
+
+OFFSET_STRIDE = 1000
+COPY_CHUNK = 1024 * 1024
+
+class ImportStoreError(Exception):
+    """Archivo rechazado por el store (tamaño, codificación o contenido)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class PendingImport:
+    """
+    CSV subido y pendiente de confirmación.
+
+    Attributes:
+        key (str): Clave temporal (hex de uuid4)
+        path (str): Archivo en disco
+        size (int): Bytes del archivo
+        delimiter (str): Separador de columnas
+        has_header (bool): Si la primera fila son encabezados
+        headers (list[str]): Encabezados (o Col0, Col1, ...)
+        preview (list[list[str]]): Primeras filas de datos
+        row_count (int): Filas de datos del archivo
+        offsets (array): Offset en bytes de las filas 0, OFFSET_STRIDE, 2*OFFSET_STRIDE, ...
+        expires_at (float): time.time() de vencimiento
+    """
+
+    def __init__(self, key, path, size, delimiter, has_header, expires_at):
+        self.key = key
+        self.path = path
+        self.size = size
+        self.delimiter = delimiter
+        self.has_header = has_header
+        self.expires_at = expires_at
+        self.headers = []
+        self.preview = []
+        self.row_count = 0
+        self.offsets = array("q")
+
+    @property
+    def first_row_number(self):
+        """Número de línea (1-based) de la primera fila de datos."""
+        return 2 if self.has_header else 1
+
+    def iter_rows(self, start=0):
+        """
+        Relee las filas de datos desde disco.
+
+        Args:
+            start (int): Índice de la primera fila de datos a leer
+
+        Yields:
+            list[str]: Filas del CSV
+        """
+
+        if not self.offsets:
+            return
+
+        checkpoint = min(start // OFFSET_STRIDE, len(self.offsets) - 1)
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[checkpoint])
+            index = checkpoint * OFFSET_STRIDE
+            for row, _ in _read_rows(f, self.delimiter):
+                if index >= start:
+                    yield row
+                index += 1
+
+    def discard(self):
+        """Borra el archivo de disco."""
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def _read_rows(f, delimiter):
+    """
+    Lee filas CSV de un archivo binario junto con el offset donde empieza cada una.
+
+    csv.reader pide líneas de a una, así que el offset acumulado al pedirle
+    una fila es exactamente el comienzo de esa fila (aunque tenga saltos de
+    línea entre comillas).
+
+    Yields:
+        tuple[list[str], int]: (fila, offset en bytes)
+    """
+
+    import csv
+
+    position = [f.tell()]
+
+    def lines():
+        first = position[0] == 0
+        for raw in f:
+            position[0] += len(raw)
+            line = raw.decode("utf-8-sig" if first else "utf-8")
+            first = False
+            yield line
+
+    reader = csv.reader(lines(), delimiter=delimiter)
+    while True:
+        start = position[0]
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        yield row, start
+
+class TempImportStore:
+    """
+    Store acotado de importaciones pendientes con respaldo en disco.
+
+    Thread-safe: Sí.
+
+    Attributes:
+        ttl (float): Segundos hasta que vence una importación no confirmada
+        max_total_bytes (int): Máximo de bytes en disco entre todas las pendientes
+        preview_rows (int): Filas que se guardan en memoria para la vista previa
+    """
+
+    def __init__(self, ttl=Limits.IMPORT_TEMP_TTL, max_total_bytes=Limits.IMPORT_TEMP_MAX_BYTES,
+                 preview_rows=Limits.IMPORT_PREVIEW_ROWS, directory=None):
+        self.ttl = ttl
+        self.max_total_bytes = max_total_bytes
+        self.preview_rows = preview_rows
+        self._directory = directory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def create(self, stream, delimiter=",", has_header=True):
+        """
+        Guarda un CSV subido y prepara su vista previa.
+
+        Args:
+            stream: Archivo binario (ej: request.files['file'].stream)
+            delimiter (str): Separador de columnas
+            has_header (bool): Si la primera fila son encabezados
+
+        Returns:
+            PendingImport: Entrada creada (headers, preview, row_count)
+
+        Raises:
+            ImportStoreError: Archivo vacío, no UTF-8, o que no entra en el
+                espacio disponible (status 413)
+        """
+
+        import uuid
+
+        self.sweep()
+        key = uuid.uuid4().hex
+        path = os.path.join(self._get_directory(), f"{key}.csv")
+
+        size = 0
+        try:
+            with open(path, "wb") as out:
+                while True:
+                    chunk = stream.read(COPY_CHUNK)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self._available_bytes():
+                        raise ImportStoreError("El archivo supera el espacio disponible para importaciones", 413)
+                    out.write(chunk)
+
+            entry = PendingImport(key, path, size, delimiter, has_header, time.time() + self.ttl)
+            self._scan(entry)
+        except Exception:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            if self._used_bytes() + size > self.max_total_bytes:
+                entry.discard()
+                raise ImportStoreError("El archivo supera el espacio disponible para importaciones", 413)
+            self._entries[key] = entry
+
+        logger.info(f"Importación pendiente {key}: {size} bytes, {entry.row_count} filas")
+        return entry
+
+    def take(self, key):
+        """
+        Retira una importación pendiente para procesarla.
+
+        El archivo queda en disco: quien la retira debe llamar a discard()
+        al terminar.
+
+        Returns:
+            PendingImport|None: La entrada, o None si no existe o venció
+        """
+
+        self.sweep()
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def exists(self, key):
+        """Indica si hay una importación pendiente (no vencida) con esa clave."""
+
+        self.sweep()
+        with self._lock:
+            return key in self._entries
+
+    def sweep(self):
+        """Borra las importaciones vencidas."""
+
+        now = time.time()
+        with self._lock:
+            expired = [entry for entry in self._entries.values() if entry.expires_at <= now]
+            for entry in expired:
+                del self._entries[entry.key]
+        for entry in expired:
+            entry.discard()
+            logger.info(f"Importación pendiente {entry.key} vencida")
+
+    def stats(self):
+        """
+        Obtiene el uso del store.
+
+        Returns:
+            dict: pending, bytes, max_bytes
+        """
+
+        with self._lock:
+            return {
+                "pending": len(self._entries),
+                "bytes": self._used_bytes(),
+                "max_bytes": self.max_total_bytes
+            }
+
+    def _scan(self, entry):
+        """Recorre el archivo: encabezados, vista previa, cantidad de filas y offsets."""
+
+        import csv
+
+        with open(entry.path, "rb") as f:
+            try:
+                rows = _read_rows(f, entry.delimiter)
+                first = next(rows, None)
+                if first is None:
+                    raise ImportStoreError("El archivo está vacío")
+
+                if entry.has_header:
+                    entry.headers = first[0]
+                else:
+                    entry.headers = [f"Col{i}" for i in range(len(first[0]))]
+                    rows = _chain_first(first, rows)
+
+                for row, offset in rows:
+                    if entry.row_count % OFFSET_STRIDE == 0:
+                        entry.offsets.append(offset)
+                    if entry.row_count < self.preview_rows:
+                        entry.preview.append(row)
+                    entry.row_count += 1
+            except UnicodeDecodeError:
+                raise ImportStoreError("El archivo no está codificado en UTF-8")
+            except csv.Error as e:
+                raise ImportStoreError(f"CSV inválido: {e}")
+
+    def _get_directory(self):
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="stockmanager-imports-")
+            return self._directory
+
+    def _used_bytes(self):
+        """Bytes en disco de las pendientes. Requiere el lock tomado."""
+        return sum(entry.size for entry in self._entries.values())
+
+    def _available_bytes(self):
+        with self._lock:
+            return self.max_total_bytes - self._used_bytes()
+
+    def close(self):
+        """Borra todas las importaciones pendientes y el directorio temporal."""
+
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            directory, self._directory = self._directory, None
+        for entry in entries:
+            entry.discard()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def _chain_first(first, rows):
+    yield first
+    yield from rows
+
+temp_imports = TempImportStore()
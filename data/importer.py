@@ -0,0 +1,181 @@
+import time
+
+from data.limits import Limits
+from data.validators import ItemValidator, ValidationError
+
+# Importación de productos desde CSV.
+#
+# Las filas se consumen de un iterable (el CSV se lee en streaming, nunca
+# completo en memoria), se validan con ItemValidator y se insertan en lotes de
+# `batch_size` con BDConector.import_items: un executemany y una transacción
+# por lote en lugar de una conexión y un commit por producto. Las filas
+# inválidas no abortan la importación: quedan en el reporte con su número.
+
+IMPORT_FIELDS = ("barcode", "name", "description", "quantity", "min_quantity", "price")
+
+def parse_mapping(form):
+    """
+    Lee el mapeo de columnas del formulario de importación.
+
+    Args:
+        form (dict): Campos col_<campo> con el índice de columna ('' = no importar)
+
+    Returns:
+        dict: {campo: índice|None} para cada campo de IMPORT_FIELDS
+
+    Raises:
+        ValueError: Si falta un campo obligatorio o un índice no es válido
+    """
+
+    mapping = {}
+    for field in IMPORT_FIELDS:
+        value = (form.get(f"col_{field}") or "").strip()
+        mapping[field] = int(value) if value else None
+        if mapping[field] is not None and mapping[field] < 0:
+            raise ValueError(f"Índice de columna inválido para {field}")
+
+    for field in ("name", "quantity", "price"):
+        if mapping[field] is None:
+            raise ValueError(f"Falta la columna de {field}")
+    return mapping
+
+class ImportReport:
+    """
+    Resultado (y progreso) de una importación.
+
+    Attributes:
+        rows_processed (int): Filas leídas del CSV
+        inserted (int): Productos nuevos
+        updated (int): Productos existentes actualizados (modo upsert)
+        failed (int): Filas con error
+        errors (list[dict]): {"row", "error"} de las primeras `max_errors` filas con error
+        started_at (float): time.time() al comenzar
+        finished_at (float|None): time.time() al terminar
+    """
+
+    def __init__(self, max_errors=Limits.IMPORT_MAX_ERRORS):
+        self.rows_processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def add_error(self, row_number, message):
+        """Registra una fila con error (solo se guardan las primeras max_errors)."""
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "error": message})
+
+    def rows_per_second(self):
+        """Velocidad promedio desde el inicio."""
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            "rows_processed": self.rows_processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+            "rows_per_second": round(self.rows_per_second(), 1),
+            "elapsed": round((self.finished_at or time.time()) - self.started_at, 3)
+        }
+
+class ProductImporter:
+    """
+    Importa productos por lotes.
+
+    Attributes:
+        db (BDConector): Conector destino
+        batch_size (int): Filas por transacción
+        upsert (bool): Si True un código de barras existente se actualiza;
+            si False se reporta como error de la fila
+    """
+
+    def __init__(self, db, batch_size=Limits.IMPORT_BATCH_SIZE, upsert=False):
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self.upsert = upsert
+
+    def run(self, rows, mapping, first_row_number=1, on_progress=None, report=None):
+        """
+        Valida e inserta todas las filas.
+
+        Args:
+            rows (iterable): Filas del CSV (listas de str), consumidas en streaming
+            mapping (dict): Resultado de parse_mapping
+            first_row_number (int): Número de la primera fila en el archivo
+                (2 si hay encabezados), para que el reporte coincida con el CSV
+            on_progress (callable|None): fn(report) después de cada lote
+            report (ImportReport|None): Reporte a completar (se crea uno si es None)
+
+        Returns:
+            ImportReport: Totales y errores por fila
+
+        Raises:
+            DatabaseError: Si falla un lote por un error SQL (los lotes anteriores
+                ya quedaron confirmados y se reflejan en el reporte)
+        """
+
+        report = report or ImportReport()
+        batch = []
+
+        for row_number, row in enumerate(rows, start=first_row_number):
+            report.rows_processed += 1
+            try:
+                batch.append((row_number, self._validate(row, mapping)))
+            except ValidationError as e:
+                report.add_error(row_number, f"{e.field}: {e.message}")
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report, on_progress)
+                batch = []
+
+        if batch:
+            self._flush(batch, report, on_progress)
+
+        report.finished_at = time.time()
+        if on_progress:
+            on_progress(report)
+        return report
+
+    def _flush(self, batch, report, on_progress):
+        inserted, updated, rejected = self.db.import_items([item for _, item in batch], upsert=self.upsert)
+        report.inserted += inserted
+        report.updated += updated
+        for index, message in rejected:
+            report.add_error(batch[index][0], message)
+        if on_progress:
+            on_progress(report)
+
+    @staticmethod
+    def _validate(row, mapping):
+        def cell(field):
+            index = mapping.get(field)
+            if index is None or index >= len(row):
+                return ""
+            return row[index].strip()
+
+        # Celdas numéricas vacías: 0 como hacía la importación anterior
+        data = ItemValidator.validate(
+            cell("barcode"),
+            cell("description"),
+            cell("name"),
+            cell("quantity") or 0,
+            cell("min_quantity") or 0,
+            cell("price") or None,
+            1
+        )
+        return {
+            "barrs_code": data["barrs_code"] or None,
+            "description": data["description"],
+            "name": data["name"],
+            "quantity": data["quantity"],
+            "min_quantity": data["min_quantity"],
+            "price": data["price"]
+        }
@@ -14,4 +14,17 @@ class Limits:
     USER_USERNAME_MAX = 30
     USER_PASSWORD_MAX = 128
     USER_EMAIL_MAX = 100
-    USER_ROLE_MAX = 20
\ No newline at end of file
+    USER_ROLE_MAX = 20
+    
+    # Paginación
+    PRODUCTS_PAGE_DEFAULT = 100
+    PRODUCTS_PAGE_MAX = 500
+    SALES_PAGE_DEFAULT = 50
+    SALES_PAGE_MAX = 500
+    
+    # Importación CSV
+    IMPORT_BATCH_SIZE = 1000
+    IMPORT_MAX_ERRORS = 200
+    IMPORT_PREVIEW_ROWS = 10
+    IMPORT_TEMP_TTL = 1800                      # segundos
+    IMPORT_TEMP_MAX_BYTES = 512 * 1024 * 1024   # total en disco de CSV pendientes
@@ -1,7 +1,23 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime
+from datetime import date
+
+# Los registros se encolan en el thread que loguea (QueueHandler) y un thread
+# aparte (QueueListener) los escribe en consola y archivo: una consulta o un
+# request nunca espera una escritura a disco. El nivel se elige con LOG_LEVEL
+# (default: INFO en el binario empaquetado, DEBUG en desarrollo) y se puede
+# cambiar en caliente con logger.set_level(); por debajo del nivel no se crea
+# ni se formatea el registro.
+
+LOG_FILE_NAME = "app.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 7
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_LEVEL_VALUES = {name: getattr(logging, name) for name in LOG_LEVELS}
 
 def get_log_dir():
     """
@@ -20,6 +36,43 @@ def get_log_dir():
         base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
     
     return base_dir
+
+def default_log_level():
+    """Nivel inicial: LOG_LEVEL, o INFO en el binario empaquetado y DEBUG en desarrollo."""
+    level = os.getenv("LOG_LEVEL", "").upper()
+    if level in LOG_LEVELS:
+        return level
+    return "INFO" if getattr(sys, 'frozen', False) else "DEBUG"
+
+class _RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Archivo de log rotado por tamaño y al cambiar el día.
+    
+    app.log pasa a app.log.1 (y así hasta backup_count) al superar max_bytes
+    o con el primer registro de un día nuevo. El directorio y el archivo se
+    crean con el primer registro.
+    """
+    
+    def __init__(self, filename, max_bytes, backup_count, encoding=None):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        try:
+            self._day = date.fromtimestamp(os.path.getmtime(filename))
+        except OSError:
+            self._day = date.today()
+    
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+    
+    def shouldRollover(self, record):
+        if date.fromtimestamp(record.created) != self._day and os.path.exists(self.baseFilename):
+            return True
+        return super().shouldRollover(record)
+    
+    def doRollover(self):
+        super().doRollover()
+        self._day = date.today()
     
 class AppLogger:
     """
@@ -32,6 +85,14 @@ class AppLogger:
         logger.warning("Advertencia")
         logger.info("Información")
         logger.debug("Debug")
+    
+    Mensajes costosos: pasar los valores como argumentos estilo % (o una
+    función que arme el mensaje) para que solo se formateen si el nivel está
+    habilitado:
+        logger.debug("Consulta: %s params: %s", query, params)
+        logger.debug(lambda: f"Plan: {explain(query)}")
+        if logger.isEnabledFor("DEBUG"):
+            ...
     """
     
     _instance = None
@@ -45,7 +106,8 @@ class AppLogger:
     
     def _setup_logger(self):
         self._logger = logging.getLogger("StockManager")
-        self._logger.setLevel(logging.DEBUG)
+        self._logger.setLevel(default_log_level())
+        self._listener = None
         
         #evita duplicar handlers
         if self._logger.handlers:
@@ -60,36 +122,90 @@ class AppLogger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.WARNING)
         console_handler.setFormatter(formatter)
-        self._logger.addHandler(console_handler)
-        
-        log_dir = get_log_dir()
-        os.makedirs(log_dir, exist_ok=True)
         
-        log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
+        file_handler = _RotatingFileHandler(
+            os.path.join(get_log_dir(), LOG_FILE_NAME),
+            max_bytes=int(os.getenv("LOG_MAX_BYTES", LOG_MAX_BYTES)),
+            backup_count=int(os.getenv("LOG_BACKUP_COUNT", LOG_BACKUP_COUNT)),
+            encoding="utf-8"
+        )
         file_handler.setFormatter(formatter)
-        self._logger.addHandler(file_handler)
+        
+        records = queue.SimpleQueue()
+        self._logger.addHandler(logging.handlers.QueueHandler(records))
+        self._listener = logging.handlers.QueueListener(
+            records, console_handler, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        # Al salir se escriben los registros que queden en la cola
+        atexit.register(self.close)
+    
+    def close(self):
+        """Escribe los registros pendientes y detiene el thread de escritura."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+    
+    def set_level(self, level):
+        """
+        Cambia el nivel mínimo de registro en caliente.
+        
+        Args:
+            level (str): DEBUG, INFO, WARNING, ERROR o CRITICAL
+        
+        Raises:
+            ValueError: Si el nivel no es válido
+        """
+        level = str(level).upper()
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Nivel de log inválido: {level}")
+        self._logger.setLevel(level)
+    
+    def get_level(self):
+        """Retorna el nivel actual (ej. "INFO")."""
+        return logging.getLevelName(self._logger.level)
+    
+    def isEnabledFor(self, level):
+        """
+        Indica si un registro del nivel dado se escribiría.
+        
+        Args:
+            level (str|int): "DEBUG", "INFO", ... o la constante de logging
+        
+        Returns:
+            bool: True si el nivel está habilitado
+        """
+        if isinstance(level, str):
+            level = _LEVEL_VALUES[level.upper()]
+        return self._logger.isEnabledFor(level)
+    
+    def _log(self, level, message, args, exc_info=False):
+        # Nada se formatea (ni se llama a `message`) si el nivel está deshabilitado
+        if not self._logger.isEnabledFor(level):
+            return
+        if callable(message):
+            message = message()
+        self._logger.log(level, message, *args, exc_info=exc_info)
     
-    def error(self, message: str, exc_info: bool = False):
+    def error(self, message, *args, exc_info: bool = False):
         """Log de error. exc_info=True para incluir traceback."""
-        self._logger.error(message, exc_info=exc_info)
+        self._log(logging.ERROR, message, args, exc_info=exc_info)
     
-    def warning(self, message: str):
+    def warning(self, message, *args):
         """Log de advertencia."""
-        self._logger.warning(message)
+        self._log(logging.WARNING, message, args)
     
-    def info(self, message: str):
+    def info(self, message, *args):
         """Log informativo."""
-        self._logger.info(message)
+        self._log(logging.INFO, message, args)
     
-    def debug(self, message: str):
+    def debug(self, message, *args):
         """Log de debug (solo en archivo)."""
-        self._logger.debug(message)
+        self._log(logging.DEBUG, message, args)
     
-    def exception(self, message: str):
+    def exception(self, message, *args):
         """Log de excepción con traceback completo."""
-        self._logger.exception(message)
+        self._log(logging.ERROR, message, args, exc_info=True)
 
 
 logger = AppLogger()
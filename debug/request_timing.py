@@ -0,0 +1,158 @@
+import threading
+import time
+
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+from flask.signals import before_render_template, template_rendered
+
+from bd.bdObserver import COMMIT_SQL
+from debug.logger import logger
+
+# Tiempos por request.
+#
+# Cada request acumula tiempo en SQLite (vía BDConector.add_query_observer),
+# cantidad de consultas, filas leídas, tiempo renderizando templates y
+# serializando JSON. La respuesta lleva esos tiempos en el header
+# Server-Timing (visible en la pestaña Network de DevTools) y los requests
+# que superan `slow_ms` se registran con logger.warning.
+#
+# Los observadores corren en el thread del request, así que el acumulador es
+# thread-local; consultas de threads sin request (importaciones, warm-up) no
+# se cuentan en ningún lado.
+
+SLOW_REQUEST_MS = 500
+
+_local = threading.local()
+
+class RequestStats:
+    """
+    Tiempos acumulados de un request.
+
+    Attributes:
+        started (float): time.perf_counter() al empezar
+        db_seconds (float): Tiempo dentro de SQLite (incluye commits)
+        queries (int): Sentencias ejecutadas (sin contar commits)
+        rows (int): Filas leídas (o afectadas en escrituras)
+        render_seconds (float): Tiempo renderizando templates
+        json_seconds (float): Tiempo serializando JSON
+        parent (RequestStats|None): Request que lo contiene (api_call)
+    """
+
+    __slots__ = ("started", "db_seconds", "queries", "rows", "render_seconds",
+                 "json_seconds", "render_started", "parent")
+
+    def __init__(self, parent=None):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.render_seconds = 0.0
+        self.json_seconds = 0.0
+        self.render_started = None
+        self.parent = parent
+
+    def server_timing(self, total_seconds):
+        """
+        Arma el valor del header Server-Timing.
+
+        Returns:
+            str: ej. 'db;dur=3.1;desc="4 queries, 20 rows", app;dur=1.2, total;dur=4.3'
+        """
+
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries, {self.rows} rows"']
+        if self.render_seconds:
+            parts.append(f"tpl;dur={self.render_seconds * 1000:.1f}")
+        if self.json_seconds:
+            parts.append(f"json;dur={self.json_seconds * 1000:.1f}")
+        own = total_seconds - self.db_seconds - self.render_seconds - self.json_seconds
+        parts.append(f"app;dur={max(own, 0.0) * 1000:.1f}")
+        parts.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+def current_stats():
+    """Retorna los tiempos del request en curso en este thread (o None)."""
+    return getattr(_local, "stats", None)
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask que suma el tiempo de dumps() al request en curso."""
+
+    def dumps(self, obj, **kwargs):
+        stats = current_stats()
+        if stats is None:
+            return super().dumps(obj, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats.json_seconds += time.perf_counter() - start
+
+def _observe_query(sql, params, seconds, rows):
+    stats = getattr(_local, "stats", None)
+    if stats is None:
+        return
+    stats.db_seconds += seconds
+    if sql != COMMIT_SQL:
+        stats.queries += 1
+        stats.rows += rows
+
+def _render_started(sender, template, context, **extra):
+    stats = current_stats()
+    if stats is not None:
+        stats.render_started = time.perf_counter()
+
+def _render_finished(sender, template, context, **extra):
+    stats = current_stats()
+    if stats is not None and stats.render_started is not None:
+        stats.render_seconds += time.perf_counter() - stats.render_started
+        stats.render_started = None
+
+def init_request_timing(app, db, slow_ms=SLOW_REQUEST_MS):
+    """
+    Instala la medición de tiempos en la app (incluye los blueprints).
+
+    Args:
+        app (Flask): Aplicación
+        db (BDConector): Conector cuyas consultas se miden
+        slow_ms (float): Requests más lentos que esto se registran (0 = todos)
+
+    Example:
+        init_request_timing(app, db, slow_ms=300)
+    """
+
+    app.json = TimedJSONProvider(app)
+    db.add_query_observer(_observe_query)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+
+    @app.before_request
+    def start_request_timing():
+        stats = RequestStats(parent=current_stats())
+        g._request_stats = stats
+        _local.stats = stats
+
+    @app.after_request
+    def add_server_timing(response):
+        stats = g.get("_request_stats")
+        if stats is None:
+            return response
+
+        total = time.perf_counter() - stats.started
+        response.headers["Server-Timing"] = stats.server_timing(total)
+
+        if total * 1000 >= slow_ms:
+            logger.warning(
+                "Request lento: %s %s -> %s en %.1f ms (db %.1f ms, %d consultas, %d filas, tpl %.1f ms, json %.1f ms)",
+                request.method, request.full_path.rstrip("?"), response.status_code, total * 1000,
+                stats.db_seconds * 1000, stats.queries, stats.rows,
+                stats.render_seconds * 1000, stats.json_seconds * 1000
+            )
+        return response
+
+    @app.teardown_request
+    def end_request_timing(exc):
+        stats = g.pop("_request_stats", None)
+        if stats is not None:
+            _local.stats = stats.parent
+            if stats.parent is not None:
+                # api_call: el request interno comparte `g` con el externo
+                g._request_stats = stats.parent
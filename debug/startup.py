@@ -0,0 +1,99 @@
+import builtins
+import sys
+import threading
+import time
+
+# Perfil de arranque del servidor (main.py --profile-startup).
+#
+# Mide cuánto tarda cada import nuevo y las etapas marcadas con mark(), y al
+# final imprime un resumen en stderr. Sirve también en el binario empaquetado,
+# donde no se puede usar `python -X importtime`. Solo depende de la librería
+# estándar para poder activarse antes de importar Flask.
+
+class StartupProfile:
+    """
+    Tiempos de import y etapas del arranque.
+
+    Thread-safe: No (se usa desde el thread principal durante el arranque;
+    los imports de otros threads se ignoran).
+
+    Attributes:
+        enabled (bool): True si se llamó a enable()
+        imports (dict): {módulo: [segundos acumulados, segundos propios]}
+        phases (list): [(etapa, segundos desde la marca anterior)]
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.imports = {}
+        self.phases = []
+        self._started_at = time.perf_counter()
+        self._last_mark = self._started_at
+        self._stack = []
+        self._original_import = None
+
+    def enable(self):
+        """Empieza a medir los imports (reemplaza builtins.__import__)."""
+
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Solo se miden los módulos que todavía no estaban cargados; el resto
+        # del tiempo (buscar en sys.modules) es despreciable
+        if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            entry = self.imports.setdefault(name, [0.0, 0.0])
+            entry[0] += total
+            entry[1] += total - children
+
+    def mark(self, phase):
+        """Registra el tiempo transcurrido desde la marca anterior."""
+
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def report(self, top=20, file=None):
+        """
+        Imprime el resumen y deja de medir imports.
+
+        Args:
+            top (int): Cantidad de módulos a listar (los de mayor tiempo acumulado)
+            file: Destino (default: sys.stderr)
+        """
+
+        if not self.enabled:
+            return
+        builtins.__import__ = self._original_import
+        self.enabled = False
+
+        file = file or sys.stderr
+        total = time.perf_counter() - self._started_at
+        print(f"Arranque: {total * 1000:.1f} ms", file=file)
+        for phase, seconds in self.phases:
+            print(f"  {phase:<24} {seconds * 1000:8.1f} ms", file=file)
+
+        print(f"Imports más lentos (de {len(self.imports)}):", file=file)
+        print(f"  {'acumulado':>10} {'propio':>8}  módulo", file=file)
+        ranked = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, own) in ranked[:top]:
+            print(f"  {cumulative * 1000:8.1f} ms {own * 1000:5.1f} ms  {name}", file=file)
+        file.flush()
+
+startup_profile = StartupProfile()
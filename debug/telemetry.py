@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from flask import g, request
+
+# Telemetría operativa en formato de exposición de Prometheus (texto 0.0.4).
+#
+# Los contadores e histogramas viven en memoria del proceso: cada
+# observación es una búsqueda binaria y una suma bajo un lock propio de la
+# métrica. Lo que ya llevan otros componentes (pool, cache, importaciones,
+# tamaño de la base) se lee recién al generar la respuesta. Sin dependencias:
+# el texto se arma a mano.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+THROUGHPUT_WINDOW = 60.0   # segundos para ventas/min y líneas/min
+STATEMENT_KINDS = frozenset(("select", "insert", "update", "delete", "with", "begin", "commit"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if value == value and value not in (float("inf"), float("-inf")) else "NaN"
+    return str(value)
+
+class Counter:
+    """
+    Contador monotónico con etiquetas.
+
+    Thread-safe: Sí.
+    """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        # Sin etiquetas se exporta 0 desde el arranque
+        self._values = {} if labels else {(): 0}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in values:
+            lines.append(f"{self.name}{_labels(self.label_names, label_values)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """
+    Histograma de buckets fijos con etiquetas.
+
+    Thread-safe: Sí.
+    """
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self.buckets = tuple(buckets)
+        # {etiquetas: [conteos por bucket (+Inf al final), suma, cantidad]}
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (None,), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound is None else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def _gauge(name, help_text, value, metric_type="gauge"):
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {_number(value)}"]
+
+class Telemetry:
+    """
+    Métricas del proceso: requests de la API, consultas, ventas y estado interno.
+
+    Thread-safe: Sí.
+
+    Attributes:
+        enabled (bool): True si se instrumentó la API y la base (attach)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.time()
+        self.http_requests = Counter(
+            "stockmanager_http_requests_total", "Requests atendidos por la API.",
+            ("route", "method", "status")
+        )
+        self.http_latency = Histogram(
+            "stockmanager_http_request_duration_seconds", "Duración de los requests de la API.",
+            ("route", "method"), LATENCY_BUCKETS
+        )
+        self.db_queries = Histogram(
+            "stockmanager_db_query_duration_seconds", "Tiempo dentro de SQLite por sentencia.",
+            ("statement",), QUERY_BUCKETS
+        )
+        self.sales = Counter("stockmanager_sales_total", "Ventas registradas.")
+        self.sale_lines = Counter("stockmanager_sale_lines_total", "Líneas (productos) vendidas.")
+        self.sales_revenue = Counter("stockmanager_sales_revenue_total", "Importe total vendido.")
+        self._db = None
+        self._import_store = None
+        self._recent_sales = deque()
+        self._recent_lock = threading.Lock()
+
+    def attach(self, blueprint, db, import_store=None):
+        """
+        Instrumenta los requests de `blueprint` y las consultas de `db`.
+
+        Llamar antes de app.register_blueprint().
+
+        Args:
+            blueprint (Blueprint): Blueprint a medir (api_bp)
+            db (BDConector): Conector cuyas consultas se miden
+            import_store (TempImportStore|None): Para exportar sus stats()
+        """
+
+        self._db = db
+        self._import_store = import_store
+        self.enabled = True
+        blueprint.before_request(self._start_request)
+        blueprint.after_request(self._end_request)
+        db.add_query_observer(self._observe_query)
+
+    def record_sale(self, lines, revenue):
+        """
+        Cuenta una venta confirmada.
+
+        Args:
+            lines (int): Productos distintos de la venta
+            revenue (float): Importe total
+        """
+
+        now = time.monotonic()
+        self.sales.inc()
+        self.sale_lines.inc(amount=lines)
+        self.sales_revenue.inc(amount=revenue)
+        with self._recent_lock:
+            self._recent_sales.append((now, lines))
+            self._prune_recent(now)
+
+    def _start_request(self):
+        g._telemetry_started = time.perf_counter()
+
+    def _end_request(self, response):
+        started = g.pop("_telemetry_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            self.http_latency.observe(time.perf_counter() - started, route, request.method)
+            self.http_requests.inc(route, request.method, str(response.status_code))
+        return response
+
+    def _observe_query(self, sql, params, seconds, rows):
+        kind = sql.lstrip()[:6].rstrip().lower()
+        self.db_queries.observe(seconds, kind if kind in STATEMENT_KINDS else "other")
+
+    def _prune_recent(self, now):
+        """Descarta ventas fuera de la ventana. Requiere _recent_lock tomado."""
+
+        while self._recent_sales and now - self._recent_sales[0][0] > THROUGHPUT_WINDOW:
+            self._recent_sales.popleft()
+
+    def render(self):
+        """
+        Genera el texto de exposición con todas las métricas.
+
+        Returns:
+            str: Cuerpo para servir con CONTENT_TYPE
+        """
+
+        lines = []
+        for metric in (self.http_requests, self.http_latency, self.db_queries,
+                       self.sales, self.sale_lines, self.sales_revenue):
+            lines.extend(metric.render())
+
+        with self._recent_lock:
+            self._prune_recent(time.monotonic())
+            recent = list(self._recent_sales)
+        per_minute = 60.0 / THROUGHPUT_WINDOW
+        lines += _gauge("stockmanager_sales_per_minute", "Ventas por minuto (último minuto).",
+                        len(recent) * per_minute)
+        lines += _gauge("stockmanager_sale_lines_per_minute", "Líneas vendidas por minuto (último minuto).",
+                        sum(count for _, count in recent) * per_minute)
+
+        if self._db is not None:
+            lines += self._render_db()
+        if self._import_store is not None:
+            stats = self._import_store.stats()
+            lines += _gauge("stockmanager_pending_imports", "Importaciones CSV pendientes de confirmar.",
+                            stats["pending"])
+            lines += _gauge("stockmanager_pending_imports_bytes", "Bytes en disco de importaciones pendientes.",
+                            stats["bytes"])
+
+        lines += _gauge("stockmanager_start_time_seconds", "Inicio del proceso (epoch).", self.started_at)
+        return "\n".join(lines) + "\n"
+
+    def _render_db(self):
+        lines = []
+        pool = self._db.pool_stats()
+        for key in ("size", "idle", "in_use", "max_size"):
+            lines += _gauge(f"stockmanager_db_pool_{key}", f"Pool de conexiones: {key}.", pool[key])
+        for key in ("hits", "misses", "waits", "timeouts", "evicted", "discarded"):
+            lines += _gauge(f"stockmanager_db_pool_{key}_total", f"Pool de conexiones: {key}.",
+                            pool[key], "counter")
+        lines += _gauge("stockmanager_db_pool_wait_seconds_total", "Tiempo total esperando una conexión.",
+                        float(pool["wait_time"]), "counter")
+
+        cache = self._db.item_cache_stats()
+        for key in ("hits", "misses", "evicted", "invalidations"):
+            lines += _gauge(f"stockmanager_item_cache_{key}_total", f"Cache de productos: {key}.",
+                            cache[key], "counter")
+        lines += _gauge("stockmanager_item_cache_size", "Productos en el cache.", cache["size"])
+        lines += _gauge("stockmanager_item_cache_hit_ratio", "Aciertos / consultas del cache de productos.",
+                        float(cache["hit_ratio"]))
+
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self._db.db_path + suffix)
+            except OSError:
+                pass
+        lines += _gauge("stockmanager_db_file_bytes", "Tamaño de la base (incluye el WAL).", size)
+        return lines
+
+telemetry = Telemetry()
@@ -1,4 +1,4 @@
-const { app, BrowserWindow } = require('electron');
+const { app, BrowserWindow, dialog } = require('electron');
 const path = require('path');
 const PythonServer = require('./python-server');
 
@@ -8,7 +8,16 @@ let server;
 async function createWindow() {
   // Inicia el servidor Flask
   server = new PythonServer();
-  const serverUrl = await server.start();
+  let serverUrl;
+  try {
+    serverUrl = await server.start();
+  } catch (err) {
+    console.error('No se pudo iniciar el servidor:', err);
+    dialog.showErrorBox('StockManager', err.message);
+    server.stop();
+    app.quit();
+    return;
+  }
 
   mainWindow = new BrowserWindow({
     width: 1200,
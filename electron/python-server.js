@@ -3,6 +3,11 @@ const { spawn, exec } = require('child_process');
 const path = require('path');
 const fs = require('fs');
 const findFreePort = require('find-free-port');
+const http = require('http');
+
+const READY_FIRST_DELAY_MS = 25;
+const READY_MAX_DELAY_MS = 500;
+const READY_TIMEOUT_MS = 30000;
 
 class PythonServer {
   constructor() {
@@ -47,10 +52,59 @@ class PythonServer {
       console.error('Error en servidor:', err);
     });
 
-    await new Promise(r => setTimeout(r, 1000));
+    await this._waitUntilReady();
     return this.url();
   }
 
+  // Consulta /api/health hasta que responde 200 (base inicializada y pool
+  // precalentado). Empieza con intervalos cortos y los duplica hasta
+  // READY_MAX_DELAY_MS, así un arranque rápido no espera de más y uno lento
+  // (binario PyInstaller en frío) no se da por perdido.
+  async _waitUntilReady() {
+    const started = Date.now();
+    let delay = READY_FIRST_DELAY_MS;
+
+    while (Date.now() - started < READY_TIMEOUT_MS) {
+      if (!this.child) {
+        throw new Error('El servidor terminó antes de estar listo');
+      }
+
+      const health = await this._checkHealth();
+      if (health.ready) {
+        console.log(`Servidor listo en ${Date.now() - started} ms`);
+        return;
+      }
+      if (health.status === 'failed') {
+        throw new Error(`El servidor no pudo iniciar: ${health.error || 'error desconocido'}`);
+      }
+
+      await new Promise(r => setTimeout(r, delay));
+      delay = Math.min(delay * 2, READY_MAX_DELAY_MS);
+    }
+
+    throw new Error(`El servidor no respondió en ${READY_TIMEOUT_MS / 1000} s`);
+  }
+
+  _checkHealth() {
+    return new Promise((resolve) => {
+      const req = http.get(`${this.url()}/api/health`, { timeout: 2000 }, (res) => {
+        let body = '';
+        res.setEncoding('utf8');
+        res.on('data', (chunk) => { body += chunk; });
+        res.on('end', () => {
+          try {
+            resolve(JSON.parse(body));
+          } catch (e) {
+            resolve({ ready: false });
+          }
+        });
+      });
+      // Conexión rechazada: el servidor todavía no abrió el puerto
+      req.on('error', () => resolve({ ready: false }));
+      req.on('timeout', () => req.destroy());
+    });
+  }
+
   url() {
     return `http://127.0.0.1:${this.port}`;
   }
@@ -1,17 +1,32 @@
+import sys
+from debug.startup import startup_profile
+
+if "--profile-startup" in sys.argv:
+    # Antes de importar Flask, para que el perfil incluya todos los imports
+    startup_profile.enable()
+
 from flask import Flask, redirect, render_template, session, request, url_for, flash
 from werkzeug.security import generate_password_hash, check_password_hash
 from api.API import *
 from bd.bdInstance import *
+from bd.bdSlowQueries import SLOW_QUERY_MS, slow_queries
 from data.limits import Limits
+from data.import_jobs import ImportJob, import_jobs
+from data.import_store import ImportStoreError, temp_imports
+from services.errors import ServiceError
+from services.inventory import inventory_service
+from services.sales import sales_service
+from serving import SERVER_MODES, Server, default_mode, readiness
 from debug.logger import logger
-import requests
-import csv
-import io
-import uuid
+from debug.request_timing import SLOW_REQUEST_MS, init_request_timing
+from debug.telemetry import telemetry
 import os
-import sys
 from dotenv import load_dotenv
 import signal
+import argparse
+import click
+import threading
+from datetime import date, timedelta
 
 load_dotenv()
 
@@ -23,13 +38,31 @@ app.secret_key = os.getenv("FLASK_SECRET_KEY", "a")
 def inject_limits():
     return {'Limits': Limits}
 
+# Métricas de /api/internal/metrics (TELEMETRY=0 desactiva la instrumentación).
+# Los hooks del blueprint tienen que registrarse antes de register_blueprint
+if os.getenv("TELEMETRY", "1") != "0":
+    telemetry.attach(api_bp, db, import_store=temp_imports)
+
 app.register_blueprint(api_bp, url_prefix="/api")
 
+# Server-Timing y log de requests lentos (REQUEST_TIMING=0 lo desactiva)
+if os.getenv("REQUEST_TIMING", "1") != "0":
+    init_request_timing(app, db, slow_ms=float(os.getenv("SLOW_REQUEST_MS", SLOW_REQUEST_MS)))
+# Registro de consultas lentas con su plan (SLOW_QUERY_LOG=0 lo desactiva)
+if os.getenv("SLOW_QUERY_LOG", "1") != "0":
+    slow_queries.attach(db, threshold_ms=float(os.getenv("SLOW_QUERY_MS", SLOW_QUERY_MS)))
+startup_profile.mark("imports y app Flask")
+
 def api_call(endpoint, method="GET", data=None):
     """
-    Realiza llamadas internas a la API REST.
+    Invoca un endpoint de la API dentro del mismo proceso (compatibilidad).
     Requiere login: True.
     
+    Las páginas usan directamente services/ (inventory_service,
+    sales_service); esta función queda para código que todavía espera una
+    Response. Despacha la vista sin cliente HTTP ni cookies: la sesión
+    actual se copia al request interno.
+    
     Args:
         endpoint (str): Endpoint de la API (ej. '/items', '/sales')
         method (str): Método HTTP ('GET', 'POST', 'PUT', 'DELETE')
@@ -41,18 +74,11 @@ def api_call(endpoint, method="GET", data=None):
     Ejemplo:
         response = api_call('/items', 'POST', {'name': 'Producto'})
     """
-    base_url = request.url_root.rstrip('/')
-    url = f"{base_url}/api{endpoint}"
+    current_session = dict(session)
     
-    with app.test_client() as client:
-        if method == "GET":
-            return client.get(url)
-        elif method == "POST":
-            return client.post(url, json=data)
-        elif method == "PUT":
-            return client.put(url, json=data)
-        elif method == "DELETE":
-            return client.delete(url)
+    with app.test_request_context(f"/api{endpoint}", method=method, json=data):
+        session.update(current_session)
+        return app.full_dispatch_request()
 
 #@app.route("/product_management")
 def under_development():
@@ -81,7 +107,7 @@ def index():
     if not session.get("user_id"):
         return redirect("/login")
     
-    stats_data = db.get_dashboard_stats()
+    stats_data = inventory_service.dashboard_stats()
     stats = {
         "products": stats_data.get("products", 0),
         "low_stock": stats_data.get("low_stock", 0),
@@ -257,18 +283,14 @@ def product_new():
     }
     
     try:
-        quantity = int(form_data["quantity"])
-        min_quantity = int(form_data["min_quantity"])
-        price = float(form_data["price"])
-        
-        db.add_item(
-            form_data["barrs_code"],
-            form_data["description"],
-            form_data["name"],
-            quantity,
-            min_quantity,
-            price
-        )
+        inventory_service.create_product({
+            "barcode": form_data["barrs_code"],
+            "name": form_data["name"],
+            "description": form_data["description"],
+            "quantity": form_data["quantity"],
+            "min_quantity": form_data["min_quantity"],
+            "price": form_data["price"]
+        })
         flash("Producto agregado")
         return redirect(url_for("index"))
     
@@ -315,21 +337,11 @@ def sale_new():
         return render_template("sale_form.html")
     barcode = request.form.get("barcode", "").strip()
     try:
-        qty = int(request.form.get("quantity", "1"))
-    except ValueError:
-        return render_template("sale_form.html", error="Cantidad inválida")
-
-    item = db.get_item_by_barcode(barcode)
-    if not item:
-        return render_template("sale_form.html", error="Producto no encontrado")
+        sale = sales_service.record_sale(barcode, request.form.get("quantity", "1"))
+    except ServiceError as e:
+        return render_template("sale_form.html", error=str(e))
 
-    # item: (id, barrs_code, name, description, quantity, price)
-    item_id, barrs_code, name, description, stock, price = item
-
-    if stock < qty:
-        return render_template("sale_form.html", error="Stock insuficiente")
-    db.record_sale(item_id, qty)
-    flash(f"Venta registrada: {name} x{qty}")
+    flash(f"Venta registrada: {sale['product']} x{sale['quantity']}")
     return redirect(url_for("index"))
 
 @app.route("/settings", methods=["GET"])
@@ -431,51 +443,55 @@ def change_password():
 @app.route("/sales", methods=["GET"])
 def sales():
     """
-    Muestra el historial de ventas.
+    Muestra el historial de ventas, una página por vez.
     
     Requiere login: True.
     
+    Query Parameters:
+        date_from (str, optional): Primer día (YYYY-MM-DD, default: hace 30 días)
+        date_to (str, optional): Último día (YYYY-MM-DD, default: hoy)
+        limit (int, optional): Ventas por página (default: SALES_PAGE_DEFAULT)
+        after_id (int, optional): Cursor de la página siguiente
+        after_date (str, optional): Cursor de la página siguiente
+    
     Returns:
-        Template: sales.html con datos de ventas
+        Template: sales.html con la página de ventas, los totales del rango
+        y el cursor de la página siguiente
     """
     
     if not session.get("user_id"):
         return redirect(url_for("login"))
     
-    sales_data = db.execute_query(
-        "SELECT s.id, s.date, i.name, d.quantity, d.price "
-        "FROM sells s "
-        "JOIN details d ON s.id = d.sell_id "
-        "JOIN items i ON d.item_id = i.id "
-        "ORDER BY s.date DESC"
-    )
+    today = date.today()
+    date_from = request.args.get("date_from") or (today - timedelta(days=30)).isoformat()
+    date_to = request.args.get("date_to") or today.isoformat()
+    limit = request.args.get("limit", Limits.SALES_PAGE_DEFAULT, type=int)
+    limit = max(1, min(limit, Limits.SALES_PAGE_MAX))
+    after_id = request.args.get("after_id", type=int)
+    after_date = request.args.get("after_date") if after_id is not None else None
     
-    sales_dict = {}
-    for row in sales_data:
-        sale_id = row[0]
-        if sale_id not in sales_dict:
-            sales_dict[sale_id] = {
-                "id": sale_id,
-                "date": row[1],
-                "products": [],
-                "total": 0.0,
-                "total_quantity": 0
-            }
-        
-        sales_dict[sale_id]["products"].append({
-            "name": row[2],
-            "quantity": row[3],
-            "price": row[4]
-        })
-        sales_dict[sale_id]["total"] += row[3] * row[4]
-        sales_dict[sale_id]["total_quantity"] += row[3]
-    
-    sales = list(sales_dict.values())
-    return render_template("sales.html", sales=sales)
-
-temp_imports = {}
+    try:
+        page = sales_service.history_page(date_from, date_to, limit, after_id, after_date)
+        summary = sales_service.summary(date_from, date_to)
+    except ServiceError as e:
+        flash(str(e))
+        return redirect(url_for("sales"))
+    
+    next_url = None
+    if page["next_cursor"]:
+        next_url = url_for("sales", date_from=date_from, date_to=date_to, limit=limit, **page["next_cursor"])
+    
+    return render_template(
+        "sales.html",
+        sales=page["sales"],
+        summary=summary,
+        date_from=date_from,
+        date_to=date_to,
+        next_url=next_url,
+        first_url=url_for("sales", date_from=date_from, date_to=date_to, limit=limit) if after_id is not None else None
+    )
 
-@app.route("/import", methods=["GET"])
+@app.route("/import", methods=["GET", "POST"])
 def import_preview():
     """
     Vista previa de importación CSV.
@@ -487,7 +503,12 @@ def import_preview():
     
     Returns:
         Template: import.html con formulario de importación
-        JSON: Vista previa de datos si es POST (legacy support)
+        JSON: Vista previa si es POST: temp_key, headers, rows (primeras
+        IMPORT_PREVIEW_ROWS filas) y total_rows
+    
+    Note:
+        El archivo se guarda en disco (data/import_store.py); en memoria solo
+        quedan los encabezados y las filas de la vista previa.
     """
     
     if not session.get("user_id") or session.get("role") != "admin":
@@ -502,28 +523,19 @@ def import_preview():
     file = request.files['file']
     delimiter = request.form.get('delimiter', ',')
     has_header = request.form.get('has_header') == '1'
+    if len(delimiter) != 1:
+        return {"error": "El delimitador debe ser un solo carácter"}, 400
     
-    content = file.read().decode('utf-8')
-    reader = csv.reader(io.StringIO(content), delimiter=delimiter)
-    rows = list(reader)
-    
-    if not rows:
-        return {"error": "Empty file"}, 400
-    
-    headers = rows[0] if has_header else [f"Col{i}" for i in range(len(rows[0]))]
-    data_rows = rows[1:] if has_header else rows
-    
-    temp_key = str(uuid.uuid4())
-    temp_imports[temp_key] = {
-        'headers': headers,
-        'rows': data_rows,
-        'delimiter': delimiter
-    }
+    try:
+        pending = temp_imports.create(file.stream, delimiter=delimiter, has_header=has_header)
+    except ImportStoreError as e:
+        return {"error": str(e)}, e.status
     
     return {
-        'temp_key': temp_key,
-        'headers': headers,
-        'rows': data_rows[:10]
+        'temp_key': pending.key,
+        'headers': pending.headers,
+        'rows': pending.preview,
+        'total_rows': pending.row_count
     }
 
 @app.route("/import/confirm", methods=["POST"])
@@ -544,45 +556,66 @@ def confirm_import():
         col_quantity (int): Índice de columna para cantidad
         col_min_quantity (int): Índice de columna para stock mínimo
         col_price (int): Índice de columna para precio
+        upsert (str, optional): '1' para actualizar productos con el mismo código de barras
     
     Returns:
-        Redirect: A dashboard con mensaje de productos importados
+        JSON (Accept: application/json): {"job_id", "status_url"} con código 202
+        Redirect: A dashboard (envío clásico del formulario)
+    
+    Note:
+        La importación corre en segundo plano (data/import_jobs.py) por lotes
+        de IMPORT_BATCH_SIZE; el progreso y los errores por fila se consultan
+        en /api/import/jobs/<job_id>.
     """
+    # El importador (csv, validación por lotes) solo se carga al confirmar
+    from data.importer import ProductImporter, parse_mapping
     
     if not session.get("user_id") or session.get("role") != "admin":
         return redirect(url_for("index"))
     
+    wants_json = request.accept_mimetypes.best == "application/json"
+    
     temp_key = request.form.get('temp_key')
-    if temp_key not in temp_imports:
+    if not temp_imports.exists(temp_key):
+        if wants_json:
+            return {"error": "Sesión expirada, vuelve a subir el CSV"}, 400
+        flash("Sesión expirada, vuelve a subir el CSV", "error")
+        return redirect(url_for('import_preview'))
+    
+    try:
+        mapping = parse_mapping(request.form)
+    except ValueError as e:
+        if wants_json:
+            return {"error": f"Mapeo de columnas inválido: {e}"}, 400
+        flash(f"Mapeo de columnas inválido: {e}", "error")
+        return redirect(url_for('import_preview'))
+    
+    pending = temp_imports.take(temp_key)
+    if pending is None:
+        if wants_json:
+            return {"error": "Sesión expirada, vuelve a subir el CSV"}, 400
         flash("Sesión expirada, vuelve a subir el CSV", "error")
         return redirect(url_for('import_preview'))
     
-    data = temp_imports.pop(temp_key)
-    rows = data['rows']
-    
-    col_barcode = int(request.form.get('col_barcode', 0))
-    col_name = int(request.form.get('col_name', 1))
-    col_description = int(request.form.get('col_description', 2))
-    col_quantity = int(request.form.get('col_quantity', 3))
-    col_min_quantity = int(request.form.get('col_min_quantity', 4))
-    col_price = int(request.form.get('col_price', 5))
-    
-    imported = 0
-    for row in rows:
-        if len(row) <= max(col_barcode, col_name, col_quantity, col_price):
-            continue
-        
-        barcode = row[col_barcode].strip()
-        name = row[col_name].strip()
-        desc = row[col_description].strip() if col_description < len(row) else ""
-        qty = int(row[col_quantity]) if row[col_quantity].isdigit() else 0
-        min_qty = int(row[col_min_quantity]) if col_min_quantity < len(row) and row[col_min_quantity].isdigit() else 0
-        price = float(row[col_price]) if col_price < len(row) else 0.0
-        
-        db.add_item(barcode, desc, name, qty, min_qty, price)
-        imported += 1
-    
-    flash(f"{imported} productos importados correctamente")
+    importer = ProductImporter(
+        db,
+        batch_size=int(os.getenv("IMPORT_BATCH_SIZE", Limits.IMPORT_BATCH_SIZE)),
+        upsert=request.form.get('upsert') == '1'
+    )
+    job = import_jobs.submit(ImportJob(
+        importer,
+        pending.iter_rows,
+        mapping,
+        first_row_number=pending.first_row_number,
+        total_rows=pending.row_count,
+        owner_id=session.get("user_id"),
+        on_finish=lambda _job: pending.discard()
+    ))
+    
+    if wants_json:
+        return {"job_id": job.id, "status_url": url_for("api.get_import_job", job_id=job.id)}, 202
+    
+    flash("Importación en curso: los productos se irán agregando en segundo plano")
     return redirect(url_for('index'))
 
 @app.errorhandler(404)
@@ -654,15 +687,119 @@ def metrics():
     
     return render_template("metrics.html")
 
+@app.cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    """
+    Recalcula los rollups de ventas (daily_item_sales, hourly_sales).
+    
+    Uso:
+        flask --app main rebuild-rollups
+    """
+    db.rebuild_sales_rollups()
+    print("Rollups de ventas reconstruidos")
+
+@app.cli.command("slow-queries")
+@click.option("--limit", default=20, show_default=True, help="Cantidad de consultas")
+@click.option("--sort", type=click.Choice(["total", "max", "count", "recent"]), default="total",
+              show_default=True, help="Orden")
+@click.option("--clear", is_flag=True, help="Borra el registro después de mostrarlo")
+def slow_queries_command(limit, sort, clear):
+    """
+    Muestra las consultas lentas registradas con su plan de ejecución.
+    
+    Uso:
+        flask --app main slow-queries --limit 10 --sort max
+    """
+    queries = db.list_slow_queries(limit, sort)
+    if not queries:
+        print("Sin consultas lentas registradas")
+    for q in queries:
+        print(f"{q['total_ms']:.1f} ms total | {q['count']} veces | prom {q['avg_ms']:.1f} ms | "
+              f"máx {q['max_ms']:.1f} ms | {q['last_rows']} filas | params: {q['params_shape'] or '-'}")
+        print(f"  {q['sql']}")
+        for line in (q["plan"] or "(sin plan)").splitlines():
+            print(f"    {line}")
+        print()
+    if clear:
+        print(f"{db.clear_slow_queries()} consultas borradas del registro")
+
+_server = None
+
 def signal_handler(sig, frame):
     logger.info("Señal de terminación recibida, cerrando servidor...")
-    sys.exit(0)
+    if _server is not None:
+        _server.stop()
+    else:
+        sys.exit(0)
     
 signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
 
+def shutdown_resources():
+    """Libera recursos al terminar: CSV pendientes, consultas lentas sin guardar y conexiones del pool."""
+    temp_imports.close()
+    if slow_queries.enabled:
+        slow_queries.flush()
+    db.close()
+    logger.info("Servidor detenido")
+
+def parse_args(argv=None):
+    """
+    Lee las opciones de línea de comandos del servidor.
+    
+    Los valores por defecto salen de variables de entorno (FLASK_PORT,
+    SERVER_MODE, SERVER_THREADS, ...), así Electron solo necesita pasar --port.
+    """
+    parser = argparse.ArgumentParser(description="Servidor de StockManager")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("FLASK_PORT", 5000)))
+    parser.add_argument("--host", default=os.environ.get("FLASK_HOST", "127.0.0.1"))
+    parser.add_argument("--server", choices=SERVER_MODES, default=default_mode(),
+                        help="production (waitress o Werkzeug threaded) o dev (servidor de Flask)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("SERVER_THREADS", "8")),
+                        help="Requests atendidos en paralelo")
+    parser.add_argument("--connection-limit", type=int, default=int(os.getenv("SERVER_CONNECTION_LIMIT", "100")),
+                        help="Conexiones abiertas máximas (waitress)")
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("SERVER_BACKLOG", "64")),
+                        help="Conexiones en espera cuando todos los threads están ocupados")
+    parser.add_argument("--channel-timeout", type=int, default=int(os.getenv("SERVER_CHANNEL_TIMEOUT", "120")),
+                        help="Segundos que se mantiene abierta una conexión keep-alive inactiva")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Imprime en stderr el tiempo de cada etapa e import del arranque")
+    return parser.parse_args(argv)
+
+def warm_up(connections):
+    """
+    Deja la app lista para atender (corre en un thread mientras el servidor
+    ya escucha) y actualiza el estado que informa /api/health.
+    """
+    try:
+        info = db.warm_up(connections)
+    except Exception as e:
+        logger.exception("Error al preparar la base de datos")
+        readiness.failed(e)
+        return
+    readiness.ready(**info)
+    logger.info(f"Servidor listo: {info}")
+    startup_profile.mark("servidor y base lista")
+    startup_profile.report()
+
 if __name__ == "__main__":
-    port = int(os.environ.get("FLASK_PORT", 5000))
-    logger.info(f"Iniciando servidor en puerto {port}")
-    app.run(host="127.0.0.1", port=port, debug=True if 
-            os.environ.get("FLASK_ENV", "production") == "development" else False)
+    args = parse_args()
+    _server = Server(
+        app,
+        host=args.host,
+        port=args.port,
+        mode=args.server,
+        threads=args.threads,
+        connection_limit=args.connection_limit,
+        backlog=args.backlog,
+        channel_timeout=args.channel_timeout
+    )
+    logger.info(f"Iniciando servidor en puerto {args.port} (modo {args.server})")
+    startup_profile.mark("argumentos")
+    readiness.starting()
+    threading.Thread(target=warm_up, args=(min(args.threads, 4),), name="warm-up", daemon=True).start()
+    try:
+        _server.run()
+    finally:
+        shutdown_resources()
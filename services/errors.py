@@ -0,0 +1,14 @@
+class ServiceError(Exception):
+    """
+    Operación rechazada por la capa de servicios.
+
+    Las rutas de la API la convierten en {"error": mensaje} con `status`;
+    las páginas muestran el mensaje en el formulario.
+
+    Attributes:
+        status (int): Código HTTP sugerido (400 datos inválidos, 404 no existe)
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
@@ -0,0 +1,233 @@
+from bd.bdInstance import db
+from data.limits import Limits
+from data.validators import ItemValidator
+from services.errors import ServiceError
+
+# Operaciones de inventario compartidas por las páginas (main.py) y la API
+# (api/API.py). Reciben valores ya extraídos del request y retornan dicts
+# listos para serializar o renderizar; los errores se informan con
+# ValidationError (campo inválido) o ServiceError (con su código HTTP).
+
+PRODUCT_REQUIRED_FIELDS = ("barcode", "name", "quantity", "min_quantity", "price")
+PRODUCT_UPDATE_FIELDS = ("name", "description", "quantity", "min_quantity", "price", "status")
+
+def product_to_dict(row):
+    """
+    Convierte una fila de BDConector.list_products al formato de la API.
+
+    Args:
+        row (tuple): (id, barrs_code, name, description, quantity, min_quantity, price, status)
+
+    Returns:
+        dict: id, barcode, name, description, stock, min_stock, price, status
+    """
+
+    return {
+        "id": row[0],
+        "barcode": row[1],
+        "name": row[2],
+        "description": row[3],
+        "stock": row[4],
+        "min_stock": row[5],
+        "price": row[6],
+        "status": row[7]
+    }
+
+class InventoryService:
+    """
+    Consultas y cambios de productos.
+
+    Thread-safe: Sí (no guarda estado; todo pasa por BDConector).
+
+    Attributes:
+        db (BDConector): Conector de la base
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def list_products(self, active_only=False, search="", view_mode="all", sort="id_asc",
+                      limit=None, after_id=None, after_value=None,
+                      include_total=False, include_summary=False):
+        """
+        Lista productos con filtros y, opcionalmente, paginación por cursor.
+
+        Args:
+            active_only (bool): Solo productos con status = 1
+            search (str): Texto buscado
+            view_mode (str): Filtro de stock (ver BDConector.list_products)
+            sort (str): "<id|name|stock|price>_<asc|desc>"
+            limit (int|None): Tamaño de página (None = todos, sin paginar)
+            after_id (int|None): Cursor de la página anterior
+            after_value (str|None): Cursor de la página anterior
+            include_total (bool): Agregar `total` a la página
+            include_summary (bool): Agregar `summary` a la página
+
+        Returns:
+            list[dict]: Sin `limit`, todos los productos
+            dict: Con `limit`, {"items", "next_cursor", "total"?, "summary"?}
+
+        Raises:
+            ServiceError: Si sort o el cursor no son válidos
+        """
+
+        if limit is None:
+            rows = self.db.list_products(active_only, search, view_mode)
+            return [product_to_dict(row) for row in rows]
+
+        limit = max(1, min(limit, Limits.PRODUCTS_PAGE_MAX))
+        sort_field = sort.partition("_")[0]
+
+        try:
+            # Se pide una fila extra para saber si hay página siguiente sin contar
+            rows = self.db.list_products(
+                active_only, search, view_mode, sort, limit + 1,
+                after_id=after_id,
+                after_value=after_value
+            )
+        except ValueError as e:
+            raise ServiceError(str(e))
+
+        products = [product_to_dict(row) for row in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit:
+            # Las claves de orden coinciden con las del JSON (id, name, stock, price)
+            last = products[-1]
+            next_cursor = {
+                "after_id": last["id"],
+                "after_value": last[sort_field]
+            }
+
+        page = {
+            "items": products,
+            "next_cursor": next_cursor
+        }
+        if include_total:
+            page["total"] = self.db.count_products(active_only, search, view_mode)
+        if include_summary:
+            page["summary"] = self.db.product_stock_summary(active_only)
+        return page
+
+    def get_product(self, product_id):
+        """
+        Obtiene un producto por ID.
+
+        Returns:
+            dict: id, barcode, name, description, stock, min_stock, price
+
+        Raises:
+            ServiceError: 404 si no existe
+        """
+
+        rows = self.db.execute_query(
+            "SELECT id, barrs_code, name, description, quantity, min_quantity, price FROM items WHERE id = ?",
+            (product_id,)
+        )
+        if not rows:
+            raise ServiceError("Producto no encontrado", 404)
+
+        row = rows[0]
+        return {
+            "id": row[0],
+            "barcode": row[1],
+            "name": row[2],
+            "description": row[3],
+            "stock": row[4],
+            "min_stock": row[5],
+            "price": row[6]
+        }
+
+    def create_product(self, data):
+        """
+        Valida y agrega un producto.
+
+        Args:
+            data (dict): barcode, name, description (opcional), quantity,
+                min_quantity, price
+
+        Raises:
+            ServiceError: Si faltan campos requeridos
+            ValidationError: Si algún campo no es válido
+            DatabaseError: Si el código de barras ya existe o hay error SQL
+        """
+
+        if not all(field in data for field in PRODUCT_REQUIRED_FIELDS):
+            raise ServiceError("Faltan campos requeridos")
+
+        item = ItemValidator.validate(
+            data.get("barcode", ""), data.get("description", ""), data.get("name", ""),
+            data.get("quantity"), data.get("min_quantity"), data.get("price"), 1
+        )
+        self.db.add_item(
+            item.get("barrs_code", ""),
+            item.get("description", ""),
+            item["name"],
+            item["quantity"],
+            item["min_quantity"],
+            item["price"]
+        )
+
+    def update_product(self, product_id, data):
+        """
+        Valida y actualiza los campos enviados de un producto.
+
+        Args:
+            product_id (int): ID del producto
+            data (dict): name, description, quantity, min_quantity, price, status
+
+        Raises:
+            ServiceError: Si no hay datos para actualizar
+            ValidationError: Si algún campo no es válido
+        """
+
+        item = ItemValidator.validate(
+            "0", data.get("description", ""), data.get("name", ""),
+            data.get("quantity"), data.get("min_quantity"), data.get("price"), data.get("status")
+        )
+        updates = {field: item[field] for field in PRODUCT_UPDATE_FIELDS if field in item}
+        if not updates:
+            raise ServiceError("No hay datos para actualizar")
+
+        self.db.update_item(product_id, updates)
+
+    def disable_product(self, product_id):
+        """Deshabilita un producto (baja lógica)."""
+
+        self.db.disable_item(product_id)
+
+    def search(self, term, limit=10):
+        """
+        Busca productos para autocompletado.
+
+        Returns:
+            list[dict]: id, barcode, name, description, stock, price
+        """
+
+        term = (term or "").strip()
+        if not term:
+            return []
+
+        return [
+            {
+                "id": row[0],
+                "barcode": row[1],
+                "name": row[2],
+                "description": row[3],
+                "stock": row[4],
+                "price": row[5]
+            }
+            for row in self.db.search_items(term, limit=limit)
+        ]
+
+    def dashboard_stats(self):
+        """
+        Estadísticas del dashboard (ver BDConector.get_dashboard_stats).
+
+        Returns:
+            dict: products, low_stock, sales_today, low_stock_list
+        """
+
+        return self.db.get_dashboard_stats()
+
+inventory_service = InventoryService(db)
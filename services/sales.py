@@ -0,0 +1,229 @@
+from bd.bdInstance import db
+from bd.bdQueries import day_range
+from data.limits import Limits
+from debug.telemetry import telemetry
+from services.errors import ServiceError
+
+# Operaciones de ventas compartidas por las páginas (main.py) y la API
+# (api/API.py). Ver services/inventory.py.
+
+class SalesService:
+    """
+    Registro y consulta de ventas.
+
+    Thread-safe: Sí (no guarda estado; todo pasa por BDConector).
+
+    Attributes:
+        db (BDConector): Conector de la base
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def record_sale(self, barcode, quantity):
+        """
+        Registra la venta de un producto por código de barras.
+
+        Args:
+            barcode (str): Código de barras
+            quantity (int|str): Cantidad vendida
+
+        Returns:
+            dict: product (nombre), quantity, total
+
+        Raises:
+            ServiceError: 404 si el producto no existe, 400 si la cantidad no
+                es válida o no hay stock suficiente
+        """
+
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ServiceError("Cantidad inválida")
+        if quantity <= 0:
+            raise ServiceError("Cantidad inválida")
+
+        item = self.db.get_item_by_barcode(barcode)
+        if not item:
+            raise ServiceError("Producto no encontrado", 404)
+
+        # item: (id, barrs_code, name, description, quantity, price)
+        item_id, _, name, _, stock, price = item
+        if stock < quantity:
+            raise ServiceError("Stock insuficiente")
+
+        try:
+            self.db.record_product_sale(item_id, quantity)
+        except ValueError as e:
+            # El stock cambió entre la lectura y la venta
+            raise ServiceError(str(e))
+
+        telemetry.record_sale(1, price * quantity)
+        return {
+            "product": name,
+            "quantity": quantity,
+            "total": price * quantity
+        }
+
+    def record_bulk_sale(self, lines):
+        """
+        Registra una venta con varios productos.
+
+        Args:
+            lines (list[dict]): {"item_id", "quantity"} por línea
+
+        Returns:
+            dict: sale_id, items, total (ver BDConector.record_bulk_sale_detailed)
+
+        Raises:
+            ServiceError: Si el formato de alguna línea no es válido
+            StockError: Si algún producto no tiene stock suficiente
+            DatabaseError: Si un producto no existe o hay error SQL
+        """
+
+        if not isinstance(lines, list) or not lines:
+            raise ServiceError("Formato inválido: items[] requerido")
+
+        items = []
+        for idx, line in enumerate(lines):
+            try:
+                item_id = int(line.get("item_id"))
+                quantity = int(line.get("quantity"))
+            except (TypeError, ValueError, AttributeError):
+                raise ServiceError(f"item_id/cantidad inválidos en índice {idx}")
+            if quantity <= 0:
+                raise ServiceError(f"item_id/cantidad inválidos en índice {idx}")
+            items.append({"item_id": item_id, "quantity": quantity})
+
+        sale = self.db.record_bulk_sale_detailed(items)
+        telemetry.record_sale(len(sale["items"]), sale["total"])
+        return sale
+
+    def iter_sales(self, date_from=None, date_to=None, limit=None, after_id=None, after_date=None):
+        """
+        Recorre el historial sin armarlo en memoria (ver BDConector.iter_sales).
+
+        Los parámetros se validan antes de retornar el generador, así una
+        respuesta en streaming no empieza con datos que luego fallan.
+
+        Returns:
+            generator: Ventas agrupadas, más recientes primero
+
+        Raises:
+            ServiceError: Si una fecha o el cursor no son válidos
+        """
+
+        limit = self._check_history_params(date_from, date_to, limit, after_id, after_date)
+        return self.db.iter_sales(date_from, date_to, limit, after_id, after_date)
+
+    def history_page(self, date_from=None, date_to=None, limit=None, after_id=None, after_date=None):
+        """
+        Obtiene una página del historial de ventas.
+
+        Args:
+            date_from (str|None): Primer día incluido (YYYY-MM-DD)
+            date_to (str|None): Último día incluido (YYYY-MM-DD)
+            limit (int|None): Ventas por página (default: SALES_PAGE_DEFAULT)
+            after_id (int|None): Cursor: ID de la última venta de la página anterior
+            after_date (str|None): Cursor: fecha de esa venta
+
+        Returns:
+            dict: sales (list[dict]) y next_cursor ({"after_id", "after_date"} o None)
+
+        Raises:
+            ServiceError: Si una fecha o el cursor no son válidos
+        """
+
+        if limit is None:
+            limit = Limits.SALES_PAGE_DEFAULT
+        limit = self._check_history_params(date_from, date_to, limit, after_id, after_date)
+
+        # Se pide una venta extra para saber si hay página siguiente sin contar
+        sales = self.db.list_sales(date_from, date_to, limit + 1, after_id, after_date)
+
+        next_cursor = None
+        if len(sales) > limit:
+            sales = sales[:limit]
+            next_cursor = {
+                "after_id": sales[-1]["id"],
+                "after_date": sales[-1]["date"]
+            }
+
+        return {
+            "sales": sales,
+            "next_cursor": next_cursor
+        }
+
+    def summary(self, date_from=None, date_to=None):
+        """
+        Totales del rango (ver BDConector.sales_summary).
+
+        Returns:
+            dict: revenue, sales, units
+
+        Raises:
+            ServiceError: Si alguna fecha tiene formato inválido
+        """
+
+        try:
+            return self.db.sales_summary(date_from, date_to)
+        except ValueError:
+            raise ServiceError("Formato de fecha inválido (YYYY-MM-DD)")
+
+    def get_sale(self, sale_id):
+        """
+        Obtiene el detalle de una venta.
+
+        Returns:
+            dict: id, date, products ([{name, quantity, price}]), total
+
+        Raises:
+            ServiceError: 404 si la venta no existe
+        """
+
+        rows = self.db.execute_query(
+            """
+            SELECT s.id, s.date, i.name, d.quantity, d.price
+            FROM sells s
+            JOIN details d ON s.id = d.sell_id
+            JOIN items i ON d.item_id = i.id
+            WHERE s.id = ?
+            ORDER BY d.id ASC
+            """,
+            (sale_id,)
+        )
+        if not rows:
+            raise ServiceError("Sale not found", 404)
+
+        sale = {
+            "id": rows[0][0],
+            "date": rows[0][1],
+            "products": [],
+            "total": 0.0
+        }
+        for row in rows:
+            product = {
+                "name": row[2],
+                "quantity": row[3],
+                "price": float(row[4])
+            }
+            sale["products"].append(product)
+            sale["total"] += product["quantity"] * product["price"]
+        return sale
+
+    @staticmethod
+    def _check_history_params(date_from, date_to, limit, after_id, after_date):
+        """Valida fechas y cursor; retorna el límite acotado a SALES_PAGE_MAX."""
+
+        try:
+            day_range(date_from, date_to)
+        except ValueError:
+            raise ServiceError("Formato de fecha inválido (YYYY-MM-DD)")
+        if after_id is not None and not after_date:
+            raise ServiceError("after_date es requerido junto con after_id")
+
+        if limit is None:
+            return None
+        return max(1, min(int(limit), Limits.SALES_PAGE_MAX))
+
+sales_service = SalesService(db)
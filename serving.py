@@ -0,0 +1,233 @@
+import os
+import sys
+import threading
+import time
+
+from debug.logger import logger
+
+# Servidor HTTP de la app.
+#
+# - "production": waitress si está instalado (pool fijo de threads, límite de
+#   conexiones, keep-alive); si no, el servidor threaded de Werkzeug acotado
+#   al mismo número de threads. Un solo proceso: el cache de productos, las
+#   importaciones en curso y los CSV pendientes viven en memoria del proceso,
+#   y SQLite admite un único escritor, así que varios procesos no agregan
+#   capacidad y sí inconsistencias.
+# - "dev": app.run() de Flask (recarga y debugger según FLASK_ENV).
+#
+# stop() se llama desde signal_handler (main.py) y termina de atender los
+# requests en curso antes de retornar de run().
+
+SERVER_MODES = ("production", "dev")
+WERKZEUG_KEEP_ALIVE_MAX = 5   # segundos
+
+def default_mode():
+    """Modo por defecto: SERVER_MODE, o production en el binario empaquetado."""
+    return os.getenv("SERVER_MODE") or ("production" if getattr(sys, "frozen", False) else "dev")
+
+READY_STARTING = "starting"
+READY_OK = "ready"
+READY_FAILED = "failed"
+
+class Readiness:
+    """
+    Estado de arranque que informa /api/health.
+
+    main.py lo pasa a "starting" antes de escuchar y a "ready" cuando la base
+    está inicializada y el pool precalentado; el lanzador de Electron espera
+    ese estado en lugar de una demora fija. Si la app se sirve de otra forma
+    (flask run, tests) nadie llama a starting() y queda lista desde el inicio.
+
+    Thread-safe: Sí.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = READY_OK
+        self._detail = {}
+        self._started_at = time.monotonic()
+
+    def starting(self):
+        with self._lock:
+            self._state = READY_STARTING
+            self._detail = {}
+            self._started_at = time.monotonic()
+
+    def ready(self, **detail):
+        with self._lock:
+            self._state = READY_OK
+            self._detail = dict(detail, startup_seconds=round(time.monotonic() - self._started_at, 3))
+
+    def failed(self, error):
+        with self._lock:
+            self._state = READY_FAILED
+            self._detail = {"error": str(error)}
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple[str, dict]: (estado, detalle)
+        """
+
+        with self._lock:
+            return self._state, dict(self._detail)
+
+readiness = Readiness()
+
+class Server:
+    """
+    Servidor WSGI con apagado ordenado.
+
+    Attributes:
+        mode (str): "production" o "dev"
+        threads (int): Requests atendidos en paralelo
+        connection_limit (int): Conexiones abiertas máximas (waitress)
+        backlog (int): Conexiones esperando en la cola del socket
+        channel_timeout (int): Segundos que se mantiene una conexión keep-alive inactiva
+        shutdown_timeout (float): Segundos de espera por los requests en curso al detenerse
+        backend (str|None): "waitress", "werkzeug" o "flask-dev" una vez iniciado
+    """
+
+    def __init__(self, app, host="127.0.0.1", port=5000, mode="production", threads=8,
+                 connection_limit=100, backlog=64, channel_timeout=120, shutdown_timeout=10.0):
+        if mode not in SERVER_MODES:
+            raise ValueError(f"Modo de servidor inválido: {mode}")
+
+        self.app = app
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.threads = max(1, int(threads))
+        self.connection_limit = max(1, int(connection_limit))
+        self.backlog = max(1, int(backlog))
+        self.channel_timeout = max(1, int(channel_timeout))
+        self.shutdown_timeout = shutdown_timeout
+        self.backend = None
+        self._server = None
+
+    def run(self):
+        """Atiende requests hasta que se llame a stop() (bloquea)."""
+
+        if self.mode == "dev":
+            self.backend = "flask-dev"
+            logger.info(f"Servidor de desarrollo en http://{self.host}:{self.port}")
+            self.app.run(host=self.host, port=self.port,
+                         debug=os.environ.get("FLASK_ENV", "production") == "development")
+            return
+
+        try:
+            import waitress
+        except ImportError:
+            logger.warning("waitress no está instalado; se usa el servidor threaded de Werkzeug")
+            self._run_werkzeug()
+        else:
+            self._run_waitress(waitress)
+
+    def stop(self):
+        """
+        Deja de aceptar conexiones y termina los requests en curso.
+
+        Llamar desde el thread principal (signal handler).
+        """
+
+        if self.backend == "werkzeug" and self._server is not None:
+            # shutdown() espera a que serve_forever() termine: no puede
+            # ejecutarse en el mismo thread que lo está corriendo
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        else:
+            # waitress y el servidor de Flask terminan con SystemExit; waitress
+            # lo captura en run() y espera a sus threads de trabajo
+            sys.exit(0)
+
+    def _run_waitress(self, waitress):
+        self.backend = "waitress"
+        self._server = waitress.create_server(
+            self.app,
+            host=self.host,
+            port=self.port,
+            threads=self.threads,
+            connection_limit=self.connection_limit,
+            backlog=self.backlog,
+            channel_timeout=self.channel_timeout,
+            ident="StockManager"
+        )
+        logger.info(
+            f"Servidor waitress en http://{self.host}:{self.port} "
+            f"({self.threads} threads, {self.connection_limit} conexiones)"
+        )
+        try:
+            self._server.run()
+        finally:
+            self._server.close()
+
+    def _run_werkzeug(self):
+        self.backend = "werkzeug"
+        # Acá cada conexión keep-alive ocupa un thread mientras está abierta:
+        # con un timeout corto una terminal inactiva no bloquea a las demás
+        self._server = _make_werkzeug_server(
+            self.host, self.port, self.app,
+            max_threads=self.threads,
+            backlog=self.backlog,
+            keep_alive_timeout=min(self.channel_timeout, WERKZEUG_KEEP_ALIVE_MAX)
+        )
+        logger.info(f"Servidor Werkzeug en http://{self.host}:{self.port} ({self.threads} threads)")
+        try:
+            self._server.serve_forever()
+        finally:
+            if not self._server.drain(self.shutdown_timeout):
+                logger.warning("Apagado con requests todavía en curso")
+            self._server.server_close()
+
+def _make_werkzeug_server(host, port, app, max_threads, backlog, keep_alive_timeout):
+    """
+    Crea el servidor de respaldo sobre Werkzeug (importado solo si se usa).
+
+    Es un ThreadedWSGIServer con un máximo de requests simultáneos: con todos
+    los threads ocupados el loop deja de aceptar y las conexiones nuevas
+    esperan en la cola del socket (`backlog`).
+    """
+
+    from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+    class KeepAliveRequestHandler(WSGIRequestHandler):
+        # HTTP/1.1 mantiene la conexión abierta entre requests
+        protocol_version = "HTTP/1.1"
+        timeout = keep_alive_timeout
+
+    class BoundedWSGIServer(ThreadedWSGIServer):
+        request_queue_size = backlog
+
+        def __init__(self):
+            self._slots = threading.BoundedSemaphore(max_threads)
+            super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+
+        def process_request(self, request, client_address):
+            self._slots.acquire()
+            try:
+                super().process_request(request, client_address)
+            except Exception:
+                self._slots.release()
+                raise
+
+        def process_request_thread(self, request, client_address):
+            try:
+                super().process_request_thread(request, client_address)
+            finally:
+                self._slots.release()
+
+        def drain(self, timeout):
+            """Espera a que terminen los requests en curso; False si vence el timeout."""
+
+            deadline = time.monotonic() + timeout
+            taken = 0
+            try:
+                for _ in range(max_threads):
+                    if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                        return False
+                    taken += 1
+                return True
+            finally:
+                for _ in range(taken):
+                    self._slots.release()
+
+    return BoundedWSGIServer()
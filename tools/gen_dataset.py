@@ -0,0 +1,275 @@
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+# Generador de datos sintéticos para pruebas de carga y de escala.
+#
+# Crea una base nueva con usuarios, productos y ventas (sells + details) con
+# una distribución parecida a la de un comercio real:
+#   - Popularidad de productos según Zipf: pocos productos concentran la
+#     mayoría de las ventas (el ranking se baraja, no coincide con el id).
+#   - Más ventas los viernes/sábados y en las horas pico (mediodía y tarde).
+#   - Ventas con varias líneas (cantidad de productos distintos) y cantidades
+#     por línea mayormente de 1.
+#
+# Las filas se insertan con executemany en lotes por transacción, sin pasar
+# por BDConector (que registra cada venta con sus validaciones y rollups), y
+# al final se reconstruyen los rollups. Con la misma semilla y los mismos
+# parámetros se obtienen exactamente los mismos datos; solo cambia la sal del
+# hash de la contraseña.
+#
+# Uso (desde la raíz del repo):
+#     python tools/gen_dataset.py --db /tmp/bench.db --items 5000 --sales 350000 --days 365
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+from bd.bdConector import BDConector
+
+# Peso relativo de ventas por día de la semana (lunes a domingo)
+WEEKDAY_WEIGHTS = (0.9, 0.85, 0.9, 1.0, 1.25, 1.4, 0.7)
+# Peso relativo por hora del día (local cerrado de 23 a 8)
+HOUR_WEIGHTS = (0, 0, 0, 0, 0, 0, 0, 0, 2, 4, 6, 8, 10, 9, 6, 5, 6, 8, 10, 9, 6, 3, 1, 0)
+# (cantidad, peso) de cada línea de venta
+QUANTITY_WEIGHTS = ((1, 70), (2, 18), (3, 6), (4, 3), (6, 2), (12, 1))
+MAX_LINES = 20
+DISABLED_RATIO = 0.03
+DEFAULT_PASSWORD = "stockmanager"
+
+PRODUCTS = (
+    "Leche", "Yogur", "Queso", "Manteca", "Pan", "Galletitas", "Arroz", "Fideos",
+    "Harina", "Azúcar", "Yerba", "Café", "Té", "Aceite", "Vinagre", "Sal",
+    "Gaseosa", "Agua", "Jugo", "Cerveza", "Vino", "Detergente", "Lavandina",
+    "Jabón", "Shampoo", "Papel higiénico", "Servilletas", "Atún", "Arvejas",
+    "Tomate triturado", "Mermelada", "Dulce de leche", "Chocolate", "Caramelos"
+)
+BRANDS = (
+    "La Serenísima", "Sancor", "Arcor", "Molinos", "Marolio", "Granja Real",
+    "Don Pedro", "El Ombú", "Del Valle", "Bahía", "Los Andes", "Santa Clara"
+)
+SIZES = ("250 g", "500 g", "1 kg", "200 ml", "500 ml", "1 l", "1,5 l", "2,25 l", "x6", "x12")
+
+def ean13(number):
+    """
+    Arma un código EAN-13 con dígito verificador.
+
+    Args:
+        number (int): Los primeros 12 dígitos
+
+    Returns:
+        str: Código de 13 dígitos
+    """
+
+    digits = f"{number:012d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+def zipf_cum_weights(n, exponent):
+    """Pesos acumulados 1/rank^exponent para random.choices(cum_weights=...)."""
+
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cum_weights.append(total)
+    return cum_weights
+
+def generate_items(rng, count):
+    """
+    Genera productos con código de barras único.
+
+    Returns:
+        list[tuple]: (id, barrs_code, description, name, quantity, min_quantity, price, status)
+    """
+
+    rows = []
+    for item_id in range(1, count + 1):
+        product = rng.choice(PRODUCTS)
+        brand = rng.choice(BRANDS)
+        name = f"{product} {brand} {rng.choice(SIZES)}"
+        # Precios con distribución log-normal (mediana ~ $1500)
+        price = round(math.exp(rng.gauss(7.3, 0.8)), 2)
+        status = 0 if rng.random() < DISABLED_RATIO else 1
+        rows.append((
+            item_id, ean13(779_000_000_000 + item_id), f"{product} - {brand}", name,
+            rng.randint(0, 500), rng.randint(5, 20), price, status
+        ))
+    return rows
+
+def generate_timestamps(rng, count, start, days):
+    """
+    Genera `count` fechas de venta ordenadas, repartidas según
+    WEEKDAY_WEIGHTS y HOUR_WEIGHTS.
+
+    Returns:
+        list[str]: Fechas "YYYY-MM-DD HH:MM:SS" (formato de CURRENT_TIMESTAMP)
+    """
+
+    day_list = [start + timedelta(days=offset) for offset in range(days)]
+    day_weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in day_list]
+    day_indexes = rng.choices(range(days), weights=day_weights, k=count)
+    hours = rng.choices(range(24), weights=HOUR_WEIGHTS, k=count)
+
+    offsets = sorted(
+        day_index * 86400 + hour * 3600 + rng.randrange(3600)
+        for day_index, hour in zip(day_indexes, hours)
+    )
+
+    day_strings = [day.isoformat() for day in day_list]
+    timestamps = []
+    for offset in offsets:
+        day_index, seconds = divmod(offset, 86400)
+        hour, seconds = divmod(seconds, 3600)
+        minute, second = divmod(seconds, 60)
+        timestamps.append(f"{day_strings[day_index]} {hour:02d}:{minute:02d}:{second:02d}")
+    return timestamps
+
+def generate_dataset(db_path, items=2000, sales=100_000, days=365, end=None, lines_mean=3.0,
+                     zipf=1.1, users=5, seed=42, batch_size=20_000, password=DEFAULT_PASSWORD, log=print):
+    """
+    Crea `db_path` con el esquema actual y la llena con datos sintéticos.
+
+    Args:
+        db_path (str): Ruta de la base (no debe existir)
+        items (int): Cantidad de productos
+        sales (int): Cantidad de ventas
+        days (int): Días de historial, terminando en `end`
+        end (date|None): Último día con ventas (default: hoy)
+        lines_mean (float): Promedio aproximado de productos distintos por venta
+        zipf (float): Exponente de la distribución de popularidad (mayor = más concentrada)
+        users (int): Usuarios (el primero es "admin", el resto "cajero<n>")
+        seed (int): Semilla del generador
+        batch_size (int): Ventas por transacción
+        password (str): Contraseña de todos los usuarios
+        log (callable): Función para informar el progreso
+
+    Returns:
+        dict: users, items, sales, lines, seconds
+
+    Raises:
+        FileExistsError: Si `db_path` ya existe
+    """
+
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} ya existe")
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+
+    db = BDConector(db_path, pool_size=1)
+    db.ensure_schema()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA synchronous = OFF")
+    cur = conn.cursor()
+
+    pw_hash = generate_password_hash(password)
+    cur.execute("BEGIN")
+    cur.executemany(
+        "INSERT INTO users (username, password, email, role) VALUES (?, ?, ?, ?)",
+        [("admin", pw_hash, "admin@example.com", "admin")] +
+        [(f"cajero{n}", pw_hash, f"cajero{n}@example.com", "user") for n in range(1, users)]
+    )
+    item_rows = generate_items(rng, items)
+    cur.executemany(
+        "INSERT INTO items (id, barrs_code, description, name, quantity, min_quantity, price, status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        item_rows
+    )
+    cur.execute("COMMIT")
+    log(f"{users} usuarios y {items} productos")
+
+    prices = [row[6] for row in item_rows]
+    # Ranking de popularidad: el producto más vendido no es siempre el id 1
+    ranked_ids = list(range(1, items + 1))
+    rng.shuffle(ranked_ids)
+    cum_weights = zipf_cum_weights(items, zipf)
+    quantities, quantity_weights = zip(*QUANTITY_WEIGHTS)
+    extra_lines_rate = 1.0 / (lines_mean - 1) if lines_mean > 1 else None
+
+    timestamps = generate_timestamps(rng, sales, start, days)
+    total_lines = 0
+    for batch_start in range(0, sales, batch_size):
+        sells = []
+        details = []
+        for sell_id in range(batch_start + 1, min(batch_start + batch_size, sales) + 1):
+            count = 1
+            if extra_lines_rate:
+                count = min(MAX_LINES, 1 + round(rng.expovariate(extra_lines_rate)))
+            # Sin repetidos, como deja la venta record_bulk_sale
+            item_ids = list(dict.fromkeys(rng.choices(ranked_ids, cum_weights=cum_weights, k=count)))
+            line_quantities = rng.choices(quantities, weights=quantity_weights, k=len(item_ids))
+            sells.append((sell_id, item_ids[0], timestamps[sell_id - 1]))
+            for item_id, quantity in zip(item_ids, line_quantities):
+                details.append((sell_id, item_id, quantity, prices[item_id - 1]))
+
+        cur.execute("BEGIN")
+        cur.executemany("INSERT INTO sells (id, item_id, date) VALUES (?, ?, ?)", sells)
+        cur.executemany("INSERT INTO details (sell_id, item_id, quantity, price) VALUES (?, ?, ?, ?)", details)
+        cur.execute("COMMIT")
+        total_lines += len(details)
+        log(f"{batch_start + len(sells)}/{sales} ventas ({total_lines} líneas)")
+
+    conn.close()
+
+    log("Reconstruyendo rollups...")
+    db.rebuild_sales_rollups()
+    db.close()
+
+    return {
+        "users": users,
+        "items": items,
+        "sales": sales,
+        "lines": total_lines,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera una base SQLite con datos sintéticos de StockManager")
+    parser.add_argument("--db", required=True, help="Ruta de la base a crear")
+    parser.add_argument("--items", type=int, default=2000, help="Cantidad de productos (default: 2000)")
+    parser.add_argument("--sales", type=int, default=100_000, help="Cantidad de ventas (default: 100000)")
+    parser.add_argument("--days", type=int, default=365, help="Días de historial (default: 365)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Último día con ventas, YYYY-MM-DD (default: hoy)")
+    parser.add_argument("--lines-mean", type=float, default=3.0,
+                        help="Productos distintos por venta, en promedio (default: 3)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Exponente de popularidad (default: 1.1)")
+    parser.add_argument("--users", type=int, default=5, help="Usuarios (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla (default: 42)")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="Ventas por transacción (default: 20000)")
+    parser.add_argument("--force", action="store_true", help="Borra la base si ya existe")
+    args = parser.parse_args(argv)
+
+    if min(args.items, args.sales, args.days, args.users, args.batch_size) < 1:
+        parser.error("--items, --sales, --days, --users y --batch-size deben ser mayores a 0")
+
+    if args.force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    try:
+        result = generate_dataset(
+            args.db, items=args.items, sales=args.sales, days=args.days, end=args.end,
+            lines_mean=args.lines_mean, zipf=args.zipf, users=args.users, seed=args.seed,
+            batch_size=args.batch_size
+        )
+    except FileExistsError as e:
+        parser.error(f"{e} (usar --force para reemplazarla)")
+
+    print(
+        f"Listo en {result['seconds']} s: {result['items']} productos, {result['sales']} ventas, "
+        f"{result['lines']} líneas. Usuarios: admin / cajero<n>, contraseña '{DEFAULT_PASSWORD}'"
+    )
+
+if __name__ == "__main__":
+    main()